@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Candle Backfill
+Downloads months of OHLCV history for many symbols and timeframes into the candle CSV store
+used by --replay, backtest.py and walk_forward.py (<dir>/<BASE>-<QUOTE>_<timeframe>.csv).
+
+Each symbol/timeframe range is split into pages of `--page-size` candles that are fetched
+concurrently by a thread pool under one shared request budget (token bucket that backs off on
+429s). Pages are appended to the CSV strictly in time order, so an interrupted backfill resumes
+from the last candle written.
+
+Usage:
+    python backfill.py --symbols ETH/USD,BTC/USD --days 365
+    python backfill.py --symbols-file symbols.txt --timeframes 5m,1h --since 2024-01-01 --out data/candles
+    python backfill.py --symbols ETH/USD --days 30 --rate 25 --workers 16
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import ccxt
+from dotenv import load_dotenv
+
+from candle_buffer import timeframe_to_ms
+from exchange_client import create_exchange
+from paper_exchange import CSV_HEADER, candle_csv_path
+
+DAY_MS = 86400000
+
+
+class RateLimiter:
+    """Token bucket shared by all fetch threads. Halves the rate on a 429 and creeps back up."""
+
+    def __init__(self, rate, min_rate=1.0, clock=time):
+        self.target = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.clock = clock
+        self.throttled = 0
+        self._tokens = 1.0
+        self._last = clock.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock.monotonic()
+                self._tokens = min(max(1.0, self.rate / 4), self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_s = (1.0 - self._tokens) / self.rate
+            self.clock.sleep(wait_s)
+
+    def slow_down(self):
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.target, self.rate + self.target * 0.01)
+
+
+class BackfillJob:
+    """One symbol/timeframe: the pages still to fetch and the ordered write into its CSV"""
+
+    def __init__(self, directory, symbol, timeframe, start_ms, end_ms, page_size):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.path = candle_csv_path(directory, symbol, timeframe)
+        self.end = end_ms // self.tf_ms * self.tf_ms  # Closed candles only
+        self.page_ms = page_size * self.tf_ms
+        self.candles = 0
+        self.error = None
+        self.pending = {}                               # page start -> rows fetched out of order
+        self.file = None
+
+        last = last_timestamp(self.path)
+        self.resumed = last is not None
+        start = -(-start_ms // self.tf_ms) * self.tf_ms
+        self.start = max(start, last + self.tf_ms) if last is not None else start
+        self.pages = list(range(self.start, self.end, self.page_ms))
+        self.next_page = self.pages[0] if self.pages else None
+
+    @property
+    def done(self):
+        return self.error is not None or self.next_page is None
+
+    def page_end(self, page_start):
+        return min(page_start + self.page_ms, self.end)
+
+    def deliver(self, page_start, rows):
+        """Store a fetched page and append every page that is now contiguous to the CSV"""
+        if self.error is not None:
+            return
+        self.pending[page_start] = rows
+        lines = []
+        while self.next_page in self.pending:
+            for row in self.pending.pop(self.next_page):
+                lines.append(f"{int(row[0])},{row[1]},{row[2]},{row[3]},{row[4]},{row[5]}\n")
+            following = self.next_page + self.page_ms
+            self.next_page = following if following < self.end else None
+        if lines:
+            if self.file is None:
+                new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                self.file = open(self.path, 'a')
+                if new:
+                    self.file.write(CSV_HEADER + '\n')
+            self.file.writelines(lines)
+            self.file.flush()
+            self.candles += len(lines)
+        if self.done:
+            self.close()
+
+    def fail(self, error):
+        self.error = error
+        self.pending.clear()
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def last_timestamp(path):
+    """Timestamp of the last complete candle in a CSV (a partial last line is cut off), or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+        if tail and not tail.endswith(b'\n'):
+            # Interrupted mid-line: drop the fragment so appends start on a clean line
+            cut = tail.rfind(b'\n') + 1
+            f.truncate(size - len(tail) + cut)
+            tail = tail[:cut]
+    for line in reversed(tail.splitlines()):
+        field = line.split(b',', 1)[0]
+        if field.isdigit():
+            return int(field)
+    return None
+
+
+def fetch_page(exchange, limiter, job, page_start, retries=6):
+    """Candles in [page_start, page_end) for one job; retries rate limits and network errors"""
+    page_end = job.page_end(page_start)
+    limit = (page_end - page_start) // job.tf_ms
+    delay = 1.0
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            bars = exchange.fetch_ohlcv(job.symbol, job.timeframe, since=page_start, limit=limit,
+                                        params={'until': page_end - 1})
+            limiter.speed_up()
+            return sorted((bar for bar in bars if page_start <= bar[0] < page_end), key=lambda bar: bar[0])
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+            limiter.slow_down()
+        except ccxt.NetworkError:
+            if attempt == retries:
+                raise
+        time.sleep(delay)
+        delay = min(delay * 2, 30.0)
+    raise ccxt.RateLimitExceeded(f"{job.symbol} {job.timeframe}: still rate limited after {retries} retries")
+
+
+def run_backfill(exchange, jobs, limiter, workers=8, progress_interval=5.0):
+    """Fetch every job's pages on a thread pool; CSV writes happen on this thread, in order"""
+    tasks = ((job, page_start) for job in jobs for page_start in job.pages)
+    total_pages = sum(len(job.pages) for job in jobs)
+    fetched = 0
+    started = time.monotonic()
+    next_report = started + progress_interval
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='backfill') as pool:
+        try:
+            while True:
+                while len(in_flight) < workers * 2:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    job, page_start = task
+                    if job.error is None:
+                        in_flight[pool.submit(fetch_page, exchange, limiter, job, page_start)] = task
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, timeout=progress_interval, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job, page_start = in_flight.pop(future)
+                    fetched += 1
+                    try:
+                        job.deliver(page_start, future.result())
+                    except Exception as e:
+                        if job.error is None:
+                            print(f"❌ {job.symbol} {job.timeframe}: {e} - stopped at {format_ms(job.next_page)}")
+                        job.fail(e)
+                now = time.monotonic()
+                if now >= next_report:
+                    elapsed = now - started
+                    rate = fetched / elapsed
+                    eta = (total_pages - fetched) / rate if rate > 0 else float('inf')
+                    print(f"   {fetched}/{total_pages} pages, {sum(j.candles for j in jobs):,} candles, "
+                          f"{rate:.1f} req/s (limit {limiter.rate:.1f}), ETA {eta / 60:.1f} min")
+                    next_report = now + progress_interval
+        except KeyboardInterrupt:
+            print("\n🛑 Interrupted - waiting for requests in flight (run again to resume)")
+            for future in in_flight:
+                future.cancel()
+            raise
+        finally:
+            for job in jobs:
+                job.close()
+    return fetched
+
+
+def format_ms(ms):
+    if ms is None:
+        return 'end'
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def parse_date_ms(value):
+    return int(datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Backfill candle history into the CSV store')
+    parser.add_argument('--symbols', default=os.getenv('TRADING_SYMBOLS', 'ETH/USD,BTC/USD'), help='Comma-separated symbols')
+    parser.add_argument('--symbols-file', help='File with one symbol per line (added to --symbols)')
+    parser.add_argument('--timeframes', default=os.getenv('TRADING_TIMEFRAME', '5m'), help='Comma-separated timeframes')
+    parser.add_argument('--days', type=float, default=365, help='History length (ignored with --since)')
+    parser.add_argument('--since', help='Start date YYYY-MM-DD (UTC)')
+    parser.add_argument('--until', help='End date YYYY-MM-DD (UTC, default: now)')
+    parser.add_argument('--out', default='data/candles', help='Candle CSV directory')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent requests')
+    parser.add_argument('--rate', type=float, default=10,
+                        help='Max requests per second across all workers')
+    parser.add_argument('--page-size', type=int, default=300, help='Candles per request (Coinbase max: 300)')
+    parser.add_argument('--sandbox', action='store_true', help='Use sandbox environment')
+    args = parser.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(',') if s.strip()]
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    symbols = list(dict.fromkeys(symbols))
+    timeframes = [t.strip() for t in args.timeframes.split(',') if t.strip()]
+    end_ms = parse_date_ms(args.until) if args.until else int(time.time() * 1000)
+    start_ms = parse_date_ms(args.since) if args.since else int(end_ms - args.days * DAY_MS)
+
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [BackfillJob(args.out, symbol, timeframe, start_ms, end_ms, args.page_size)
+            for symbol in symbols for timeframe in timeframes]
+    pages = sum(len(job.pages) for job in jobs)
+    resumed = sum(1 for job in jobs if job.resumed)
+    print(f"📥 Backfilling {len(symbols)} symbols × {len(timeframes)} timeframes, {format_ms(start_ms)} → {format_ms(end_ms)} UTC")
+    print(f"   {pages} requests at up to {args.rate:g}/s with {args.workers} workers "
+          f"(≥ {pages / args.rate / 60:.1f} min){f', {resumed} files resumed' if resumed else ''}")
+    if not pages:
+        print("✅ Everything is already up to date")
+        return 0
+
+    exchange = create_exchange(use_sandbox=args.sandbox)
+    exchange.enableRateLimit = False  # Requests are paced by the shared RateLimiter instead
+    exchange.load_markets()
+    for job in jobs:
+        if job.symbol not in exchange.markets:
+            print(f"⚠️  {job.symbol} not found on the exchange - skipping")
+            job.fail(ValueError('unknown symbol'))
+
+    limiter = RateLimiter(args.rate)
+    started = time.monotonic()
+    try:
+        run_backfill(exchange, jobs, limiter, workers=args.workers)
+    except KeyboardInterrupt:
+        return 130
+    elapsed = time.monotonic() - started
+    failed = [job for job in jobs if job.error is not None]
+    print(f"\n✅ {sum(job.candles for job in jobs):,} candles written to {args.out} in {elapsed:.0f}s "
+          f"({limiter.throttled} rate-limit backoffs)")
+    for job in failed:
+        print(f"❌ {job.symbol} {job.timeframe}: {job.error}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Backtest Core
+Candle-close simulation of the main_multi_symbol.py strategy (entries, spike reversal, profit
+targets, trailing stop, breakeven and profit locks) on precomputed indicator arrays.
+
+Indicators are computed once per symbol with CandleBuffer, so they match the live bot, and any
+window of the history can then be simulated cheaply with different parameters.
+"""
+import math
+import os
+
+from candle_buffer import CandleBuffer, timeframe_to_ms
+from paper_exchange import candle_csv_path, load_candles_csv
+
+TAKER_FEE = 0.006
+
+# Strategy parameters, keyed by the environment variables the bot reads them from
+PARAMS = {
+    'TRADING_PROFIT_TARGET_PCT': ('profit_target_pct', 0.035),
+    'TRADING_SPIKE_REVERSAL_PCT': ('spike_reversal_pct', 0.02),
+    'TRADING_MIN_SPIKE_PROFIT': ('min_spike_profit_pct', 0.02),
+    'TRADING_ATR_MULTIPLIER': ('atr_multiplier', 1.5),
+    'TRADING_RSI_ENTRY': ('rsi_entry_threshold', 55.0),
+    'TRADING_MIN_TREND_STRENGTH': ('min_trend_strength', 0.01),
+    'TRADING_COOLDOWN_MINUTES': ('cooldown_minutes', 5.0),
+}
+
+INDICATOR_COLUMNS = ('timestamp', 'close', 'ema_20', 'rsi', 'atr', 'ema_slope', 'volume_ratio')
+
+
+def params_from_env():
+    """Current strategy parameters (same defaults as main_multi_symbol.py), keyed by env var"""
+    return {env: float(os.getenv(env, str(default))) for env, (_, default) in PARAMS.items()}
+
+
+def compute_indicators(data):
+    """Indicator columns for an (N, 6) OHLCV array, as plain lists (fast to index in Python)"""
+    buffer = CandleBuffer(capacity=len(data))
+    buffer.update(data.tolist())
+    return {name: buffer.ordered(name).tolist() for name in INDICATOR_COLUMNS}
+
+
+def load_indicators(directory, symbols, timeframe):
+    """Load candle CSVs and compute indicators for each symbol: {symbol: {column: list}}"""
+    return {symbol: compute_indicators(load_candles_csv(candle_csv_path(directory, symbol, timeframe)))
+            for symbol in symbols}
+
+
+def run_backtest(ind, start, end, params, timeframe_ms=300000, fee=TAKER_FEE):
+    """Simulate the strategy on candles [start, end). Returns a list of (entry_i, exit_i, net_return, reason)."""
+    close = ind['close']
+    ema_20 = ind['ema_20']
+    rsi = ind['rsi']
+    atr = ind['atr']
+    ema_slope = ind['ema_slope']
+    volume_ratio = ind['volume_ratio']
+
+    profit_target_pct = params['TRADING_PROFIT_TARGET_PCT']
+    spike_reversal_pct = params['TRADING_SPIKE_REVERSAL_PCT']
+    min_spike_profit_pct = params['TRADING_MIN_SPIKE_PROFIT']
+    atr_multiplier = params['TRADING_ATR_MULTIPLIER']
+    rsi_entry_threshold = params['TRADING_RSI_ENTRY']
+    min_trend_strength = params['TRADING_MIN_TREND_STRENGTH']
+    cooldown_bars = math.ceil(params['TRADING_COOLDOWN_MINUTES'] * 60000 / timeframe_ms)
+
+    trades = []
+    in_position = False
+    last_exit = -cooldown_bars - 1
+    entry = stop = peak = trailing_target = 0.0
+    entry_i = 0
+    breakeven_set = False
+
+    for i in range(start, end):
+        price = close[i]
+        atr_value = atr[i]
+        ema = ema_20[i]
+        if atr_value != atr_value or ema != ema:  # NaN during indicator warmup
+            continue
+
+        volatile = atr_value / price > 0.02
+        if volatile:
+            spike_reversal, profit_target, atr_mult, min_spike_profit = 0.012, 0.02, 2.0, 0.015
+        else:
+            spike_reversal, profit_target, atr_mult, min_spike_profit = (
+                spike_reversal_pct, profit_target_pct, atr_multiplier, min_spike_profit_pct)
+
+        if not in_position:
+            if i - last_exit < cooldown_bars:
+                continue
+            if (price > ema and rsi[i] > rsi_entry_threshold and abs(price - ema) / ema >= min_trend_strength
+                    and ema_slope[i] > 0 and volume_ratio[i] >= 1.0):
+                in_position = True
+                entry = peak = price
+                entry_i = i
+                stop = price - atr_value * (2.0 if volatile else atr_multiplier)
+                trailing_target = price * (1 + profit_target_pct)
+                breakeven_set = False
+            continue
+
+        # Peak and trailing profit target (uses the base profit target, like update_peak)
+        if price > peak:
+            peak = price
+            new_target = entry * (1 + profit_target_pct) + (price - entry) * 0.6
+            if new_target > trailing_target:
+                trailing_target = new_target
+
+        reason = None
+        if (peak - entry) / entry >= min_spike_profit and (peak - price) / peak >= spike_reversal:
+            reason = 'spike'
+        elif price >= entry * (1 + profit_target):
+            reason = 'target'
+        elif trailing_target > 0 and price >= trailing_target:
+            reason = 'trailing'
+        if reason:
+            trades.append((entry_i, i, price * (1 - fee) / (entry * (1 + fee)) - 1, reason))
+            in_position = False
+            last_exit = i
+            continue
+
+        stop = max(stop, price - atr_value * atr_mult)
+        profit_pct = (price - entry) / entry
+        if not breakeven_set and price > entry * 1.01:
+            stop = max(stop, entry * 1.005)
+            breakeven_set = True
+        if profit_pct > 0.01:
+            stop = max(stop, entry * 1.005)
+        if profit_pct > 0.02:
+            stop = max(stop, entry * 1.01)
+        if not volatile and profit_pct > 0.03:
+            stop = max(stop, entry * 1.02)
+
+        if price <= stop:
+            # Stop-loss exits don't start the cooldown (same as the bot)
+            trades.append((entry_i, i, price * (1 - fee) / (entry * (1 + fee)) - 1, 'stop'))
+            in_position = False
+
+    if in_position and end > start:
+        price = close[end - 1]
+        trades.append((entry_i, end - 1, price * (1 - fee) / (entry * (1 + fee)) - 1, 'end'))
+    return trades
+
+
+def summarize_trades(returns, position_fraction=1.0):
+    """Metrics for a sequence of per-trade net returns, compounding position_fraction of equity per trade"""
+    equity = peak = 1.0
+    max_drawdown = 0.0
+    gains = losses = 0.0
+    for r in returns:
+        equity *= 1 + position_fraction * r
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, 1 - equity / peak)
+        if r > 0:
+            gains += r
+        else:
+            losses -= r
+    count = len(returns)
+    return {
+        'trades': count,
+        'total_return': equity - 1,
+        'win_rate': sum(1 for r in returns if r > 0) / count if count else 0.0,
+        'avg_return': sum(returns) / count if count else 0.0,
+        'max_drawdown': max_drawdown,
+        'profit_factor': gains / losses if losses > 0 else (math.inf if gains > 0 else 0.0),
+    }
+
+
+def backtest_window(indicators, windows, params, timeframe, position_fraction=1.0):
+    """Run every symbol on its [start, end) window and summarize all trades in exit-time order"""
+    timeframe_ms = timeframe_to_ms(timeframe)
+    trades = []
+    for symbol, (start, end) in windows.items():
+        timestamps = indicators[symbol]['timestamp']
+        for _, exit_i, net_return, _ in run_backtest(indicators[symbol], start, end, params, timeframe_ms):
+            trades.append((timestamps[exit_i], net_return))
+    trades.sort()
+    return summarize_trades([trade[1] for trade in trades], position_fraction)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline check of the order requests the bot builds through the real ccxt coinbase client
+The paper and mock exchanges accept any params, so they can't tell whether ccxt passes a
+setting on to Coinbase. This script runs the bot's order code against ccxt's own request
+builder and parser, with the HTTP endpoints replaced by stubs (no network, no credentials).
+
+Usage:
+    python benchmarks/check_ccxt_requests.py
+"""
+import os
+import sys
+
+import ccxt
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from limit_order_engine import LimitOrderEngine  # noqa: E402
+from native_stops import CLIENT_ID_PREFIX, NativeStopManager  # noqa: E402
+
+SYMBOL = 'ETH/USD'
+
+
+def make_exchange():
+    """ccxt coinbase client with one market and no network access"""
+    exchange = ccxt.coinbase({'apiKey': 'check', 'secret': 'check'})
+    exchange.set_markets([exchange.safe_market_structure({
+        'id': 'ETH-USD', 'symbol': SYMBOL, 'base': 'ETH', 'quote': 'USD', 'baseId': 'ETH', 'quoteId': 'USD',
+        'type': 'spot', 'spot': True, 'active': True,
+        'precision': {'amount': 0.00000001, 'price': 0.01},
+        'limits': {'amount': {}, 'price': {}, 'cost': {}},
+    })])
+    return exchange
+
+
+def check_native_stop_tag():
+    """The nstop- client order id reaches Coinbase and comes back on the open order"""
+    exchange = make_exchange()
+    sent = []
+
+    def post_order(request):
+        sent.append(request)
+        return {'success': True, 'success_response': {'order_id': 'stop-1', 'product_id': 'ETH-USD', 'side': 'SELL',
+                                                      'client_order_id': request['client_order_id']}}
+
+    exchange.v3PrivatePostBrokerageOrders = post_order
+    NativeStopManager(exchange).sync(SYMBOL, 0.5, 3000.0)
+    assert len(sent) == 1, f"expected one order request, got {len(sent)}"
+    client_id = sent[0]['client_order_id']
+    assert client_id.startswith(CLIENT_ID_PREFIX), f"client_order_id {client_id!r} lacks the {CLIENT_ID_PREFIX!r} tag"
+    assert 'stop_limit_stop_limit_gtc' in sent[0]['order_configuration'], sent[0]['order_configuration']
+
+    # A restart: the stop is read back through ccxt's order parser and taken over
+    open_orders = [
+        {'order_id': 'stop-1', 'product_id': 'ETH-USD', 'side': 'SELL', 'status': 'OPEN', 'client_order_id': client_id,
+         'order_configuration': sent[0]['order_configuration']},
+        {'order_id': 'manual-1', 'product_id': 'ETH-USD', 'side': 'SELL', 'status': 'OPEN',
+         'client_order_id': 'ccxt-00000000-0000-0000-0000-000000000000', 'order_configuration': sent[0]['order_configuration']},
+    ]
+    exchange.v3PrivateGetBrokerageOrdersHistoricalBatch = lambda request: {'orders': open_orders, 'has_next': False}
+    manager = NativeStopManager(exchange)
+    assert manager.recover([SYMBOL]) == [SYMBOL], "the bot's stop was not recovered"
+    assert manager.get(SYMBOL).order_id == 'stop-1', f"recovered {manager.get(SYMBOL).order_id} instead of the bot's stop"
+    return client_id
+
+
+def check_limit_edit_rejection():
+    """A rejected Coinbase edit (success: false, no exception) makes the engine replace the order"""
+    exchange = make_exchange()
+    exchange.has = dict(exchange.has, editOrder=True)
+    calls = []
+
+    def post_order(request):
+        calls.append('create')
+        return {'success': True, 'success_response': {'order_id': f"limit-{len(calls)}", 'product_id': 'ETH-USD', 'side': 'BUY'}}
+
+    def post_edit(request):
+        calls.append('edit')
+        return {'success': False, 'errors': {'edit_failure_reason': 'ORDER_NOT_FOUND'}}
+
+    def post_cancel(request):
+        calls.append('cancel')
+        return {'results': [{'success': True, 'order_id': request['order_ids'][0]}]}
+
+    exchange.v3PrivatePostBrokerageOrders = post_order
+    exchange.v3PrivatePostBrokerageOrdersEdit = post_edit
+    exchange.v3PrivatePostBrokerageOrdersBatchCancel = post_cancel
+    exchange.fetch_order = lambda id, symbol=None, params={}: {'id': id, 'status': 'canceled', 'filled': 0.0}
+    engine = LimitOrderEngine(exchange)
+    chase = engine.submit(SYMBOL, 'buy', 0.5, 3000.0)
+    engine._reprice(chase, 3010.0, 0)
+    assert calls == ['create', 'edit', 'cancel', 'create'], f"calls {calls}: the rejected edit was taken as a success"
+    assert chase.order_id == 'limit-4', f"working order {chase.order_id}"
+    return ' -> '.join(calls)
+
+
+def main():
+    failures = 0
+    for name, check in [('native stop client_order_id', check_native_stop_tag),
+                        ('limit order edit rejection', check_limit_edit_rejection)]:
+        try:
+            detail = check()
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: {e}")
+        else:
+            print(f"✅ {name}: {detail}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
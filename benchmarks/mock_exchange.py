@@ -0,0 +1,167 @@
+"""
+Mock Coinbase exchange for benchmarks
+Implements the subset of the ccxt API used by the bots with deterministic synthetic data
+"""
+import random
+import sys
+import time
+import types
+
+
+class MockExchange:
+    """In-memory stand-in for ccxt.coinbaseadvanced"""
+
+    # Set by make_mock_ccxt() before the bot scripts instantiate the class
+    symbols = ['ETH/USD', 'BTC/USD']
+    balance_currencies = []
+    latency_ms = 0
+    seed = 42
+    # Synthetic candles shared by all instances so repeated script runs don't regenerate them
+    _series = {}
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.markets = {}
+        self.order_count = 0
+        self.first_ohlcv_time = None
+        self._cursor = {}
+
+    def _sleep_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+    def _bars(self, symbol):
+        # Long random walk per symbol, generated once so calls stay cheap
+        if symbol not in self._series:
+            rng = random.Random(f"{self.seed}:{symbol}")
+            price = rng.uniform(0.5, 5000.0)
+            ts = 1700000000000
+            bars = []
+            for _ in range(2000):
+                change = rng.gauss(0.0005, 0.01)
+                open_ = price
+                close = max(price * (1 + change), 1e-8)
+                high = max(open_, close) * (1 + abs(rng.gauss(0, 0.003)))
+                low = min(open_, close) * (1 - abs(rng.gauss(0, 0.003)))
+                volume = rng.uniform(10, 1000)
+                bars.append([ts, open_, high, low, close, volume])
+                price = close
+                ts += 300000
+            self._series[symbol] = bars
+        self._cursor.setdefault(symbol, 100)
+        return self._series[symbol]
+
+    def load_markets(self, reload=False):
+        self._sleep_latency()
+        markets = {}
+        for symbol in list(self.symbols) + [f"{c}/USD" for c in self.balance_currencies]:
+            base, quote = symbol.split('/')
+            markets[symbol] = {
+                'symbol': symbol,
+                'base': base,
+                'quote': quote,
+                'active': True,
+                'limits': {'cost': {'min': 1.0}},
+                'info': {'display_name': symbol.replace('/', '-')},
+            }
+        self.markets = markets
+        return markets
+
+    def set_leverage(self, leverage, symbol=None, params=None):
+        raise Exception('set_leverage() not supported for spot markets')
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=100, params=None):
+        self._sleep_latency()
+        if self.first_ohlcv_time is None:
+            self.first_ohlcv_time = time.perf_counter()
+        bars = self._bars(symbol)
+        # Advance one candle per call so consecutive iterations see new data
+        end = self._cursor[symbol]
+        self._cursor[symbol] = end + 1 if end + 1 < len(bars) else 100
+        return [list(bar) for bar in bars[max(0, end - limit):end]]
+
+    def fetch_ticker(self, symbol, params=None):
+        self._sleep_latency()
+        last = self._bars(symbol)[self._cursor.get(symbol, 100) - 1][4]
+        return {'symbol': symbol, 'last': last, 'bid': last * 0.9995, 'ask': last * 1.0005}
+
+    def fetch_order_book(self, symbol, limit=50, params=None):
+        self._sleep_latency()
+        last = self.fetch_ticker(symbol)['last']
+        # Levels 0.05% apart with size growing away from the touch
+        bids = [[last * (1 - 0.0005 * (i + 1)), 10.0 / last * (i + 1)] for i in range(limit)]
+        asks = [[last * (1 + 0.0005 * (i + 1)), 10.0 / last * (i + 1)] for i in range(limit)]
+        return {'symbol': symbol, 'bids': bids, 'asks': asks, 'nonce': None}
+
+    def fetch_tickers(self, symbols=None, params=None):
+        self._sleep_latency()
+        symbols = symbols or list(self.markets)
+        return {s: self.fetch_ticker(s) for s in symbols}
+
+    def fetch_balance(self, params=None):
+        self._sleep_latency()
+        balance = {'USD': {'free': 1000.0, 'used': 0.0, 'total': 1000.0}}
+        for i, currency in enumerate(self.balance_currencies):
+            amount = 0.001 * (i + 1)
+            balance[currency] = {'free': amount, 'used': 0.0, 'total': amount}
+        return balance
+
+    def _order(self, symbol, side, type_, amount, price=None):
+        self._sleep_latency()
+        self.order_count += 1
+        return {
+            'id': f"mock-{self.order_count}",
+            'symbol': symbol,
+            'side': side,
+            'type': type_,
+            'status': 'closed',
+            'amount': amount,
+            'price': price,
+            'cost': amount * (price or 1.0),
+        }
+
+    def create_market_buy_order(self, symbol, amount, params=None):
+        return self._order(symbol, 'buy', 'market', amount)
+
+    def create_market_sell_order(self, symbol, amount, params=None):
+        return self._order(symbol, 'sell', 'market', amount)
+
+    def create_limit_buy_order(self, symbol, amount, price, params=None):
+        return self._order(symbol, 'buy', 'limit', amount, price)
+
+    def create_limit_sell_order(self, symbol, amount, price, params=None):
+        return self._order(symbol, 'sell', 'limit', amount, price)
+
+    def fetch_order(self, id, symbol=None, params=None):
+        self._sleep_latency()
+        return {'id': id, 'symbol': symbol, 'status': 'closed'}
+
+    def cancel_order(self, id, symbol=None, params=None):
+        self._sleep_latency()
+        return {'id': id, 'symbol': symbol, 'status': 'canceled'}
+
+
+def make_mock_ccxt(symbols, balance_currencies=(), latency_ms=0):
+    """Build a module object that can replace ccxt in sys.modules"""
+    MockExchange.symbols = list(symbols)
+    MockExchange.balance_currencies = list(balance_currencies)
+    MockExchange.latency_ms = latency_ms
+
+    module = types.ModuleType('ccxt')
+    # Error hierarchy the bots catch or classify (subset of ccxt's)
+    module.BaseError = type('BaseError', (Exception,), {})
+    module.ExchangeError = type('ExchangeError', (module.BaseError,), {})
+    module.NetworkError = type('NetworkError', (module.BaseError,), {})
+    module.RequestTimeout = type('RequestTimeout', (module.NetworkError,), {})
+    module.ExchangeNotAvailable = type('ExchangeNotAvailable', (module.NetworkError,), {})
+    module.coinbaseadvanced = MockExchange
+    module.coinbaseexchange = MockExchange
+    module.Exchange = MockExchange
+    return module
+
+
+def install_mock_ccxt(symbols, balance_currencies=(), latency_ms=0):
+    """Replace ccxt in sys.modules and return the previous module (or None)"""
+    previous = sys.modules.get('ccxt')
+    sys.modules['ccxt'] = make_mock_ccxt(symbols, balance_currencies, latency_ms)
+    return previous
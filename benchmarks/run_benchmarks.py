@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the trading loop hot paths
+Runs the real bot scripts against a mock exchange and compares results with a stored baseline
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # Run and compare with baseline
+    python benchmarks/run_benchmarks.py --update-baseline  # Run and store results as the new baseline
+    python benchmarks/run_benchmarks.py --sizes 1,10 --output results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from mock_exchange import install_mock_ccxt  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Placeholder credentials so the scripts get past their key checks
+BENCH_ENV = {
+    'COINBASE_API_KEY': 'benchmark-key',
+    'COINBASE_API_SECRET': 'benchmark-secret',
+}
+
+
+class StopLoop(Exception):
+    """Raised from the patched time.sleep to break out of a bot's main loop"""
+
+
+def make_symbols(count):
+    defaults = ['ETH/USD', 'BTC/USD', 'LINK/USD', 'SHIB/USD']
+    if count <= len(defaults):
+        return defaults[:count]
+    return defaults + [f"SYM{i:04d}/USD" for i in range(count - len(defaults))]
+
+
+def run_script(script, argv=(), env=None, symbols=('ETH/USD',), balance_currencies=(), max_sleeps=1):
+    """Execute a bot script against the mock exchange until it calls time.sleep max_sleeps times.
+
+    Returns the script globals and the perf_counter timestamps of each sleep call.
+    """
+    import dotenv
+
+    path = os.path.join(REPO_DIR, script)
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(time.perf_counter())
+        if len(sleeps) >= max_sleeps:
+            raise StopLoop()
+
+    saved_ccxt = install_mock_ccxt(symbols, balance_currencies)
+    sys.modules.pop('exchange_client', None)  # Re-import so it binds to the mock ccxt module
+    saved_env = dict(os.environ)
+    saved_argv = sys.argv
+    saved_sleep = time.sleep
+    saved_load_dotenv = dotenv.load_dotenv
+
+    os.environ.update(BENCH_ENV)
+    os.environ.update(env or {})
+    sys.argv = [path] + list(argv)
+    time.sleep = fake_sleep
+    # Keep local .env files from overriding the benchmark configuration
+    dotenv.load_dotenv = lambda *args, **kwargs: False
+
+    with open(path) as f:
+        code = compile(f.read(), path, 'exec')
+    script_globals = {'__name__': '__benchmark__', '__file__': path}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(code, script_globals)
+    except (StopLoop, SystemExit):
+        pass
+    finally:
+        time.sleep = saved_sleep
+        sys.argv = saved_argv
+        dotenv.load_dotenv = saved_load_dotenv
+        os.environ.clear()
+        os.environ.update(saved_env)
+        if saved_ccxt is not None:
+            sys.modules['ccxt'] = saved_ccxt
+        else:
+            sys.modules.pop('ccxt', None)
+        sys.modules.pop('exchange_client', None)
+    return script_globals, sleeps
+
+
+def summarize(samples):
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+        'runs': len(samples),
+    }
+
+
+def time_calls(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_fetch_and_analyze(repeat):
+    script_globals, _ = run_script('main_multi_symbol.py', env={'TRADING_SYMBOLS': 'ETH/USD', 'TRADING_FAST_EXIT_INTERVAL': '0'})
+    fetch_data = script_globals['fetch_data']
+    analyze_market = script_globals['analyze_market']
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        results['fetch_data'] = summarize(time_calls(lambda: fetch_data('ETH/USD'), repeat))
+        frames = [fetch_data('ETH/USD') for _ in range(repeat)]
+        frame_iter = iter(frames)
+        results['analyze_market'] = summarize(time_calls(lambda: analyze_market(next(frame_iter)), repeat))
+    return results
+
+
+def bench_loop_iteration(size, iterations):
+    symbols = make_symbols(size)
+    env = {
+        'TRADING_SYMBOLS': ','.join(symbols),
+        'TRADING_FAST_EXIT_INTERVAL': '0',  # One sleep per full cycle
+    }
+    script_globals, sleeps = run_script('main_multi_symbol.py', env=env, symbols=symbols, max_sleeps=iterations)
+    first_fetch = script_globals['exchange'].first_ohlcv_time
+    marks = [first_fetch] + sleeps
+    samples = [end - start for start, end in zip(marks, marks[1:])]
+    result = summarize(samples)
+    result['per_symbol_s'] = result['median_s'] / size
+    return result
+
+
+def bench_exit_fanout(size, workers, latency_ms=100):
+    """Time to flatten `size` positions that all hit their stop in the same iteration"""
+    symbols = make_symbols(size)
+    env = {
+        'TRADING_SYMBOLS': ','.join(symbols),
+        'TRADING_FAST_EXIT_INTERVAL': '0',
+        'TRADING_EXIT_WORKERS': str(workers),
+        'TRADING_MAX_SLIPPAGE_PCT': '0',  # Skip the order book check: only the sells are timed
+    }
+    script_globals, _ = run_script('main_multi_symbol.py', argv=['--execute'], env=env, symbols=symbols)
+    script_globals['exchange'].latency_ms = latency_ms
+    positions = script_globals['positions']
+    for symbol in symbols:
+        positions[symbol].update(in_position=True, entry_price=100.0, position_amount=1.0, trailing_stop_price=95.0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i, symbol in enumerate(symbols):  # Stop-losses are sent as they are queued
+            script_globals['queue_exit'](symbol, 94.0 - i * 0.1, 'Stop-loss', allow_limit=False, start_cooldown=False)
+        script_globals['flush_exits']()
+        elapsed = time.perf_counter() - start
+    if script_globals['exit_pool'] is not None:
+        script_globals['exit_pool'].shutdown()
+    return summarize([elapsed])
+
+
+def bench_order_book(repeat, levels=500):
+    from order_book import OrderBook
+
+    bids = [[3000 - i * 0.01, 0.5] for i in range(levels)]
+    asks = [[3000.01 + i * 0.01, 0.5] for i in range(levels)]
+    book = OrderBook('ETH/USD')
+    book.apply_snapshot(bids, asks)
+    return {
+        'order_book_snapshot': summarize(time_calls(lambda: book.apply_snapshot(bids, asks), repeat)),
+        'order_book_estimate_buy': summarize(time_calls(lambda: book.estimate_buy(50000.0), repeat)),
+        'order_book_max_buy_cost': summarize(time_calls(lambda: book.max_buy_cost(0.005, 3000.0), repeat)),
+    }
+
+
+def bench_portfolio_script(script, currencies, repeat):
+    balance_currencies = [f"C{i:03d}" for i in range(currencies)]
+    run_script(script, balance_currencies=balance_currencies, symbols=())  # Warm-up (generates mock data)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_script(script, balance_currencies=balance_currencies, symbols=())
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run_all(sizes, repeat, iterations, currencies):
+    results = {}
+    results.update(bench_fetch_and_analyze(repeat))
+    results.update(bench_order_book(repeat))
+    for size in sizes:
+        results[f"loop_iteration_{size}_symbols"] = bench_loop_iteration(size, iterations)
+    for workers in (1, 8):
+        results[f"exit_fanout_10_positions_{workers}_workers"] = bench_exit_fanout(10, workers)
+    for script in ('show_portfolio.py', 'cleanup_portfolio.py'):
+        name = script[:-3]
+        results[f"{name}_{currencies}_assets"] = bench_portfolio_script(script, currencies, max(1, repeat // 10))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of (name, baseline_median, current_median, ratio) for regressed benchmarks"""
+    regressions = []
+    for name, base in baseline.get('results', {}).items():
+        current = results.get(name)
+        if not current or base['median_s'] <= 0:
+            continue
+        ratio = current['median_s'] / base['median_s']
+        if ratio > 1 + tolerance:
+            regressions.append((name, base['median_s'], current['median_s'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the trading loop hot paths')
+    parser.add_argument('--sizes', default='1,10,100,1000', help='Comma-separated symbol counts for loop benchmarks')
+    parser.add_argument('--repeat', type=int, default=50, help='Repetitions for per-call benchmarks')
+    parser.add_argument('--iterations', type=int, default=3, help='Loop iterations per symbol count')
+    parser.add_argument('--currencies', type=int, default=200, help='Assets in the mock portfolio')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = run_all(sizes, args.repeat, args.iterations, args.currencies)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+            'settings': {'sizes': sizes, 'repeat': args.repeat, 'iterations': args.iterations,
+                         'currencies': args.currencies},
+        },
+        'results': results,
+    }
+
+    print(f"{'Benchmark':<40} {'Median':>12} {'Min':>12} {'Runs':>6}")
+    print("-" * 72)
+    for name, result in results.items():
+        print(f"{name:<40} {result['median_s']*1000:>10.3f}ms {result['min_s']*1000:>10.3f}ms {result['runs']:>6}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️  No baseline at {args.baseline} - run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance*100:.0f}% tolerance:")
+        for name, base, current, ratio in regressions:
+            print(f"   {name}: {base*1000:.3f}ms → {current*1000:.3f}ms ({ratio:.2f}x)")
+        return 1
+
+    print(f"\n✅ No regressions vs baseline ({args.tolerance*100:.0f}% tolerance)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Long-run memory soak test for the candle ring buffers
+Simulates days of ticks (one update per check interval, candles forming and closing) and
+checks that RSS and traced Python memory stay flat once the buffers are full.
+
+Usage:
+    python benchmarks/soak_candle_buffer.py --days 7 --symbols 20
+    python benchmarks/soak_candle_buffer.py --mode dataframe --days 1   # Old pandas path, for comparison
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from candle_buffer import CandleBuffer, timeframe_to_ms  # noqa: E402
+
+
+def rss_kib():
+    """Current resident set size in KiB (Linux), or 0 when /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return 0
+
+
+class CandleFeed:
+    """Synthetic exchange feed: a random walk, sampled every check interval"""
+
+    def __init__(self, symbol, timeframe_ms, seed):
+        self.rng = random.Random(f"{seed}:{symbol}")
+        self.timeframe_ms = timeframe_ms
+        self.price = self.rng.uniform(1.0, 5000.0)
+        self.bars = []
+
+    def tick(self, now_ms):
+        # Update the forming candle, opening a new one on the timeframe boundary
+        open_time = now_ms - now_ms % self.timeframe_ms
+        self.price *= 1 + self.rng.gauss(0, 0.002)
+        if not self.bars or self.bars[-1][0] != open_time:
+            self.bars.append([open_time, self.price, self.price, self.price, self.price, 0.0])
+            del self.bars[:-100]
+        bar = self.bars[-1]
+        bar[2] = max(bar[2], self.price)
+        bar[3] = min(bar[3], self.price)
+        bar[4] = self.price
+        bar[5] += self.rng.uniform(1, 50)
+
+    def fetch_ohlcv(self, limit):
+        return self.bars[-limit:]
+
+
+def run(mode, days, symbols, check_interval, timeframe, samples):
+    timeframe_ms = timeframe_to_ms(timeframe)
+    names = [f"SYM{i:03d}/USD" for i in range(symbols)]
+    feeds = {name: CandleFeed(name, timeframe_ms, 7) for name in names}
+    buffers = {name: CandleBuffer(300) for name in names}
+
+    if mode == 'dataframe':
+        import pandas as pd
+        import pandas_ta_classic as ta
+
+    ticks = int(days * 86400 / check_interval)
+    sample_every = max(1, ticks // samples)
+    now_ms = 1700000000000
+    history = []
+
+    tracemalloc.start()
+    for tick in range(ticks):
+        now_ms += check_interval * 1000
+        for name in names:
+            feed = feeds[name]
+            feed.tick(now_ms)
+            if mode == 'buffer':
+                buffer = buffers[name]
+                bars = feed.fetch_ohlcv(buffer.fetch_limit(now_ms, timeframe_ms))
+                buffer.update(bars)
+            else:
+                df = pd.DataFrame(feed.fetch_ohlcv(100), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                df['ema_20'] = ta.ema(df['close'], length=20)
+                df['rsi'] = ta.rsi(df['close'], length=14)
+                df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=14)
+
+        if tick % sample_every == 0:
+            traced, _ = tracemalloc.get_traced_memory()
+            history.append((tick * check_interval / 3600.0, rss_kib(), traced // 1024))
+    tracemalloc.stop()
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory soak test for candle ring buffers')
+    parser.add_argument('--mode', choices=['buffer', 'dataframe'], default='buffer')
+    parser.add_argument('--days', type=float, default=3)
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--check-interval', type=int, default=60)
+    parser.add_argument('--timeframe', default='5m')
+    parser.add_argument('--samples', type=int, default=24)
+    parser.add_argument('--max-growth-kib', type=int, default=512, help='Allowed traced-memory growth after warm-up')
+    args = parser.parse_args()
+
+    history = run(args.mode, args.days, args.symbols, args.check_interval, args.timeframe, args.samples)
+
+    print(f"{'Hours':>8} {'RSS KiB':>12} {'Traced KiB':>12}")
+    for hours, rss, traced in history:
+        print(f"{hours:>8.1f} {rss:>12} {traced:>12}")
+
+    # Skip the first quarter: buffers are still filling and imports settle
+    steady = history[len(history) // 4:]
+    growth = steady[-1][2] - steady[0][2]
+    rss_growth = steady[-1][1] - steady[0][1]
+    print(f"\nSteady-state growth: traced {growth} KiB, RSS {rss_growth} KiB")
+    if growth > args.max_growth_kib:
+        print(f"❌ Traced memory grew more than {args.max_growth_kib} KiB")
+        return 1
+    print("✅ Memory flat")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
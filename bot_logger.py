@@ -0,0 +1,196 @@
+"""
+Bot Logger
+Leveled, structured logging for the trading loop. Log calls only put a record on a queue;
+a background thread formats and writes the records, one write and flush per batch instead of
+per line (cheap even with PYTHONUNBUFFERED=1). Repetitive per-tick lines are rate limited per
+key, while order and exit events are always written.
+
+    log = setup_logging(clock=clock)
+    log.info("[ETH] 🔒 Stop moved to breakeven")                     # Normal leveled line
+    tick(log, 'status:ETH/USD', "[ETH] Price: ...")                  # At most once per tick interval
+    event(log, 'order', "[ETH] ✅ Order executed", symbol='ETH/USD')  # Never dropped
+
+Modules log through children of the 'bot' logger (logging.getLogger('bot.reconcile')).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler
+
+LOGGER_NAME = 'bot'
+
+_writer = None
+_rate_limiter = None
+
+
+class TickRateLimiter:
+    """Let each tick key through at most once per `interval` seconds"""
+
+    def __init__(self, interval, clock=time):
+        self.interval = interval  # 0 = no rate limit
+        self.clock = clock        # Virtual clock in replay, so limits follow simulated time
+        self.suppressed = 0
+        self._last = {}
+        self._pending = {}        # key -> lines dropped since the key was last written
+
+    def allow(self, key):
+        """None if the line should be dropped, else how many were dropped since the last one"""
+        if self.interval <= 0:
+            return 0
+        now = self.clock.time()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self.suppressed += 1
+            return None
+        self._last[key] = now
+        return self._pending.pop(key, 0)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, account=None):
+        prefix = f'[{account}] ' if account else ''  # Several accounts share one output under supervisor.py
+        super().__init__(f'%(asctime)s %(levelname)-7s {prefix}%(message)s', '%Y-%m-%d %H:%M:%S')
+
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, 'suppressed', 0):
+            line += f" (+{record.suppressed} similar suppressed)"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg plus account, event, symbol and extra fields"""
+
+    def __init__(self, account=None):
+        super().__init__()
+        self.account = account
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if self.account:
+            entry['account'] = self.account
+        for key in ('event', 'symbol', 'suppressed'):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        entry.update(getattr(record, 'fields', None) or {})
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class QueueWriter:
+    """Background thread that drains the log queue and writes whole batches to a stream"""
+
+    _STOP = object()
+
+    def __init__(self, log_queue, stream, formatter, max_batch=500):
+        self.queue = log_queue
+        self.stream = stream
+        self.formatter = formatter
+        self.max_batch = max_batch
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Write everything still queued, then end the thread"""
+        if self._thread and self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while batch[-1] is not self._STOP and len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is self._STOP
+            lines = []
+            for record in batch:
+                if record is self._STOP:
+                    continue
+                try:
+                    lines.append(self.formatter.format(record))
+                except Exception as e:
+                    lines.append(f"Log formatting failed: {e}")
+            if lines:
+                try:
+                    self.stream.write('\n'.join(lines) + '\n')
+                    self.stream.flush()
+                except Exception:
+                    pass  # Nowhere left to report it
+            if stop:
+                return
+
+
+def setup_logging(level=None, fmt=None, tick_interval=None, clock=time, stream=None):
+    """Send the 'bot' logger (and its children) through a queue to a background writer.
+
+    Defaults come from TRADING_LOG_LEVEL, TRADING_LOG_FORMAT (text/json) and
+    TRADING_LOG_TICK_INTERVAL. Calling it again only updates the rate limiter's clock.
+    """
+    global _writer, _rate_limiter
+    logger = logging.getLogger(LOGGER_NAME)
+    if _writer is not None:
+        _rate_limiter.clock = clock
+        return logger
+
+    level = (level or os.getenv('TRADING_LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('TRADING_LOG_FORMAT', 'text')).lower()
+    if tick_interval is None:
+        tick_interval = float(os.getenv('TRADING_LOG_TICK_INTERVAL', '300'))
+
+    log_queue = queue.SimpleQueue()
+    _rate_limiter = TickRateLimiter(tick_interval, clock)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+    account = os.getenv('TRADING_ACCOUNT')
+    formatter = JsonFormatter(account) if fmt == 'json' else TextFormatter(account)
+    _writer = QueueWriter(log_queue, stream or sys.stdout, formatter).start()
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records (registered with atexit by setup_logging)"""
+    if _writer is not None:
+        _writer.stop()
+
+
+def suppressed_count():
+    """Per-tick lines dropped by the rate limiter so far"""
+    return _rate_limiter.suppressed if _rate_limiter else 0
+
+
+def tick(logger, key, msg, level=logging.INFO, symbol=None, **fields):
+    """Log a repetitive per-tick line, rate limited per `key` (dropped lines cost no log record)"""
+    if not logger.isEnabledFor(level):
+        return
+    suppressed = _rate_limiter.allow(key) if _rate_limiter else 0
+    if suppressed is None:
+        return
+    logger.log(level, msg, extra={'suppressed': suppressed, 'symbol': symbol, 'fields': fields})
+
+
+def event(logger, kind, msg, level=logging.INFO, symbol=None, **fields):
+    """Log an order/exit event: written regardless of the configured level, never rate limited"""
+    record = logger.makeRecord(logger.name, level, '(event)', 0, msg, None, None,
+                               extra={'event': kind, 'symbol': symbol, 'fields': fields})
+    logger.handle(record)
@@ -0,0 +1,228 @@
+"""
+Candle Ring Buffer
+Fixed-size, preallocated per-symbol candle history with incrementally updated indicators.
+New candles are written in place, so steady-state ticks allocate (almost) nothing.
+
+Indicators match the pandas_ta_classic defaults used by analyze_market():
+  ema_20       EMA(20) seeded with the SMA of the first 20 closes
+  rsi          RSI(14) with SMA-seeded Wilder (RMA) smoothing
+  atr          ATR(14) with SMA-seeded Wilder (RMA) smoothing
+  ema_slope    ema_20 minus ema_20 five candles ago
+  volume_ma    20-candle simple moving average of volume
+  volume_ratio volume / volume_ma
+"""
+import math
+
+import numpy as np
+
+EMA_LENGTH = 20
+RSI_LENGTH = 14
+ATR_LENGTH = 14
+SLOPE_PERIODS = 5
+VOLUME_MA_LENGTH = 20
+
+CANDLE_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+INDICATOR_FIELDS = ('ema_20', 'rsi', 'atr', 'ema_slope', 'volume_ma', 'volume_ratio')
+
+_TIMEFRAME_UNITS_MS = {'m': 60000, 'h': 3600000, 'd': 86400000, 'w': 604800000}
+
+
+def timeframe_to_ms(timeframe):
+    """Convert a ccxt timeframe string ('5m', '1h', '1d') to milliseconds"""
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS_MS[timeframe[-1]]
+
+
+class CandleBuffer:
+    """Ring buffer of OHLCV candles for one symbol, with indicators updated per candle"""
+
+    def __init__(self, capacity=300):
+        self.capacity = capacity
+        self.timestamp = np.zeros(capacity, dtype=np.int64)
+        for name in CANDLE_FIELDS[1:] + INDICATOR_FIELDS:
+            setattr(self, name, np.full(capacity, np.nan))
+        self.size = 0    # Candles stored (<= capacity)
+        self.head = -1   # Slot of the latest candle (may still be forming)
+        self.row = {name: math.nan for name in CANDLE_FIELDS + INDICATOR_FIELDS}  # Latest values, updated in place
+
+        # Indicator state through the last *closed* candle
+        self._count = 0
+        self._close_sum = 0.0
+        self._ema = math.nan
+        self._prev_close = math.nan
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._tr_sum = 0.0
+        self._avg_gain = math.nan
+        self._avg_loss = math.nan
+        self._atr = math.nan
+
+        # Provisional state including the latest (forming) candle, committed when the next candle opens
+        self._p_close_sum = 0.0
+        self._p_ema = math.nan
+        self._p_gain_sum = 0.0
+        self._p_loss_sum = 0.0
+        self._p_tr_sum = 0.0
+        self._p_avg_gain = math.nan
+        self._p_avg_loss = math.nan
+        self._p_atr = math.nan
+
+    @property
+    def empty(self):
+        return self.size == 0
+
+    @property
+    def last_timestamp(self):
+        return int(self.timestamp[self.head]) if self.size else 0
+
+    def fetch_limit(self, now_ms, timeframe_ms, initial=100):
+        """Number of candles to request so the buffer has no gap (includes the forming candle)"""
+        if not self.size:
+            return initial
+        missing = (now_ms - self.last_timestamp) // timeframe_ms + 1
+        return int(max(2, min(missing + 1, self.capacity)))
+
+    def update(self, bars):
+        """Write OHLCV bars (ccxt format, oldest first) into the buffer"""
+        for bar in bars:
+            ts = int(bar[0])
+            if self.size:
+                last_ts = self.timestamp[self.head]
+                if ts < last_ts:
+                    continue  # Already committed
+                if ts > last_ts:
+                    self._commit()
+                    self.head = (self.head + 1) % self.capacity
+                    self.size = min(self.size + 1, self.capacity)
+            else:
+                self.head = 0
+                self.size = 1
+            slot = self.head
+            self.timestamp[slot] = ts
+            self.open[slot] = bar[1]
+            self.high[slot] = bar[2]
+            self.low[slot] = bar[3]
+            self.close[slot] = bar[4]
+            self.volume[slot] = bar[5]
+            self._compute(slot)
+        if self.size:
+            self._refresh_row()
+        return self
+
+    def _commit(self):
+        self._count += 1
+        self._close_sum = self._p_close_sum
+        self._ema = self._p_ema
+        self._prev_close = float(self.close[self.head])
+        self._gain_sum = self._p_gain_sum
+        self._loss_sum = self._p_loss_sum
+        self._tr_sum = self._p_tr_sum
+        self._avg_gain = self._p_avg_gain
+        self._avg_loss = self._p_avg_loss
+        self._atr = self._p_atr
+
+    def _compute(self, slot):
+        close = float(self.close[slot])
+        high = float(self.high[slot])
+        low = float(self.low[slot])
+        count = self._count + 1
+
+        # EMA(20), seeded with the SMA of the first 20 closes
+        if count < EMA_LENGTH:
+            self._p_close_sum = self._close_sum + close
+            self._p_ema = math.nan
+        elif count == EMA_LENGTH:
+            self._p_close_sum = self._close_sum + close
+            self._p_ema = self._p_close_sum / EMA_LENGTH
+        else:
+            self._p_ema = self._ema + (close - self._ema) * (2.0 / (EMA_LENGTH + 1))
+        self.ema_20[slot] = self._p_ema
+
+        prev_close = self._prev_close
+        if math.isnan(prev_close):
+            self._p_avg_gain = self._p_avg_loss = self._p_atr = math.nan
+            self.rsi[slot] = math.nan
+            self.atr[slot] = math.nan
+        else:
+            # Price changes seen so far, including this candle
+            changes = self._count
+
+            # RSI(14), Wilder smoothing seeded with the SMA of the first 14 gains/losses
+            change = close - prev_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            if changes <= RSI_LENGTH:
+                self._p_gain_sum = self._gain_sum + gain
+                self._p_loss_sum = self._loss_sum + loss
+                if changes == RSI_LENGTH:
+                    self._p_avg_gain = self._p_gain_sum / RSI_LENGTH
+                    self._p_avg_loss = self._p_loss_sum / RSI_LENGTH
+                else:
+                    self._p_avg_gain = self._p_avg_loss = math.nan
+            else:
+                alpha = 1.0 / RSI_LENGTH
+                self._p_avg_gain = self._avg_gain + (gain - self._avg_gain) * alpha
+                self._p_avg_loss = self._avg_loss + (loss - self._avg_loss) * alpha
+            total = self._p_avg_gain + self._p_avg_loss
+            self.rsi[slot] = 100.0 * self._p_avg_gain / total if total > 0 else math.nan
+
+            # ATR(14), Wilder smoothing of the true range seeded with its first 14-candle SMA
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            if changes <= ATR_LENGTH:
+                self._p_tr_sum = self._tr_sum + true_range
+                self._p_atr = self._p_tr_sum / ATR_LENGTH if changes == ATR_LENGTH else math.nan
+            else:
+                self._p_atr = self._atr + (true_range - self._atr) / ATR_LENGTH
+            self.atr[slot] = self._p_atr
+
+        if self.size > SLOPE_PERIODS:
+            self.ema_slope[slot] = self._p_ema - self.ema_20[(slot - SLOPE_PERIODS) % self.capacity]
+        else:
+            self.ema_slope[slot] = math.nan
+
+        if self.size >= VOLUME_MA_LENGTH:
+            volume_ma = self._window_sum(self.volume, slot, VOLUME_MA_LENGTH) / VOLUME_MA_LENGTH
+            self.volume_ma[slot] = volume_ma
+            self.volume_ratio[slot] = self.volume[slot] / volume_ma if volume_ma > 0 else math.nan
+        else:
+            self.volume_ma[slot] = math.nan
+            self.volume_ratio[slot] = math.nan
+
+    def _window_sum(self, array, end_slot, length):
+        # Sum of the `length` slots ending at end_slot, using views (no copies)
+        start = end_slot - length + 1
+        if start >= 0:
+            return float(array[start:end_slot + 1].sum())
+        return float(array[start % self.capacity:].sum() + array[:end_slot + 1].sum())
+
+    def _refresh_row(self):
+        slot = self.head
+        row = self.row
+        row['timestamp'] = int(self.timestamp[slot])
+        for name in CANDLE_FIELDS[1:] + INDICATOR_FIELDS:
+            row[name] = float(getattr(self, name)[slot])
+
+    def get_state(self):
+        """(arrays, scalars) describing the buffer completely - see set_state()"""
+        arrays = {name: getattr(self, name) for name in CANDLE_FIELDS + INDICATOR_FIELDS}
+        scalars = {name: value for name, value in vars(self).items() if isinstance(value, (int, float))}
+        return arrays, scalars
+
+    def set_state(self, arrays, scalars):
+        """Restore a buffer saved with get_state() (same capacity), e.g. after a restart"""
+        if int(scalars['capacity']) != self.capacity:
+            raise ValueError(f"snapshot capacity {scalars['capacity']} != buffer capacity {self.capacity}")
+        for name in CANDLE_FIELDS + INDICATOR_FIELDS:
+            getattr(self, name)[:] = arrays[name]
+        for name, value in scalars.items():
+            setattr(self, name, value)
+        if self.size:
+            self._refresh_row()
+        return self
+
+    def ordered(self, name):
+        """Chronological copy of one column (oldest first)"""
+        array = getattr(self, name)
+        if self.size < self.capacity:
+            return array[:self.size].copy()
+        start = (self.head + 1) % self.capacity
+        return np.concatenate((array[start:], array[:start]))
@@ -2,17 +2,13 @@
 """
 Check which coins in your portfolio are tradable on Coinbase
 """
-import ccxt
+from exchange_client import create_exchange, load_credentials
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-api_key = os.getenv('COINBASE_API_KEY')
-api_secret = os.getenv('COINBASE_API_SECRET')
-
-if api_secret and '\\n' in api_secret:
-    api_secret = api_secret.replace('\\n', '\n')
+api_key, api_secret, _ = load_credentials()  # Secret \n literals are converted to newlines
 
 if not api_key or not api_secret:
     print("❌ Error: API credentials not found")
@@ -24,12 +20,7 @@ print("=" * 70)
 print()
 
 try:
-    exchange = ccxt.coinbaseadvanced({
-        'apiKey': api_key,
-        'secret': api_secret,
-        'enableRateLimit': True,
-        'sandbox': False,
-    })
+    exchange = create_exchange(api_key, api_secret)
     
     exchange.load_markets()
     print(f"✅ Connected! Loaded {len(exchange.markets)} markets\n")
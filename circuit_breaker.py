@@ -0,0 +1,135 @@
+"""
+Circuit Breakers
+Stops calling an exchange endpoint that keeps failing, instead of retrying it for every symbol
+on every tick during an outage.
+
+    closed      calls go through; `threshold` consecutive failures open the breaker
+    open        calls are skipped until a backoff delay has passed (doubles with every
+                reopening up to max_delay, randomly shortened by up to `jitter`)
+    half-open   one probe call is let through: success closes the breaker, failure reopens it
+
+Only errors in `trips` (e.g. ccxt.NetworkError: timeouts, 5xx, rate limits) count as failures.
+Any other error - insufficient funds, invalid order - means the endpoint answered, so it
+counts as a success.
+
+Breakers are keyed by endpoint and, optionally, symbol, so a failing order endpoint for one
+symbol never holds back exits for the others.
+"""
+import logging
+import random
+import time
+
+from bot_logger import event
+
+log = logging.getLogger('bot.breaker')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """State of one endpoint (or endpoint + symbol)"""
+
+    def __init__(self, name, threshold=3, base_delay=5.0, max_delay=300.0, jitter=0.5, clock=time, rng=random):
+        self.name = name
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng
+        self.state = CLOSED
+        self.failures = 0       # Consecutive failures
+        self.opens = 0          # Times opened since the last close (drives the backoff)
+        self.retry_at = 0.0     # Open: when the next probe is allowed
+        self.probe_started = None
+        self.skipped = 0        # Calls refused while open
+        self.last_error = None
+
+    def allow(self):
+        """True if a call may be made now (in half-open state: only the one probe)"""
+        if self.state == CLOSED:
+            return True
+        now = self.clock.time()
+        if self.state == OPEN and now >= self.retry_at:
+            self.state = HALF_OPEN
+            self.probe_started = now
+            return True
+        if self.state == HALF_OPEN and now - self.probe_started >= self.base_delay:
+            self.probe_started = now  # The probe never reported back - let another one through
+            return True
+        self.skipped += 1
+        return False
+
+    def success(self):
+        if self.state != CLOSED:
+            event(log, 'breaker', f"✅ Circuit {self.name} closed - endpoint is answering again",
+                  breaker=self.name, state=CLOSED, opens=self.opens)
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.probe_started = None
+
+    def failure(self, error):
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.opens += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.opens - 1))
+            delay *= 1 - self.jitter * self.rng.random()  # Spread the probes of many breakers apart
+            self.state = OPEN
+            self.retry_at = self.clock.time() + delay
+            self.probe_started = None
+            event(log, 'breaker', f"🔌 Circuit {self.name} open for {delay:.0f}s after {self.failures} failures ({self.last_error})",
+                  level=logging.WARNING, breaker=self.name, state=OPEN, delay=round(delay, 1), failures=self.failures)
+
+    def snapshot(self):
+        return {'state': self.state, 'failures': self.failures, 'opens': self.opens, 'skipped': self.skipped,
+                'retry_in': round(max(0.0, self.retry_at - self.clock.time()), 1) if self.state == OPEN else None,
+                'last_error': self.last_error}
+
+
+class CircuitBreakers:
+    """All breakers of the bot, created on first use"""
+
+    def __init__(self, trips=(Exception,), threshold=3, base_delay=5.0, max_delay=300.0, jitter=0.5,
+                 max_delays=None, clock=time, rng=random, enabled=True):
+        self.trips = tuple(trips)
+        self.settings = {'threshold': threshold, 'base_delay': base_delay, 'max_delay': max_delay, 'jitter': jitter}
+        self.max_delays = dict(max_delays or {})  # Per-endpoint cap (e.g. shorter for orders)
+        self.clock = clock
+        self.rng = rng
+        self.enabled = enabled
+        self.breakers = {}
+
+    def get(self, endpoint, symbol=None):
+        name = f"{endpoint}:{symbol}" if symbol else endpoint
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            settings = dict(self.settings)
+            settings['max_delay'] = self.max_delays.get(endpoint, settings['max_delay'])
+            breaker = self.breakers[name] = CircuitBreaker(name, clock=self.clock, rng=self.rng, **settings)
+        return breaker
+
+    def allow(self, endpoint, symbol=None):
+        return not self.enabled or self.get(endpoint, symbol).allow()
+
+    def success(self, endpoint, symbol=None):
+        if self.enabled:
+            self.get(endpoint, symbol).success()
+
+    def failure(self, endpoint, error, symbol=None):
+        """Record a failed call; errors that aren't outages count as the endpoint answering"""
+        if not self.enabled:
+            return
+        if isinstance(error, self.trips):
+            self.get(endpoint, symbol).failure(error)
+        else:
+            self.get(endpoint, symbol).success()
+
+    def open_count(self):
+        return sum(1 for breaker in self.breakers.values() if breaker.state != CLOSED)
+
+    def snapshot(self):
+        return {name: breaker.snapshot() for name, breaker in self.breakers.items()}
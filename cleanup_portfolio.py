@@ -3,7 +3,8 @@
 Portfolio Cleanup Script
 Analyzes portfolio and sells small/irrelevant positions to USD for trading capital
 """
-import ccxt
+from exchange_client import create_exchange, load_credentials
+from valuation import fetch_price_graph
 import os
 from dotenv import load_dotenv
 from datetime import datetime
@@ -12,12 +13,7 @@ from datetime import datetime
 load_dotenv()
 
 # Get API credentials
-api_key = os.getenv('COINBASE_API_KEY')
-api_secret = os.getenv('COINBASE_API_SECRET')
-
-# Convert literal \n strings to actual newlines
-if api_secret and '\\n' in api_secret:
-    api_secret = api_secret.replace('\\n', '\n')
+api_key, api_secret, _ = load_credentials()  # Secret \n literals are converted to newlines
 
 if not api_key or not api_secret:
     print("❌ Error: API credentials not found")
@@ -38,15 +34,7 @@ print()
 try:
     # Connect to Coinbase
     print("🔌 Connecting to Coinbase Advanced Trade...")
-    exchange = ccxt.coinbaseadvanced({
-        'apiKey': api_key,
-        'secret': api_secret,
-        'enableRateLimit': True,
-        'sandbox': False,
-        'options': {
-            'createMarketBuyOrderRequiresPrice': False,
-        },
-    })
+    exchange = create_exchange(api_key, api_secret)
     
     exchange.load_markets()
     print(f"✅ Connected! Loaded {len(exchange.markets)} markets\n")
@@ -65,23 +53,11 @@ try:
     positions_to_keep = []
     total_usd_value = 0
     
-    # Get current prices for all currencies
+    # Get current prices for all currencies - one bulk ticker request, converted to USD
+    # through the shortest market path (e.g. XYZ/BTC → BTC/USD)
     print("📊 Fetching current prices...")
-    tickers = {}
-    for currency in balance.keys():
-        if currency in EXCLUDE_CURRENCIES:
-            continue
-        if isinstance(balance[currency], dict) and balance[currency].get('total', 0) > 0:
-            # Try to get price
-            pair = f"{currency}/USD"
-            if pair in exchange.markets:
-                try:
-                    ticker = exchange.fetch_ticker(pair)
-                    tickers[currency] = ticker['last']
-                except:
-                    pass
-    
-    print(f"✅ Fetched prices for {len(tickers)} currencies\n")
+    graph = fetch_price_graph(exchange)
+    print(f"✅ Fetched prices for {len(graph.prices)} currencies\n")
     
     # Analyze each position
     print("=" * 70)
@@ -107,30 +83,8 @@ try:
             continue
         
         # Get USD value
-        if currency in tickers:
-            price = tickers[currency]
-            usd_value = total * price
-        else:
-            # Try alternative pairs
-            usd_value = 0
-            price = 0
-            for base in ['BTC', 'ETH', 'USDC']:
-                pair = f"{currency}/{base}"
-                if pair in exchange.markets:
-                    try:
-                        ticker = exchange.fetch_ticker(pair)
-                        if base == 'BTC':
-                            btc_price = tickers.get('BTC', exchange.fetch_ticker('BTC/USD')['last'])
-                            price = ticker['last'] * btc_price
-                        elif base == 'ETH':
-                            eth_price = tickers.get('ETH', exchange.fetch_ticker('ETH/USD')['last'])
-                            price = ticker['last'] * eth_price
-                        else:
-                            price = ticker['last']
-                        usd_value = total * price
-                        break
-                    except:
-                        pass
+        price = graph.price(currency) or 0
+        usd_value = total * price
         
         # Format display
         if currency in ['USD', 'USDC']:
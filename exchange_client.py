@@ -0,0 +1,171 @@
+"""
+Shared Exchange Client
+Builds the Coinbase ccxt client for every script: credentials, sandbox/production selection,
+HTTP connection reuse (keep-alive), per-endpoint timeouts, JWT reuse and lazy market loading.
+"""
+import os
+import threading
+import time
+
+import ccxt
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+_shared_session = None
+
+
+def normalize_secret(api_secret):
+    """Convert literal \\n strings to actual newlines (common when storing multi-line secrets in .env)"""
+    if api_secret and '\\n' in api_secret:
+        return api_secret.replace('\\n', '\n')
+    return api_secret
+
+
+def load_credentials():
+    """Read API credentials from the environment. Returns (api_key, api_secret, api_passphrase)."""
+    api_key = os.getenv('COINBASE_API_KEY')
+    api_secret = normalize_secret(os.getenv('COINBASE_API_SECRET'))
+    api_passphrase = os.getenv('COINBASE_API_PASSPHRASE', '')
+    return api_key, api_secret, api_passphrase
+
+
+def endpoint_timeouts():
+    """Per-endpoint request timeouts in milliseconds (matched against the request URL path)"""
+    return [
+        ('/orders', int(os.getenv('COINBASE_ORDER_TIMEOUT_MS', '15000'))),           # Place / cancel / fetch orders
+        ('/products', int(os.getenv('COINBASE_MARKET_DATA_TIMEOUT_MS', '8000'))),    # Candles, tickers, order books
+        ('/accounts', int(os.getenv('COINBASE_ACCOUNT_TIMEOUT_MS', '10000'))),       # Balances
+    ]
+
+
+def get_session():
+    """HTTP session shared by every client in this process (keep-alive connection pool)"""
+    global _shared_session
+    if _shared_session is None:
+        session = Session()
+        pool_size = int(os.getenv('COINBASE_HTTP_POOL_SIZE', '32'))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        _shared_session = session
+    return _shared_session
+
+
+def resolve_exchange_class(use_sandbox=False):
+    """Pick the ccxt class for Coinbase (coinbaseadvanced was renamed to coinbase in newer ccxt)"""
+    advanced = getattr(ccxt, 'coinbaseadvanced', None) or getattr(ccxt, 'coinbase', None)
+    if use_sandbox:
+        return getattr(ccxt, 'coinbaseexchange', None) or advanced
+    return advanced or ccxt.coinbaseexchange
+
+
+_client_classes = {}
+
+
+def client_class(base):
+    """Subclass a ccxt exchange class with per-endpoint timeouts and JWT reuse"""
+    if base in _client_classes:
+        return _client_classes[base]
+
+    class CoinbaseClient(base):
+
+        # Set by create_exchange(). Coinbase JWTs are bound to one "METHOD host/path" and expire after
+        # 120 seconds, so a token can be reused for repeated calls to the same endpoint inside that window
+        endpoint_timeouts = []
+        jwt_reuse_seconds = 0
+        _default_timeout = getattr(base, 'timeout', 10000)
+
+        def __init__(self, config=None):
+            self._request = threading.local()   # Timeout of the request in progress, per thread
+            super().__init__(config or {})
+            self._jwt_cache = {}
+
+        @property
+        def timeout(self):
+            # ccxt reads self.timeout inside fetch(); the exit pool and backfill threads share this client
+            return getattr(self._request, 'timeout', None) or self._default_timeout
+
+        @timeout.setter
+        def timeout(self, value):
+            self._default_timeout = value
+
+        def fetch(self, url, method='GET', headers=None, body=None):
+            path = url.split('?', 1)[0]
+            self._request.timeout = next((timeout for fragment, timeout in self.endpoint_timeouts if fragment in path), None)
+            try:
+                return super().fetch(url, method, headers, body)
+            finally:
+                self._request.timeout = None
+
+        def create_auth_token(self, seconds, method=None, url=None, *args, **kwargs):
+            if self.jwt_reuse_seconds <= 0 or url is None:
+                return super().create_auth_token(seconds, method, url, *args, **kwargs)
+            key = (method, url.split('?', 1)[0], args)
+            cached = self._jwt_cache.get(key)
+            now = time.time()
+            if cached and cached[1] > now:
+                return cached[0]
+            token = super().create_auth_token(seconds, method, url, *args, **kwargs)
+            self._jwt_cache[key] = (token, now + self.jwt_reuse_seconds)
+            return token
+
+        def request(self, path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            try:
+                return super().request(path, api, method, params, headers, body, config)
+            except ccxt.AuthenticationError:
+                if not self._jwt_cache:
+                    raise
+                # Token reuse rejected - fall back to one JWT per request from now on
+                print("⚠️  Reused JWT was rejected - signing every request individually")
+                self._jwt_cache.clear()
+                self.jwt_reuse_seconds = 0
+                return super().request(path, api, method, params, headers, body, config)
+
+    CoinbaseClient.__name__ = f"{base.__name__}_client"
+    _client_classes[base] = CoinbaseClient
+    return CoinbaseClient
+
+
+def create_exchange(api_key=None, api_secret=None, api_passphrase=None, use_sandbox=False, load_markets=False, options=None):
+    """Build a configured Coinbase client.
+
+    Credentials default to the environment. Markets are loaded lazily (on the first call that
+    needs them) unless load_markets=True.
+    """
+    env_key, env_secret, env_passphrase = load_credentials()
+    api_key = api_key if api_key is not None else env_key
+    api_secret = normalize_secret(api_secret) if api_secret is not None else env_secret
+    api_passphrase = api_passphrase if api_passphrase is not None else env_passphrase
+
+    config = {
+        'apiKey': api_key,
+        'secret': api_secret,
+        'enableRateLimit': True,
+        'timeout': int(os.getenv('COINBASE_TIMEOUT_MS', '10000')),
+        'session': get_session(),
+        'options': {
+            'createMarketBuyOrderRequiresPrice': False,  # Coinbase Advanced Trade requires cost instead of amount
+        },
+    }
+    if options:
+        config['options'].update(options)
+    rate_limit_ms = int(os.getenv('COINBASE_RATE_LIMIT_MS', '0'))  # Read per call: each supervisor account can set its own budget
+    if rate_limit_ms > 0:
+        config['rateLimit'] = rate_limit_ms
+    config['sandbox'] = use_sandbox
+    if use_sandbox:
+        # Sandbox (coinbaseexchange) requires password field even if empty
+        config['password'] = api_passphrase or ''
+    elif api_passphrase:
+        # Only include password for production if provided (legacy Coinbase Pro)
+        config['password'] = api_passphrase
+
+    ExchangeClass = client_class(resolve_exchange_class(use_sandbox))
+    exchange = ExchangeClass(config)
+    # Read per call, like the rate limit, so .env and per-account values apply
+    exchange.endpoint_timeouts = endpoint_timeouts()
+    exchange.jwt_reuse_seconds = int(os.getenv('COINBASE_JWT_REUSE_SECONDS', '90'))
+    if load_markets:
+        exchange.load_markets()
+    return exchange
@@ -0,0 +1,263 @@
+"""
+Exchange Recorder
+Record every exchange call the bot makes (method, arguments, result or error, timestamps) to an
+append-only gzip JSON-lines file, and feed a recording back through a fake exchange so a
+production session can be re-run offline, profiled and stepped through at full speed.
+
+    exchange = RecordingExchange(exchange, 'sessions/bot.jsonl.gz', clock=clock)  # --record FILE
+    exchange = ReplayExchange('sessions/bot.jsonl.gz')                            # --replay-log FILE
+
+Calls are serialized in the calling thread and compressed/written on a background thread.
+Each run starts with a 'session' header line, so one file can hold many sessions; the file is
+a series of gzip members that gzip.open() reads back to back.
+"""
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+from paper_exchange import ReplayFinished, SimClock
+
+FORMAT_VERSION = 1
+SECRET_SUFFIXES = ('_KEY', '_SECRET', '_TOKEN', '_PASSWORD', '_PASSPHRASE')  # Settings never written to a recording
+
+
+def recorded_settings(environ):
+    """The TRADING_*/PAPER_* settings kept in a session header (secrets left out)"""
+    return {k: v for k, v in environ.items()
+            if k.startswith(('TRADING_', 'PAPER_')) and not k.endswith(SECRET_SUFFIXES)}
+
+
+class ReplayMismatch(Exception):
+    """The replayed bot made a call the recording has no answer for"""
+
+
+class RecordedError(Exception):
+    """Stand-in for a recorded exception whose class can't be recreated"""
+
+
+class _RecordWriter:
+    """Background thread appending JSON lines to a file as gzip members, about one per second.
+
+    Every batch is a complete gzip member, so a crash loses at most the last batch and a
+    later run can still append to the file.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path, flush_interval=1.0, max_batch_bytes=1 << 20):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'ab')
+        self.queue = queue.SimpleQueue()
+        self.flush_interval = flush_interval
+        self.max_batch_bytes = max_batch_bytes
+        self.thread = threading.Thread(target=self._run, name='exchange-recorder', daemon=True)
+        self.thread.start()
+
+    def write(self, line):
+        self.queue.put(line)
+
+    def close(self, timeout=10):
+        if self.thread.is_alive():
+            self.queue.put(self._STOP)
+            self.thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        size = 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                line = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                line = None
+            if line is not None and line is not self._STOP:
+                batch.append(line)
+                size += len(line)
+            if batch and (line is None or line is self._STOP or size >= self.max_batch_bytes
+                          or time.monotonic() >= deadline):
+                self.file.write(gzip.compress(b''.join(batch), compresslevel=6))
+                self.file.flush()
+                batch = []
+                size = 0
+            if line is None or time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if line is self._STOP:
+                break
+        self.file.close()
+
+
+class RecordingExchange:
+    """Transparent proxy that logs every public method call on the wrapped exchange"""
+
+    def __init__(self, exchange, path, clock=time, trading=False, flush_interval=1.0):
+        self._exchange = exchange
+        self._clock = clock
+        self._writer = _RecordWriter(path, flush_interval)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.path = path
+        self._write({
+            'type': 'session',
+            'version': FORMAT_VERSION,
+            't': clock.time(),
+            'exchange': getattr(exchange, 'id', type(exchange).__name__),
+            'has': dict(getattr(exchange, 'has', None) or {}),
+            'trading': trading,
+            'argv': sys.argv,
+            # Settings to compare against when the session is replayed
+            'config': recorded_settings(os.environ),
+        })
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def recorded(*args, **kwargs):
+            started = self._clock.time()
+            perf_start = time.perf_counter()
+            entry = {'type': 'call', 't': started, 'method': name, 'args': args, 'kwargs': kwargs}
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                entry['dt'] = time.perf_counter() - perf_start
+                entry['error'] = {'type': type(e).__name__, 'message': str(e)}
+                self._write(entry)
+                raise
+            entry['dt'] = time.perf_counter() - perf_start
+            entry['result'] = result
+            self._write(entry)
+            return result
+
+        return recorded
+
+    def _write(self, entry):
+        with self._lock:
+            self._seq += 1
+            entry['seq'] = self._seq
+            self._writer.write((json.dumps(entry, default=str, separators=(',', ':')) + '\n').encode())
+
+    def close(self):
+        self._writer.close()
+
+
+def read_sessions(path):
+    """All sessions in a recording: [(header, [call entries])]"""
+    sessions = []
+    with gzip.open(path, 'rt') as f:
+        try:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from a process killed mid-write
+                if entry.get('type') == 'session':
+                    sessions.append((entry, []))
+                elif sessions:
+                    sessions[-1][1].append(entry)
+        except (EOFError, OSError):
+            pass  # Truncated last member - keep everything before it
+    return sessions
+
+
+def _call_key(args, kwargs):
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+class ReplayExchange:
+    """Fake exchange answering calls from a recorded session on a virtual clock.
+
+    Each call is matched to the first unused recorded call of the same method with the same
+    arguments. Calls whose arguments changed (e.g. a different candle limit) fall back to the
+    next call with the same first argument (usually the symbol), then to the next call of the
+    method at all; these are counted in `mismatches`. The clock jumps to each matched call's
+    recorded time, so cooldowns and cache ages behave as they did live.
+    """
+
+    def __init__(self, path, session=-1, speed=0.0, lookahead=64):
+        sessions = read_sessions(path)
+        if not sessions:
+            raise ValueError(f"No recorded sessions in {path}")
+        self.header, calls = sessions[session]
+        self.has = self.header.get('has') or {}
+        self.id = self.header.get('exchange')
+        self.markets = {}
+        self.lookahead = lookahead
+        self.pending = defaultdict(deque)
+        for entry in calls:
+            self.pending[entry['method']].append(entry)
+        self.total = len(calls)
+        self.replayed = 0
+        self.mismatches = 0
+        start = calls[0]['t'] if calls else self.header['t']
+        self.clock = SimClock(start=start, speed=speed, until=calls[-1]['t'] if calls else start)
+
+    def config_differences(self, environ=None):
+        """{name: (recorded, current)} for TRADING_*/PAPER_* settings that differ from the recording"""
+        environ = os.environ if environ is None else environ
+        recorded = self.header.get('config') or {}
+        current = recorded_settings(environ)
+        return {k: (recorded.get(k), current.get(k)) for k in set(recorded) | set(current)
+                if recorded.get(k) != current.get(k)}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._replay(name, args, kwargs)
+
+    def _replay(self, method, args, kwargs):
+        entry = self._match(method, list(args), kwargs)
+        if entry['t'] > self.clock.time():
+            self.clock.advance(entry['t'] - self.clock.time())
+        self.replayed += 1
+        if 'error' in entry:
+            raise self._exception(entry['error'])
+        result = entry.get('result')
+        if method == 'load_markets' and isinstance(result, dict):
+            self.markets = result
+        return result
+
+    def _match(self, method, args, kwargs):
+        calls = self.pending.get(method)
+        if not calls:
+            if self.replayed >= self.total:
+                raise ReplayFinished()
+            raise ReplayMismatch(f"{method}{tuple(args)} was never called in the recorded session")
+        key = _call_key(args, kwargs)
+        window = min(len(calls), self.lookahead)
+        fallback = None
+        for i in range(window):
+            recorded = calls[i]
+            recorded_args = recorded.get('args') or []
+            if _call_key(recorded_args, recorded.get('kwargs') or {}) == key:
+                del calls[i]
+                return recorded
+            if fallback is None and args and recorded_args and recorded_args[0] == args[0]:
+                fallback = i
+        self.mismatches += 1
+        index = fallback if fallback is not None else 0
+        recorded = calls[index]
+        del calls[index]
+        return recorded
+
+    @staticmethod
+    def _exception(error):
+        try:
+            import ccxt
+            cls = getattr(ccxt, error['type'], None)
+            if isinstance(cls, type) and issubclass(cls, Exception):
+                return cls(error['message'])
+        except ImportError:
+            pass
+        return RecordedError(f"{error['type']}: {error['message']}")
+
+    def summary(self):
+        return {'calls': self.total, 'replayed': self.replayed, 'mismatches': self.mismatches,
+                'unused': sum(len(calls) for calls in self.pending.values())}
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Execution Analytics
+Timestamps every stage of an order, from the candles that produced the signal to the fill, and
+measures slippage of the fill against the signal price. Completed executions are aggregated
+by symbol, order type and exit reason (and optionally appended to a JSON-lines file) to show
+where execution speed costs money.
+
+Stages (clock time, seconds):
+    data          candles/prices the signal was computed from arrived
+    signal        entry/exit condition evaluated true
+    submitted     order request sent (after position sizing and book checks)
+    acknowledged  exchange answered with an order id
+    filled        order filled (order response, limit engine, or the exchange's fill time from a
+                  later order lookup - left empty when the exchange doesn't report one)
+
+Usage:
+    python execution_analytics.py logs/executions.jsonl                 # Aggregate a log file
+    python execution_analytics.py logs/executions.jsonl --by reason
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+STAGES = ('data', 'signal', 'submitted', 'acknowledged', 'filled')
+GROUPINGS = ('symbol', 'order_type', 'reason')
+
+
+def fill_timestamp(order):
+    """Exchange time of an order's last fill in seconds, or None if the order doesn't report it.
+    ccxt's coinbase parser leaves lastTradeTimestamp empty; the raw order has last_fill_time."""
+    last_trade = order.get('lastTradeTimestamp')
+    if last_trade:
+        return last_trade / 1000.0
+    last_fill = (order.get('info') or {}).get('last_fill_time')
+    if not last_fill:
+        return None
+    # e.g. 2024-05-01T12:00:00.123456789Z - fromisoformat wants +00:00 and at most 6 fraction digits
+    last_fill = re.sub(r'(\.\d{6})\d+', r'\1', last_fill.replace('Z', '+00:00'))
+    try:
+        return datetime.fromisoformat(last_fill).timestamp()
+    except ValueError:
+        return None
+
+
+def format_seconds(value):
+    return f"{value:.2f}s" if value is not None else '?'
+
+
+class Execution:
+    """One order from signal to fill"""
+
+    def __init__(self, symbol, side, signal_price, order_type, reason, signal_time, data_time=None):
+        self.symbol = symbol
+        self.side = side                  # 'buy' or 'sell'
+        self.signal_price = signal_price
+        self.order_type = order_type      # 'market', 'limit', 'limit+market' (deadline hit)
+        self.reason = reason              # 'entry' or the exit label
+        self.stamps = {'data': data_time, 'signal': signal_time}
+        self.order_id = None
+        self.fill_price = None
+        self.filled_amount = None
+        self.status = 'open'              # open, filled, failed, unknown (fill never found)
+        self.error = None
+        self.last_lookup = None
+
+    def latency(self, start='signal', end='filled'):
+        a, b = self.stamps.get(start), self.stamps.get(end)
+        return b - a if a is not None and b is not None else None
+
+    def slippage(self):
+        """Fill vs signal price as a fraction; positive = worse than the signal (paid more / got less)"""
+        if not self.fill_price or not self.signal_price:
+            return None
+        move = (self.fill_price - self.signal_price) / self.signal_price
+        return move if self.side == 'buy' else -move
+
+    def slippage_cost(self):
+        """Quote currency lost (positive) or gained vs filling at the signal price"""
+        slip = self.slippage()
+        if slip is None or not self.filled_amount:
+            return None
+        return slip * self.signal_price * self.filled_amount
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol, 'side': self.side, 'order_type': self.order_type, 'reason': self.reason,
+            'status': self.status, 'order_id': self.order_id, 'signal_price': self.signal_price,
+            'fill_price': self.fill_price, 'filled_amount': self.filled_amount, 'stamps': dict(self.stamps),
+            'signal_to_ack': self.latency('signal', 'acknowledged'), 'signal_to_fill': self.latency('signal', 'filled'),
+            'slippage': self.slippage(), 'slippage_cost': self.slippage_cost(), 'error': self.error,
+        }
+
+
+class ExecutionTracker:
+    """Collect Execution records and aggregate latency and slippage"""
+
+    def __init__(self, clock=time, log_path=None, on_complete=None, lookup_delay=2.0,
+                 lookup_interval=10.0, give_up_after=300.0, max_history=5000):
+        self.clock = clock
+        self.log_path = log_path                # Append completed executions as JSON lines
+        self.on_complete = on_complete          # on_complete(execution), e.g. to log it
+        self.lookup_delay = lookup_delay        # Seconds after acknowledgement before looking up a fill
+        self.lookup_interval = lookup_interval
+        self.give_up_after = give_up_after      # Stop looking up fills after this long
+        self.completed = deque(maxlen=max_history)
+        self.count = 0                          # Completed executions ever (the deque keeps the latest)
+        self.awaiting_fill = []                 # Acknowledged orders without a known fill price
+        self._summaries = {}                    # by -> (count, aggregate) cache
+        if log_path and os.path.dirname(log_path):
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+
+    def start(self, symbol, side, signal_price, order_type, reason, data_time=None):
+        """Signal fired: create the record (signal stamped now)"""
+        return Execution(symbol, side, signal_price, order_type, reason, self.clock.time(), data_time)
+
+    def submitted(self, execution):
+        execution.stamps['submitted'] = self.clock.time()
+
+    def acknowledged(self, execution, order=None, order_id=None, lookup=True):
+        """Order accepted. A response that already has the fill completes the record; otherwise
+        the fill is looked up later by poll() (lookup=False: the caller reports it, e.g. limit engine)."""
+        execution.stamps['acknowledged'] = self.clock.time()
+        order = order or {}
+        execution.order_id = order.get('id') or order_id
+        if order.get('status') == 'closed' and order.get('average'):
+            self.filled(execution, order['average'], order.get('filled'))
+        elif lookup and execution not in self.awaiting_fill:
+            self.awaiting_fill.append(execution)
+
+    def filled(self, execution, price, amount=None, t=None, stamp=True):
+        """Fill known: stamped at `t` (default now). stamp=False: the fill time is unknown."""
+        if stamp:
+            execution.stamps['filled'] = t if t is not None else self.clock.time()
+        execution.fill_price = float(price)
+        execution.filled_amount = float(amount) if amount else None
+        execution.status = 'filled'
+        self._complete(execution)
+
+    def failed(self, execution, error):
+        execution.status = 'failed'
+        execution.error = str(error)
+        self._complete(execution)
+
+    def poll(self, exchange):
+        """Look up fills for acknowledged orders whose response had none (one fetch_order per order)"""
+        now = self.clock.time()
+        for execution in list(self.awaiting_fill):
+            acknowledged = execution.stamps.get('acknowledged') or now
+            if now - acknowledged >= self.give_up_after or not execution.order_id:
+                execution.status = 'unknown'
+                self._complete(execution)
+                continue
+            if now - acknowledged < self.lookup_delay:
+                continue
+            if execution.last_lookup is not None and now - execution.last_lookup < self.lookup_interval:
+                continue
+            execution.last_lookup = now
+            try:
+                order = exchange.fetch_order(execution.order_id, execution.symbol)
+            except Exception:
+                continue
+            if order.get('average') and (order.get('status') == 'closed' or order.get('filled')):
+                # Our lookup time only bounds the fill (up to a whole check interval later), so it
+                # is never used as the fill time: without the exchange's, signal→fill stays empty
+                fill_time = fill_timestamp(order)
+                self.filled(execution, order['average'], order.get('filled'), t=fill_time, stamp=fill_time is not None)
+            elif order.get('status') in ('canceled', 'expired', 'rejected'):
+                self.failed(execution, f"order {order.get('status')}")
+
+    def _complete(self, execution):
+        if execution in self.awaiting_fill:
+            self.awaiting_fill.remove(execution)
+        self.completed.append(execution)
+        self.count += 1
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(execution.to_dict(), default=str) + '\n')
+            except OSError:
+                pass
+        if self.on_complete:
+            self.on_complete(execution)
+
+    def summary(self, by='symbol'):
+        cached = self._summaries.get(by)
+        if cached is None or cached[0] != self.count:
+            cached = self._summaries[by] = (self.count, aggregate([e.to_dict() for e in self.completed], by))
+        return cached[1]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def aggregate(records, by='symbol'):
+    """{group: stats} over completed execution dicts, grouped by symbol, order_type or reason"""
+    groups = defaultdict(list)
+    for record in records:
+        groups[record.get(by)].append(record)
+    result = {}
+    for group, items in sorted(groups.items(), key=lambda kv: str(kv[0])):
+        ack = [r['signal_to_ack'] for r in items if r.get('signal_to_ack') is not None]
+        fill = [r['signal_to_fill'] for r in items if r.get('signal_to_fill') is not None]
+        slip = [r['slippage'] for r in items if r.get('slippage') is not None]
+        cost = [r['slippage_cost'] for r in items if r.get('slippage_cost') is not None]
+        result[group] = {
+            'orders': len(items),
+            'filled': sum(1 for r in items if r.get('status') == 'filled'),
+            'failed': sum(1 for r in items if r.get('status') == 'failed'),
+            'signal_to_ack_median_s': statistics.median(ack) if ack else None,
+            'signal_to_fill_median_s': statistics.median(fill) if fill else None,
+            'signal_to_fill_p90_s': _percentile(fill, 90) if fill else None,
+            'slippage_mean_bps': statistics.mean(slip) * 10000 if slip else None,
+            'slippage_median_bps': statistics.median(slip) * 10000 if slip else None,
+            'slippage_cost': sum(cost) if cost else 0.0,
+        }
+    return result
+
+
+def format_table(stats, by):
+    def cell(value, fmt):
+        return format(value, fmt) if value is not None else '-'
+
+    lines = [f"{by:<18} {'Orders':>6} {'Fill':>5} {'Ack p50':>8} {'Fill p50':>9} {'Fill p90':>9} "
+             f"{'Slip avg':>9} {'Slip p50':>9} {'Slip cost':>10}",
+             '-' * 92]
+    for group, s in stats.items():
+        lines.append(f"{str(group):<18} {s['orders']:>6} {s['filled']:>5} {cell(s['signal_to_ack_median_s'], '>7.2f')}s "
+                     f"{cell(s['signal_to_fill_median_s'], '>8.2f')}s {cell(s['signal_to_fill_p90_s'], '>8.2f')}s "
+                     f"{cell(s['slippage_mean_bps'], '>6.1f')}bps {cell(s['slippage_median_bps'], '>6.1f')}bps "
+                     f"${s['slippage_cost']:>9.2f}")
+    return '\n'.join(lines)
+
+
+def load_log(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Signal-to-fill latency and slippage by symbol, order type and reason')
+    parser.add_argument('log', help='Executions JSON-lines file (TRADING_EXECUTION_LOG)')
+    parser.add_argument('--by', choices=GROUPINGS, help='Only this grouping (default: all)')
+    args = parser.parse_args()
+
+    records = load_log(args.log)
+    if not records:
+        print(f"❌ No executions in {args.log}")
+        return 1
+    print(f"⏱️  {len(records)} executions from {args.log} (slippage: positive = worse than the signal price)")
+    for by in ([args.by] if args.by else GROUPINGS):
+        print()
+        print(format_table(aggregate(records, by), by))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Health / State HTTP Endpoint
+Small HTTP server on a daemon thread for health checks and dashboards. The trading loop
+publishes an immutable snapshot dict once per iteration; request handlers only read the
+latest snapshot reference, so they never take a lock or touch the loop's live state.
+
+  GET /health   200 if the loop ran recently, 503 if it is stale (liveness)
+  GET /state    Full snapshot: positions, latest indicators, counters
+"""
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def finite(value):
+    """Copy of a snapshot with NaN/inf floats as None (json.dumps would write invalid JSON)"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite(item) for item in value]
+    return value
+
+
+class HealthServer:
+    """Serve the most recently published snapshot over HTTP"""
+
+    def __init__(self, port, host='0.0.0.0', stale_after=300):
+        self.port = port
+        self.host = host
+        self.stale_after = stale_after  # Seconds without a loop iteration before /health fails
+        self.started_at = time.time()
+        self._snapshot = {'status': 'starting', 'last_loop_time': None}
+        self._server = None
+
+    def publish(self, snapshot):
+        """Swap in a new snapshot (a fresh dict the caller no longer mutates)"""
+        self._snapshot = snapshot
+
+    def start(self):
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0].rstrip('/') or '/health'
+                if path == '/health':
+                    status, body = server_ref.health()
+                elif path == '/state':
+                    status, body = 200, server_ref._snapshot
+                else:
+                    status, body = 404, {'error': 'not found', 'paths': ['/health', '/state']}
+                payload = json.dumps(finite(body), default=str).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass  # Keep health check polling out of the bot's output
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        thread = threading.Thread(target=self._server.serve_forever, name='health-server', daemon=True)
+        thread.start()
+        return thread
+
+    def health(self):
+        snapshot = self._snapshot
+        now = time.time()
+        last_loop = snapshot.get('last_loop_time')
+        age = now - last_loop if last_loop else None
+        # Healthy while starting up (first iteration can take a while) and while iterations keep coming
+        if last_loop is None:
+            healthy = now - self.started_at < self.stale_after
+        else:
+            healthy = age < self.stale_after
+        body = {
+            'status': 'ok' if healthy else 'stale',
+            'uptime_s': round(now - self.started_at, 1),
+            'last_loop_time': last_loop,
+            'last_loop_age_s': round(age, 1) if age is not None else None,
+            'iteration': snapshot.get('iteration'),
+        }
+        return (200 if healthy else 503), body
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
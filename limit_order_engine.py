@@ -0,0 +1,272 @@
+"""
+Limit Order Engine
+Works limit (maker) orders without blocking the trading loop: each poll() checks fills,
+reprices orders that fell behind the market (amend, or cancel + replace) and converts
+whatever is still unfilled to a market order once the deadline passes.
+"""
+import logging
+import time
+
+import ccxt
+
+from bot_logger import event, tick
+
+log = logging.getLogger('bot.limit_orders')
+
+
+class ChasedOrder:
+    """State of one order being worked by the engine"""
+
+    def __init__(self, symbol, side, amount, price, now, deadline, on_done=None, tag=None):
+        self.symbol = symbol
+        self.side = side                # 'buy' or 'sell'
+        self.amount = amount            # Total base amount wanted
+        self.filled = 0.0               # Base amount filled by earlier (replaced) orders
+        self.cost = 0.0                 # Quote spent/received by earlier orders
+        self.order_id = None            # None between a cancel and the replacement being placed
+        self.order_filled = 0.0         # Filled on the current order
+        self.order_cost = 0.0
+        self.price = price              # Current limit price
+        self.deadline = deadline
+        self.last_reprice = now
+        self.reprices = 0
+        self.status = 'open'            # open, filled, market, canceled, failed
+        self.on_done = on_done
+        self.tag = tag                  # Caller's reference (e.g. its execution record)
+
+    @property
+    def total_filled(self):
+        return self.filled + self.order_filled
+
+    @property
+    def remaining(self):
+        return max(0.0, self.amount - self.total_filled)
+
+    @property
+    def average_price(self):
+        filled = self.total_filled
+        return (self.cost + self.order_cost) / filled if filled > 0 else None
+
+    @property
+    def done(self):
+        return self.status != 'open'
+
+
+class LimitOrderEngine:
+    """Track many limit orders at once and keep them near the market until filled"""
+
+    def __init__(self, exchange, offset_pct=0.001, reprice_interval=10, reprice_threshold_pct=0.001,
+                 timeout=60, min_amount=0.0, clock=time):
+        self.exchange = exchange
+        self.clock = clock                              # Anything with time() - the bot's SimClock in paper/replay mode
+        self.offset_pct = offset_pct                    # Limit price distance from the last price
+        self.reprice_interval = reprice_interval        # Seconds between timed reprices
+        self.reprice_threshold_pct = reprice_threshold_pct  # Reprice immediately if the target moves this much
+        self.timeout = timeout                          # Seconds before the remainder goes to market
+        self.min_amount = min_amount                    # Ignore remainders smaller than this
+        self.orders = {}                                # symbol -> ChasedOrder (one working order per symbol)
+        self._can_edit = bool(getattr(exchange, 'has', {}).get('editOrder'))
+
+    @property
+    def active(self):
+        return bool(self.orders)
+
+    def target_price(self, side, price):
+        return price * (1 - self.offset_pct) if side == 'buy' else price * (1 + self.offset_pct)
+
+    def submit(self, symbol, side, amount, price, on_done=None, tag=None):
+        """Place a limit order near `price` and start working it. Raises if placement fails."""
+        if symbol in self.orders:
+            self.cancel(symbol)
+        now = self.clock.time()
+        chase = ChasedOrder(symbol, side, amount, self.target_price(side, price), now, now + self.timeout, on_done, tag)
+        order = self._place(symbol, side, amount, chase.price)
+        chase.order_id = order.get('id')
+        self.orders[symbol] = chase
+        return chase
+
+    def get(self, symbol):
+        return self.orders.get(symbol)
+
+    def cancel(self, symbol):
+        """Stop working a symbol's order. Returns the ChasedOrder (with its final fills) or None."""
+        chase = self.orders.pop(symbol, None)
+        if chase is None:
+            return None
+        self._cancel_current(chase)
+        chase.status = 'canceled'
+        self._finish(chase)
+        return chase
+
+    def poll(self):
+        """Check fills, reprice and enforce deadlines for every working order"""
+        if not self.orders:
+            return
+        symbols = list(self.orders)
+        try:
+            tickers = self.exchange.fetch_tickers(symbols)
+        except Exception as e:
+            tick(log, 'limit_price_poll', f"⚠️  Limit engine price poll failed: {e}", level=logging.WARNING)
+            tickers = {}
+
+        now = self.clock.time()
+        for symbol in symbols:
+            chase = self.orders[symbol]
+            try:
+                self._work(chase, (tickers.get(symbol) or {}).get('last'), now)
+            except Exception as e:
+                log.warning(f"[{symbol.split('/')[0]}] ⚠️  Limit engine error: {e}")
+            if chase.done:
+                self.orders.pop(symbol, None)
+                self._finish(chase)
+
+    def _work(self, chase, last_price, now):
+        base_currency = chase.symbol.split('/')[0]
+        self._refresh(chase)
+        if chase.done:
+            return
+        if chase.remaining <= self.min_amount:
+            chase.status = 'filled'
+            event(log, 'order', f"[{base_currency}] ✅ Limit {chase.side} filled: {chase.total_filled:.6f} @ ${chase.average_price:.6f}",
+                  symbol=chase.symbol, side=chase.side, filled=chase.total_filled, average_price=chase.average_price)
+            return
+
+        if now >= chase.deadline:
+            self._cancel_current(chase)
+            self._to_market(chase, last_price or chase.price)
+            return
+
+        if not last_price:
+            return
+        target = self.target_price(chase.side, last_price)
+        moved = abs(target - chase.price) / chase.price
+        timed = now - chase.last_reprice >= self.reprice_interval and moved > 0
+        # No working order: the last replacement failed to place - try again
+        if (chase.order_id is None or moved >= self.reprice_threshold_pct or timed) and self._reprice(chase, target, now):
+            log.info(f"[{base_currency}] 🔁 Limit {chase.side} repriced to ${chase.price:.6f} "
+                     f"({chase.remaining:.6f} left, {max(0, chase.deadline - now):.0f}s to market)")
+
+    def _refresh(self, chase):
+        # Pull fills for the current order; a closed order means everything is filled
+        if chase.order_id is None:
+            return
+        order = self.exchange.fetch_order(chase.order_id, chase.symbol)
+        filled = order.get('filled')
+        if filled is not None:
+            chase.order_filled = float(filled)
+            chase.order_cost = float(order.get('cost') or chase.order_filled * (order.get('average') or chase.price))
+        status = order.get('status')
+        if status == 'closed':
+            if filled is None:
+                chase.order_filled = chase.amount - chase.filled
+                chase.order_cost = chase.order_filled * (order.get('average') or chase.price)
+            chase.status = 'filled'
+            event(log, 'order', f"[{chase.symbol.split('/')[0]}] ✅ Limit {chase.side} filled: {chase.total_filled:.6f}",
+                  symbol=chase.symbol, side=chase.side, filled=chase.total_filled)
+        elif status in ('canceled', 'expired', 'rejected'):
+            # Canceled outside the engine - treat the remainder like a missed deadline
+            chase.deadline = 0
+
+    def _reprice(self, chase, price, now):
+        """Move the order to `price` (amend, or cancel + replace). False if it is not working at `price`."""
+        base_currency = chase.symbol.split('/')[0]
+        if self._can_edit and chase.order_id is not None:
+            try:
+                order = self.exchange.edit_order(chase.order_id, chase.symbol, 'limit', chase.side,
+                                                 chase.amount - chase.filled, price)
+            except (ccxt.NotSupported, ccxt.InvalidOrder):
+                self._can_edit = False  # Amend not supported for this order/market - replace from now on
+            except Exception as e:
+                chase.last_reprice = now  # Keep the order where it is and try again after reprice_interval
+                tick(log, f'limit_edit:{chase.symbol}', f"[{base_currency}] ⚠️  Limit {chase.side} amend failed: {e}",
+                     level=logging.WARNING)
+                return False
+            else:
+                info = order.get('info') or {}
+                if info.get('success') is not False:
+                    chase.order_id = order.get('id') or chase.order_id
+                    chase.price = price
+                    chase.last_reprice = now
+                    chase.reprices += 1
+                    return True
+                # Coinbase reports a rejected edit in the response body instead of raising
+                log.warning(f"[{base_currency}] ⚠️  Limit {chase.side} amend rejected ({info.get('errors') or info}) - replacing it")
+        self._cancel_current(chase)
+        chase.last_reprice = now
+        if chase.remaining <= self.min_amount:
+            return False  # Filled while being canceled - the next poll completes it
+        try:
+            order = self._place(chase.symbol, chase.side, chase.remaining, price)
+        except Exception as e:
+            # Nothing is working now; the next poll places it again, or the deadline sends it to market
+            tick(log, f'limit_place:{chase.symbol}', f"[{base_currency}] ⚠️  Limit {chase.side} replacement not placed: {e}",
+                 level=logging.WARNING)
+            return False
+        chase.order_id = order.get('id')
+        chase.price = price
+        chase.reprices += 1
+        return True
+
+    def _to_market(self, chase, price):
+        base_currency = chase.symbol.split('/')[0]
+        remaining = chase.remaining
+        if remaining <= self.min_amount:
+            chase.status = 'filled'
+            return
+        event(log, 'order', f"[{base_currency}] ⏰ Limit {chase.side} deadline reached - sending {remaining:.6f} at market",
+              symbol=chase.symbol, side=chase.side, amount=remaining)
+        try:
+            if chase.side == 'buy':
+                # Coinbase market buys are sized by cost
+                order = self.exchange.create_market_buy_order(chase.symbol, remaining * price)
+            else:
+                order = self.exchange.create_market_sell_order(chase.symbol, remaining)
+            chase.filled += float(order.get('filled') or remaining)
+            chase.cost += float(order.get('cost') or remaining * price)
+            chase.status = 'market'
+            event(log, 'order', f"[{base_currency}] ✅ Market {chase.side} executed: {order.get('id', 'N/A')}",
+                  symbol=chase.symbol, side=chase.side, order_id=order.get('id'))
+        except Exception as e:
+            chase.status = 'failed'
+            event(log, 'order', f"[{base_currency}] ❌ Market {chase.side} fallback failed: {e}",
+                  level=logging.ERROR, symbol=chase.symbol, side=chase.side)
+
+    def _cancel_current(self, chase):
+        if chase.order_id is None:
+            return  # Nothing working (the last replacement was never placed)
+        try:
+            self.exchange.cancel_order(chase.order_id, chase.symbol)
+        except Exception:
+            pass  # Already filled or canceled - fills are picked up below
+        try:
+            self._refresh_fills_only(chase)
+        except Exception:
+            pass
+        self._bank_order_fills(chase)
+
+    def _refresh_fills_only(self, chase):
+        order = self.exchange.fetch_order(chase.order_id, chase.symbol)
+        if order.get('filled') is not None:
+            chase.order_filled = float(order['filled'])
+            chase.order_cost = float(order.get('cost') or chase.order_filled * (order.get('average') or chase.price))
+
+    def _bank_order_fills(self, chase):
+        # Move the current order's fills into the running totals and let go of the order, so its
+        # fills are never read again (even if the replacement fails to place)
+        chase.filled += chase.order_filled
+        chase.cost += chase.order_cost
+        chase.order_filled = 0.0
+        chase.order_cost = 0.0
+        chase.order_id = None
+
+    def _place(self, symbol, side, amount, price):
+        if side == 'buy':
+            return self.exchange.create_limit_buy_order(symbol, amount, price)
+        return self.exchange.create_limit_sell_order(symbol, amount, price)
+
+    def _finish(self, chase):
+        if chase.on_done:
+            try:
+                chase.on_done(chase)
+            except Exception as e:
+                log.warning(f"[{chase.symbol.split('/')[0]}] ⚠️  Limit order callback failed: {e}")
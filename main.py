@@ -1,4 +1,3 @@
-import ccxt
 import pandas as pd
 import pandas_ta_classic as ta
 import time
@@ -6,6 +5,9 @@ import sys
 import argparse
 import os
 from dotenv import load_dotenv
+from profiler import LoopProfiler
+from exchange_client import create_exchange
+from execution_analytics import ExecutionTracker, format_seconds
 
 # Load base .env file first (for shared config)
 load_dotenv()
@@ -19,6 +21,7 @@ risk_pct = float(os.getenv('TRADING_RISK_PCT', '0.20'))  # Invest 20% of account
 atr_multiplier = float(os.getenv('TRADING_ATR_MULTIPLIER', '1.5'))  # 1.5x Volatility Safety Net
 check_interval = int(os.getenv('TRADING_CHECK_INTERVAL', '60'))  # Check market every N seconds (default: 60)
 min_order_size = float(os.getenv('TRADING_MIN_ORDER_SIZE', '1.00'))  # Minimum order size in USD (Coinbase requires ~$1 minimum)
+execution_log = os.getenv('TRADING_EXECUTION_LOG', '')  # Append every order's signal-to-fill timings and slippage here (JSON lines)
 
 # --- API KEYS ---
 # Read from environment variables (recommended) or use hardcoded values as fallback
@@ -33,6 +36,7 @@ parser = argparse.ArgumentParser(description='Coinbase Trading Bot')
 parser.add_argument('--test', action='store_true', help='Run in test mode (single iteration, verbose output)')
 parser.add_argument('--sandbox', action='store_true', help='Use sandbox environment')
 parser.add_argument('--execute', action='store_true', help='Enable actual trade execution (use with caution!)')
+parser.add_argument('--profile', type=int, default=0, metavar='N', help='Profile the first N loop iterations (CPU + allocations)')
 args = parser.parse_args()
 
 # Determine if we should use sandbox
@@ -62,11 +66,9 @@ if not args.test:
         has_backslash_n = '\\n' in api_secret
         print(f"🔍 Debug: Contains \\n: {has_backslash_n}")
 
-# Convert literal \n strings to actual newlines (common when storing multi-line secrets in .env)
-if api_secret and '\\n' in api_secret:
-    api_secret = api_secret.replace('\\n', '\n')
-    if not args.test:
-        print(f"🔍 Debug: Converted \\n to actual newlines")
+# Literal \n strings in the secret are converted to actual newlines by create_exchange()
+if api_secret and '\\n' in api_secret and not args.test:
+    print(f"🔍 Debug: Converting \\n to actual newlines")
 
 # Validate API keys (passphrase is optional for Advanced Trade API)
 has_placeholder_keys = api_key == 'YOUR_API_KEY' or api_secret == 'YOUR_SECRET_KEY'
@@ -82,35 +84,8 @@ if args.test:
 
 # API SETUP
 try:
-    # Get the exchange class - Use coinbaseexchange for sandbox support, coinbaseadvanced for production
-    # Fallback chain ensures we get a valid exchange class even if one is missing
-    # Using OR operators similar to JavaScript implementation
-    if use_sandbox:
-        ExchangeClass = ccxt.coinbaseexchange or ccxt.coinbaseadvanced
-    else:
-        ExchangeClass = ccxt.coinbaseadvanced or ccxt.coinbaseexchange
-    
-    # Build exchange config
-    # Note: Sandbox (coinbaseexchange) requires password field even if empty
-    # Production (coinbaseadvanced) doesn't require it for Advanced Trade API
-    exchange_config = {
-        'apiKey': api_key,
-        'secret': api_secret,
-        'enableRateLimit': True,
-        'sandbox': use_sandbox,
-        'options': {
-            'createMarketBuyOrderRequiresPrice': False,  # Coinbase Advanced Trade requires cost instead of amount
-        },
-    }
-    # Sandbox requires password field (can be empty), production Advanced Trade doesn't need it
-    if use_sandbox:
-        # Always include password for sandbox, even if empty
-        exchange_config['password'] = api_passphrase if api_passphrase else ''
-    elif api_passphrase:
-        # Only include password for production if provided (legacy Coinbase Pro)
-        exchange_config['password'] = api_passphrase
-    
-    exchange = ExchangeClass(exchange_config)
+    # Shared client: sandbox/production class selection, keep-alive session, per-endpoint timeouts
+    exchange = create_exchange(api_key, api_secret, api_passphrase, use_sandbox=use_sandbox)
     # Check connection
     print(f"🔌 Connecting to {'SANDBOX' if use_sandbox else 'PRODUCTION'}...")
     exchange.load_markets()
@@ -365,9 +340,29 @@ def get_position_size(current_price):
         print(f"Balance Error: {e}")
         return 0, 0
 
+# Profiling is idle unless requested with --profile N or SIGUSR1 (kill -USR1 <pid>)
+profiler = LoopProfiler('main',
+                        output_dir=os.getenv('TRADING_PROFILE_DIR', 'profiles'),
+                        signal_iterations=int(os.getenv('TRADING_PROFILE_ITERATIONS', '10')))
+profiler.install_signal_handler()
+if args.profile > 0:
+    profiler.request(args.profile)
+
+def print_execution(execution):
+    if execution.status != 'filled':
+        print(f"⏱️  {execution.side} ({execution.reason}) {execution.status}: {execution.error or 'fill price unknown'}")
+        return
+    print(f"⏱️  {execution.side} ({execution.reason}) signal→ack {format_seconds(execution.latency('signal', 'acknowledged'))}, "
+          f"signal→fill {format_seconds(execution.latency('signal', 'filled'))}, slippage {execution.slippage() * 10000:+.1f} bps")
+
+# Signal-to-fill latency and slippage of every order placed
+tracker = ExecutionTracker(log_path=execution_log or None, on_complete=print_execution)
+
 # --- MAIN LOOP ---
 while True:
+    profiler.tick()
     df = fetch_data()
+    data_time = time.time()
     if not df.empty:
         row = analyze_market(df)
         price = row['close']
@@ -381,6 +376,7 @@ while True:
         if not in_position:
             # Trend Filter: Price > EMA 20 AND RSI > 50
             if price > ema_20 and rsi > 50:
+                execution = tracker.start(symbol, 'buy', price, 'market', 'entry', data_time)
                 amount, cost = get_position_size(price)
                 
                 # Check if order meets minimum size requirement
@@ -395,12 +391,15 @@ while True:
                     print(f"🚀 ENTER LONG: Buying {amount:.6f} {base_currency} (Cost: ${cost:.2f})")
                     
                     if enable_trading:
+                        tracker.submitted(execution)
                         try:
                             # Coinbase Advanced Trade requires cost (USD) instead of amount (base currency) for market buys
                             order = exchange.create_market_buy_order(symbol, cost)  # Pass cost (USD) not amount
+                            tracker.acknowledged(execution, order)
                             print(f"✅ Order executed: {order.get('id', 'N/A')}")
                         except Exception as e:
                             print(f"❌ Order failed: {e}")
+                            tracker.failed(execution, e)
                             continue  # Skip position update if order failed
                     else:
                         print(f"   (Simulated - use --execute to enable real trading)")
@@ -421,11 +420,15 @@ while True:
                 print(f"🚨 STOP LOSS TRIGGERED at ${price:.2f}")
                 
                 if enable_trading:
+                    execution = tracker.start(symbol, 'sell', price, 'market', 'Stop-loss', data_time)
+                    tracker.submitted(execution)
                     try:
                         order = exchange.create_market_sell_order(symbol, position_amount)
+                        tracker.acknowledged(execution, order)
                         print(f"✅ Sell order executed: {order.get('id', 'N/A')}")
                     except Exception as e:
                         print(f"❌ Sell order failed: {e}")
+                        tracker.failed(execution, e)
                 else:
                     print(f"   (Simulated - use --execute to enable real trading)")
                 
@@ -433,4 +436,6 @@ while True:
                 trailing_stop_price = 0.0
                 position_amount = 0.0
 
+    if tracker.awaiting_fill:
+        tracker.poll(exchange)  # Fill prices of market orders the exchange answered without one
     time.sleep(check_interval)  # Check every N seconds (configurable via TRADING_CHECK_INTERVAL)
\ No newline at end of file
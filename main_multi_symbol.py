@@ -9,8 +9,29 @@ import pandas_ta_classic as ta
 import time
 import sys
 import argparse
+import atexit
+import logging
 import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from profiler import LoopProfiler
+from candle_buffer import CandleBuffer, timeframe_to_ms
+from exchange_client import create_exchange
+from order_book import OrderBookCache
+from limit_order_engine import LimitOrderEngine
+from native_stops import NativeStopManager
+from trade_stream import TradeStream, create_stream_exchange
+from paper_exchange import SimClock, ReplayFeed, PaperExchange, ReplayFinished
+from exchange_recorder import RecordingExchange, ReplayExchange
+from market_data_hub import SharedMarketData
+from reconciler import PositionReconciler
+from health_server import HealthServer
+from symbol_scheduler import SymbolScheduler
+from bot_logger import setup_logging, suppressed_count, tick, event
+from execution_analytics import ExecutionTracker, GROUPINGS, format_seconds, format_table
+from circuit_breaker import CircuitBreakers
+from state_snapshot import MARKETS_MAX_AGE, encode_markets, load_snapshot, save_snapshot
 from datetime import datetime
 
 # Load base .env file first
@@ -33,6 +54,16 @@ min_trend_strength = float(os.getenv('TRADING_MIN_TREND_STRENGTH', '0.01'))  # M
 spike_reversal_pct = float(os.getenv('TRADING_SPIKE_REVERSAL_PCT', '0.02'))  # Sell if price drops 2.0% from peak (wider to avoid premature exits)
 min_spike_profit_pct = float(os.getenv('TRADING_MIN_SPIKE_PROFIT', '0.02'))  # Activate spike detection after 2.0% profit (let moves develop)
 cooldown_minutes = int(os.getenv('TRADING_COOLDOWN_MINUTES', '5'))  # Cooldown period after exit (avoid quick round trips)
+fast_exit_interval = int(os.getenv('TRADING_FAST_EXIT_INTERVAL', '5'))  # Poll open positions for exits every N seconds between full cycles (0 = off)
+use_candle_buffer = os.getenv('TRADING_CANDLE_BUFFER', 'false').lower() == 'true'  # Keep candles in preallocated ring buffers (incremental indicators)
+candle_buffer_size = int(os.getenv('TRADING_CANDLE_BUFFER_SIZE', '300'))  # Candles kept per symbol in buffer mode
+max_slippage_pct = float(os.getenv('TRADING_MAX_SLIPPAGE_PCT', '0.005'))  # Max estimated market-order slippage vs last price (0 = no book checks)
+order_book_depth = int(os.getenv('TRADING_ORDER_BOOK_DEPTH', '50'))  # Levels per side fetched for order book snapshots
+order_book_max_age = float(os.getenv('TRADING_ORDER_BOOK_MAX_AGE', '2'))  # Seconds before a cached order book is refreshed
+adaptive_cadence = os.getenv('TRADING_ADAPTIVE_CADENCE', 'false').lower() == 'true'  # Per-symbol check intervals from position risk and market state
+min_check_interval = int(os.getenv('TRADING_MIN_CHECK_INTERVAL', '15'))  # Adaptive cadence: fastest check (position near its stop)
+max_check_interval = int(os.getenv('TRADING_MAX_CHECK_INTERVAL', '300'))  # Adaptive cadence: slowest check (flat, sideways or in cooldown)
+log_tick_interval = float(os.getenv('TRADING_LOG_TICK_INTERVAL', '300'))  # Seconds between repeated status lines per symbol (0 = every tick)
 
 # --- API KEYS ---
 api_key = os.getenv('COINBASE_API_KEY', 'YOUR_API_KEY')
@@ -44,16 +75,28 @@ parser = argparse.ArgumentParser(description='Multi-Symbol Coinbase Trading Bot'
 parser.add_argument('--test', action='store_true', help='Run in test mode')
 parser.add_argument('--sandbox', action='store_true', help='Use sandbox environment')
 parser.add_argument('--execute', action='store_true', help='Enable actual trade execution')
+parser.add_argument('--profile', type=int, default=0, metavar='N', help='Profile the first N loop iterations (CPU + allocations)')
+parser.add_argument('--paper', action='store_true', help='Paper trading: live market data, simulated fills')
+parser.add_argument('--replay', metavar='DIR', help='Paper trading on historical candle CSVs from DIR (accelerated clock)')
+parser.add_argument('--speed', type=float, default=0, help='Replay speed vs real time (e.g. 1000); 0 = as fast as possible')
+parser.add_argument('--record', metavar='FILE', help='Record every exchange call and response to FILE (gzip JSON lines, appended)')
+parser.add_argument('--replay-log', metavar='FILE', help='Re-run a session recorded with --record (offline, virtual clock)')
+parser.add_argument('--replay-session', type=int, default=-1, metavar='N', help='Session in the --replay-log file (default: last)')
 args = parser.parse_args()
 
 use_sandbox = args.sandbox or args.test
-enable_trading = args.execute
+paper_trading = args.paper or bool(args.replay)
+enable_trading = args.execute or paper_trading  # Paper orders always go to the simulator
 
 # Load environment-specific .env file if it exists
 if use_sandbox and os.path.exists('.env.sandbox'):
     load_dotenv('.env.sandbox', override=True)
 elif not use_sandbox and os.path.exists('.env.production'):
     load_dotenv('.env.production', override=True)
+# Account settings when run by supervisor.py (accounts/<name>.env) win over the shared files
+account_env_file = os.getenv('TRADING_ACCOUNT_ENV_FILE')
+if account_env_file and os.path.exists(account_env_file):
+    load_dotenv(account_env_file, override=True)
 
 # Re-read API keys after loading environment-specific files
 api_key = os.getenv('COINBASE_API_KEY', 'YOUR_API_KEY')
@@ -67,40 +110,92 @@ symbols = [s.strip() for s in symbols_str.split(',')]
 # Re-read limit order settings
 use_limit_orders = os.getenv('TRADING_USE_LIMIT_ORDERS', 'false').lower() == 'true'
 limit_order_offset_pct = float(os.getenv('TRADING_LIMIT_ORDER_OFFSET', '0.001'))  # 0.1% offset
-
-# Convert literal \n strings to actual newlines
-if api_secret and '\\n' in api_secret:
-    api_secret = api_secret.replace('\\n', '\n')
+limit_reprice_interval = int(os.getenv('TRADING_LIMIT_REPRICE_INTERVAL', '10'))  # Reprice an unfilled limit order every N seconds
+limit_reprice_threshold = float(os.getenv('TRADING_LIMIT_REPRICE_THRESHOLD', '0.001'))  # Reprice at once if the market moves 0.1%
+limit_order_timeout = int(os.getenv('TRADING_LIMIT_ORDER_TIMEOUT', '60'))  # Convert the unfilled rest to market after N seconds
+health_port = int(os.getenv('TRADING_HEALTH_PORT', os.getenv('PORT', '0')))  # HTTP /health and /state endpoint (0 = off; Railway sets PORT)
+reconcile_interval = int(os.getenv('TRADING_RECONCILE_INTERVAL', '300'))  # Check positions against balances every N seconds (0 = only after orders)
+execution_log = os.getenv('TRADING_EXECUTION_LOG', '')  # Append every order's signal-to-fill timings and slippage here (JSON lines)
+snapshot_file = os.getenv('TRADING_SNAPSHOT_FILE', '')  # Warm-start state (candles, indicators, positions, markets) saved here ('' = off)
+account = os.getenv('TRADING_ACCOUNT')  # Set by supervisor.py; a snapshot is only restored into the account that saved it
+snapshot_interval = int(os.getenv('TRADING_SNAPSHOT_INTERVAL', '60'))  # Seconds between state snapshots (one is also written on shutdown)
+breaker_threshold = int(os.getenv('TRADING_BREAKER_THRESHOLD', '3'))  # Consecutive exchange errors that open an endpoint's circuit (0 = off)
+breaker_base_delay = float(os.getenv('TRADING_BREAKER_BASE_DELAY', '5'))  # First wait before probing an open circuit (doubles per reopening)
+breaker_max_delay = float(os.getenv('TRADING_BREAKER_MAX_DELAY', '300'))  # Longest wait (order endpoints: at most 30s so exits retry soon)
+exit_workers = int(os.getenv('TRADING_EXIT_WORKERS', '8'))  # Exits triggered in the same iteration are sent this many at a time (1 = one by one)
+use_native_stops = os.getenv('TRADING_NATIVE_STOPS', 'false').lower() == 'true'  # Keep a stop-limit sell on the exchange for every open position
+native_stop_limit_offset = float(os.getenv('TRADING_NATIVE_STOP_LIMIT_OFFSET', '0.01'))  # Native stop's limit price this far below its trigger
+native_stop_min_move = float(os.getenv('TRADING_NATIVE_STOP_MIN_MOVE', '0.002'))  # Only amend a native stop once the local stop rose 0.2%
+native_stop_amend_interval = float(os.getenv('TRADING_NATIVE_STOP_AMEND_INTERVAL', '30'))  # ...and at most every N seconds per symbol
+use_trade_stream = os.getenv('TRADING_TRADE_STREAM', 'false').lower() == 'true'  # Spike detection on every trade (websocket) instead of polled prices
+momentum_window = float(os.getenv('TRADING_MOMENTUM_WINDOW', '10'))  # Seconds averaged by the trade stream's momentum
+stream_rearm_delay = float(os.getenv('TRADING_TRADE_STREAM_REARM_DELAY', '30'))  # Seconds a symbol stays unwatched after a trigger that didn't close it
 
 if args.test:
     print("🧪 TEST MODE ENABLED")
     print("=" * 60)
 
+# Paper trading settings (--paper / --replay)
+paper_settings = {
+    'balance': float(os.getenv('PAPER_START_BALANCE', '1000')),
+    'maker_fee': float(os.getenv('PAPER_MAKER_FEE', '0.004')),
+    'taker_fee': float(os.getenv('PAPER_TAKER_FEE', '0.006')),
+    'slippage_pct': float(os.getenv('PAPER_SLIPPAGE_PCT', '0.0005')),
+    'partial_fill_ratio': float(os.getenv('PAPER_PARTIAL_FILL_RATIO', '0.5')),
+    'latency_ms': int(os.getenv('PAPER_LATENCY_MS', '250')),
+}
+
+run_mode = 'replay' if args.replay else 'paper' if paper_trading else 'live' if enable_trading else 'dry-run'
+
+# Warm start: state saved by the previous run (never for replays - they run on their own clock)
+snapshots_enabled = bool(snapshot_file) and not (args.replay or args.replay_log)
+snapshot = load_snapshot(snapshot_file) if snapshots_enabled else None
+if snapshot and snapshot.meta.get('account') != account:
+    print(f"⚠️  State snapshot {snapshot_file} belongs to account {snapshot.meta.get('account') or '(none)'} - starting cold")
+    snapshot = None
+elif snapshot and (snapshot.meta.get('timeframe') != timeframe or snapshot.meta.get('sandbox') != use_sandbox):
+    print(f"⚠️  State snapshot {snapshot_file} is for another timeframe or environment - starting cold")
+    snapshot = None
+
 # API SETUP
 try:
-    if use_sandbox:
-        ExchangeClass = ccxt.coinbaseexchange or ccxt.coinbaseadvanced
+    if args.replay_log:
+        # Recorded session: every call is answered from the log on the recorded timeline
+        exchange = ReplayExchange(args.replay_log, session=args.replay_session, speed=args.speed)
+        clock = exchange.clock
+        enable_trading = bool(exchange.header.get('trading'))  # Same order path as the recorded run
+        print(f"⏪ Replaying {exchange.total} recorded exchange calls from {args.replay_log}...")
+        for name, (recorded, current) in sorted(exchange.config_differences().items()):
+            print(f"⚠️  {name} differs from the recording: {recorded!r} (recorded) vs {current!r} (now)")
+    elif args.replay:
+        # Historical candles on a virtual clock - no API connection needed
+        feed = ReplayFeed(args.replay, symbols, timeframe, speed=args.speed)
+        clock = feed.clock
+        exchange = PaperExchange(feed, clock, **paper_settings)
+        print(f"⏪ Replaying candles from {args.replay} ({'max speed' if args.speed <= 0 else f'{args.speed:g}x'})...")
     else:
-        ExchangeClass = ccxt.coinbaseadvanced or ccxt.coinbaseexchange
-    
-    exchange_config = {
-        'apiKey': api_key,
-        'secret': api_secret,
-        'enableRateLimit': True,
-        'sandbox': use_sandbox,
-        'options': {
-            'createMarketBuyOrderRequiresPrice': False,
-        },
-    }
-    
-    if use_sandbox:
-        exchange_config['password'] = api_passphrase if api_passphrase else ''
-    elif api_passphrase:
-        exchange_config['password'] = api_passphrase
-    
-    exchange = ExchangeClass(exchange_config)
-    print(f"🔌 Connecting to {'SANDBOX' if use_sandbox else 'PRODUCTION'}...")
-    exchange.load_markets()
+        clock = SimClock()  # Real time
+        exchange = create_exchange(api_key, api_secret, api_passphrase, use_sandbox=use_sandbox)
+        market_data_hub = os.getenv('TRADING_MARKET_DATA_HUB')
+        if market_data_hub:
+            # Candles, tickers and order books come from the supervisor's shared hub
+            host, port = market_data_hub.rsplit(':', 1)
+            exchange = SharedMarketData(exchange, (host, int(port)), bytes.fromhex(os.getenv('TRADING_MARKET_DATA_HUB_KEY', '')))
+            print(f"📡 Using shared market data from {market_data_hub}")
+        if args.paper:
+            exchange = PaperExchange(exchange, clock, **paper_settings)
+        print(f"🔌 Connecting to {'SANDBOX' if use_sandbox else 'PRODUCTION'}...")
+    if args.record:
+        exchange = RecordingExchange(exchange, args.record, clock=clock, trading=enable_trading)
+        atexit.register(exchange.close)
+        print(f"🎙️  Recording exchange traffic to {args.record}")
+    saved_markets = (snapshot.markets() if snapshot and not args.record and hasattr(exchange, 'set_markets')
+                     and clock.time() - snapshot.meta['saved_at'] < MARKETS_MAX_AGE else None)
+    if saved_markets:
+        exchange.set_markets(*saved_markets)  # Skips the market list download
+        print(f"♻️  Reusing {len(exchange.markets)} markets from the state snapshot")
+    else:
+        exchange.load_markets()
     print("✅ Connected to Coinbase Advanced Trade successfully.")
     print(f"📊 Trading symbols: {', '.join(symbols)}")
     
@@ -123,6 +218,9 @@ try:
 except Exception as e:
     print(f"⚠️  Could not set leverage automatically: {e}")
 
+# Loop output goes through a queued logger (per-tick lines rate limited, order/exit events always written)
+log = setup_logging(tick_interval=log_tick_interval, clock=clock)
+
 # Position tracking - one per symbol
 positions = {}  # {symbol: {'in_position': bool, 'stop': float, 'amount': float, 'entry_price': float}}
 
@@ -136,19 +234,170 @@ for symbol in symbols:
         'breakeven_set': False,  # Track if stop moved to breakeven
         'peak_price': 0.0,  # Track highest price reached (for spike detection)
         'trailing_profit_target': 0.0,  # Dynamic profit target that moves up
-        'last_exit_time': 0  # Track last exit time for cooldown
+        'last_exit_time': 0,  # Track last exit time for cooldown
+        # Exit parameters cached from the last full analysis (used by the fast exit path)
+        'atr': 0.0,
+        'atr_multiplier': atr_multiplier,
+        'spike_reversal': spike_reversal_pct,
+        'profit_target': profit_target_pct,
+        'min_spike_profit': min_spike_profit_pct
     }
 
+# Candle ring buffers - one per symbol (only used with TRADING_CANDLE_BUFFER=true)
+candle_buffers = {symbol: CandleBuffer(candle_buffer_size) for symbol in symbols} if use_candle_buffer else {}
+timeframe_ms = timeframe_to_ms(timeframe)
+
+if snapshot:
+    restored_positions = 0
+    if snapshot.meta.get('mode') == run_mode and run_mode != 'paper':  # Paper balances don't survive a restart
+        for symbol, saved in snapshot.positions.items():
+            if symbol in positions:
+                positions[symbol].update((key, value) for key, value in saved.items() if key in positions[symbol])
+                restored_positions += positions[symbol]['in_position']
+            elif saved.get('in_position'):
+                print(f"⚠️  {symbol} had an open position in the snapshot but is no longer in TRADING_SYMBOLS - not restored")
+    restored_buffers = 0
+    now_ms = int(clock.time() * 1000)
+    for symbol in candle_buffers:
+        try:
+            if not snapshot.restore_buffer(symbol, candle_buffers[symbol]):
+                continue
+        except ValueError:
+            continue  # Saved with another TRADING_CANDLE_BUFFER_SIZE
+        if now_ms - candle_buffers[symbol].last_timestamp >= (candle_buffer_size - 1) * timeframe_ms:
+            candle_buffers[symbol] = CandleBuffer(candle_buffer_size)  # Down too long - the gap can't be filled in one fetch
+            continue
+        restored_buffers += 1
+    print(f"♻️  Warm start from {snapshot_file} (saved {clock.time() - snapshot.meta['saved_at']:.0f}s ago): "
+          f"{restored_positions} open positions, {restored_buffers} candle buffers")
+
+# Encoded once - the market list doesn't change while the bot runs
+markets_blob = None
+if snapshots_enabled and hasattr(exchange, 'set_markets'):
+    try:
+        markets_blob = encode_markets(exchange.markets, exchange.currencies)
+    except Exception as e:
+        print(f"⚠️  Market list not included in state snapshots: {e}")
+
+# L2 order books - fetched only when an order is about to be placed
+order_books = OrderBookCache(exchange, depth=order_book_depth, max_age=order_book_max_age, clock=clock)
+
+# Working limit orders - polled between cycles, repriced and converted to market at the deadline
+limit_engine = LimitOrderEngine(exchange,
+                                offset_pct=limit_order_offset_pct,
+                                reprice_interval=limit_reprice_interval,
+                                reprice_threshold_pct=limit_reprice_threshold,
+                                timeout=limit_order_timeout,
+                                clock=clock)
+limit_poll_interval = max(1, min(5, limit_reprice_interval))
+
+# Exchange-side stop-limit sells that follow the local trailing stop (only when orders are really placed)
+native_stops = None
+if use_native_stops and enable_trading:
+    native_stops = NativeStopManager(exchange,
+                                     on_fill=lambda stop: on_native_stop_filled(stop),
+                                     limit_offset_pct=native_stop_limit_offset,
+                                     min_move_pct=native_stop_min_move,
+                                     min_interval=native_stop_amend_interval,
+                                     poll_interval=limit_poll_interval * 2,
+                                     clock=clock)
+    try:
+        # Stops placed by the previous run keep protecting positions restored from the snapshot
+        recovered = native_stops.recover([symbol for symbol in symbols if positions[symbol]['in_position']])
+        if recovered:
+            print(f"🛡️  Took over native stops for {', '.join(recovered)}")
+    except Exception as e:
+        print(f"⚠️  Could not look up existing native stops: {e}")
+
+# When each symbol gets its next full check (fixed check_interval unless adaptive cadence is on)
+scheduler = SymbolScheduler(symbols, check_interval, min_check_interval, max_check_interval,
+                            cooldown_seconds=cooldown_minutes * 60, min_trend_strength=min_trend_strength,
+                            enabled=adaptive_cadence, clock=clock)
+
+# Position vs balance checks - only when orders are really placed (live --execute or paper)
+reconciler = PositionReconciler(exchange, positions,
+                                on_reset=lambda symbol: reset_position(positions[symbol], start_cooldown=False),
+                                on_adopt=lambda symbol, amount, price: adopt_position(symbol, amount, price),
+                                clock=clock,
+                                interval=reconcile_interval if reconcile_interval > 0 else float('inf'),
+                                dust_value=min_order_size,
+                                busy=lambda symbol: limit_engine.get(symbol) is not None)
+
+def log_execution(execution):
+    """Execution tracker callback: one event line per completed order"""
+    details = execution.to_dict()
+    details.pop('symbol')
+    base_currency = execution.symbol.split('/')[0]
+    if execution.status != 'filled':
+        event(log, 'execution', f"[{base_currency}] ⏱️  {execution.side} ({execution.reason}) {execution.status}: {execution.error or 'fill price unknown'}",
+              symbol=execution.symbol, **details)
+        return
+    event(log, 'execution', f"[{base_currency}] ⏱️  {execution.side} ({execution.reason}, {execution.order_type}) "
+                            f"signal→ack {format_seconds(execution.latency('signal', 'acknowledged'))}, "
+                            f"signal→fill {format_seconds(execution.latency('signal', 'filled'))}, "
+                            f"slippage {execution.slippage() * 10000:+.1f} bps",
+          symbol=execution.symbol, **details)
+
+# Signal-to-fill latency and slippage of every order placed
+tracker = ExecutionTracker(clock=clock, log_path=execution_log or None, on_complete=log_execution)
+
+# Per-endpoint circuit breakers: an endpoint that keeps timing out is skipped (with jittered
+# backoff and a single probe) instead of being called for every symbol on every tick.
+# Orders have one breaker per symbol, so a failing symbol never holds back the others' exits.
+breakers = CircuitBreakers(trips=(ccxt.NetworkError,), threshold=max(1, breaker_threshold),
+                           base_delay=breaker_base_delay, max_delay=breaker_max_delay,
+                           max_delays={'orders': min(breaker_max_delay, 30.0)},
+                           clock=clock, enabled=breaker_threshold > 0)
+
+# Every trade of the traded symbols, for spike reversals between polls (live market data only;
+# replays have no trades and recordings couldn't reproduce what the stream saw)
+trade_stream = None
+if use_trade_stream and not (args.replay or args.replay_log or args.record):
+    trade_stream = TradeStream(symbols, lambda: create_stream_exchange(exchange.markets, getattr(exchange, 'currencies', None)),
+                               momentum_window=momentum_window)
+    trade_stream.start()
+stream_hold = {}  # {symbol: time the trade stream may watch it again}
+
+# Exits triggered during one iteration. Stop-losses go out the moment they fire; the other exits are
+# sent together by flush_exits() (deepest loss first). The paper simulator shares one account and a
+# virtual clock between calls, so it gets them one by one.
+pending_exits = {}  # {symbol: exit_position() keyword arguments}
+exits_in_flight = {}  # {symbol: Future of a stop-loss exit on the pool, or None once it was sent inline}
+if paper_trading or args.replay_log:
+    exit_workers = 1
+exit_pool = ThreadPoolExecutor(max_workers=exit_workers, thread_name_prefix='exit') if exit_workers > 1 else None
+
 def fetch_data(symbol):
+    if not breakers.allow('ohlcv'):
+        return pd.DataFrame()  # Candle endpoint is down - skipped until the breaker's next probe
+    if use_candle_buffer:
+        return fetch_into_buffer(symbol)
     try:
         bars = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=100)
+        breakers.success('ohlcv')
         df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         return df
     except Exception as e:
-        print(f"Data Error for {symbol}: {e}")
+        breakers.failure('ohlcv', e)
+        log.warning(f"Data Error for {symbol}: {e}")
+        return pd.DataFrame()
+
+def fetch_into_buffer(symbol):
+    # Only request the candles we don't have yet (plus the one still forming)
+    buffer = candle_buffers[symbol]
+    try:
+        limit = buffer.fetch_limit(int(clock.time() * 1000), timeframe_ms)
+        bars = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+        breakers.success('ohlcv')
+        return buffer.update(bars)
+    except Exception as e:
+        breakers.failure('ohlcv', e)
+        log.warning(f"Data Error for {symbol}: {e}")
         return pd.DataFrame()
 
 def analyze_market(df):
+    if isinstance(df, CandleBuffer):
+        return df.row  # Indicators are already updated in place
     df['ema_20'] = ta.ema(df['close'], length=20)
     df['rsi'] = ta.rsi(df['close'], length=14)
     df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=14)
@@ -163,9 +412,14 @@ def analyze_market(df):
     return df.iloc[-1]
 
 def get_position_size(current_price, symbol):
+    if not breakers.allow('balance'):
+        return 0, 0
     try:
         balance = exchange.fetch_balance()
+        breakers.success('balance')
         free_usd = balance['USD']['free'] if 'USD' in balance else balance.get('USDC', {}).get('free', 0)
+        if enable_trading:
+            reconciler.observe_balance(balance)  # Free reconciliation check with the balance we just fetched
         
         # Divide risk across all symbols
         risk_per_symbol = risk_pct / len(symbols)
@@ -174,9 +428,743 @@ def get_position_size(current_price, symbol):
         amount = position_value / current_price
         return amount, margin_to_use
     except Exception as e:
-        print(f"Balance Error for {symbol}: {e}")
+        breakers.failure('balance', e)
+        log.warning(f"Balance Error for {symbol}: {e}")
         return 0, 0
 
+def reset_position(pos, start_cooldown=True):
+    pos['in_position'] = False
+    pos['trailing_stop_price'] = 0.0
+    pos['position_amount'] = 0.0
+    pos['entry_price'] = 0.0
+    pos['peak_price'] = 0.0
+    pos['trailing_profit_target'] = 0.0
+    pos['breakeven_set'] = False
+    if start_cooldown:
+        pos['last_exit_time'] = clock.time()  # Record exit time for cooldown
+
+def get_order_book(symbol):
+    """Cached L2 book for a symbol, or None if book checks are off or the fetch failed"""
+    if max_slippage_pct <= 0:
+        return None
+    try:
+        return order_books.get(symbol)
+    except Exception as e:
+        log.warning(f"[{symbol.split('/')[0]}] ⚠️  Order book unavailable: {e}")
+        return None
+
+def cap_buy_cost(symbol, cost, price):
+    """Reduce a market buy's cost so its estimated slippage stays within max_slippage_pct"""
+    book = get_order_book(symbol)
+    if book is None:
+        return cost
+    base_currency = symbol.split('/')[0]
+    estimate = book.estimate_buy(cost, price)
+    if estimate['slippage_pct'] is None:
+        return cost
+    log.info(f"[{base_currency}] 📖 Book estimate: VWAP ${estimate['vwap']:.6f}, slippage {estimate['slippage_pct']*100:.3f}%")
+    if estimate['complete'] and estimate['slippage_pct'] <= max_slippage_pct:
+        return cost
+    capped_cost = min(cost, book.max_buy_cost(max_slippage_pct, price))
+    log.warning(f"[{base_currency}] ⚠️  Thin book - reducing cost from ${cost:.2f} to ${capped_cost:.2f} (max slippage {max_slippage_pct*100:.2f}%)")
+    return capped_cost
+
+def sell_slippage_too_high(symbol, amount, price):
+    """True if a market sell of `amount` is estimated to slip more than max_slippage_pct"""
+    book = get_order_book(symbol)
+    if book is None:
+        return False
+    estimate = book.estimate_sell(amount, price)
+    if estimate['slippage_pct'] is None:
+        return False
+    log.info(f"[{symbol.split('/')[0]}] 📖 Book estimate: VWAP ${estimate['vwap']:.6f}, slippage {estimate['slippage_pct']*100:.3f}%")
+    return not estimate['complete'] or estimate['slippage_pct'] > max_slippage_pct
+
+def exit_position(symbol, price, label, allow_limit=True, start_cooldown=True, execution=None):
+    """Sell the whole position for a symbol and reset its tracking state.
+
+    Returns True if the position was closed. If every sell attempt fails, the position is kept
+    (and retried on the next check) and the reconciler verifies it against balances.
+    """
+    pos = positions[symbol]
+    base_currency = symbol.split('/')[0]
+    use_limit = allow_limit and use_limit_orders
+    if enable_trading and not breakers.allow('orders', symbol):
+        retry_in = breakers.get('orders', symbol).snapshot()['retry_in'] or 0
+        tick(log, f'breaker_exit:{symbol}', f"[{base_currency}] 🔌 Order endpoint failing - {label} exit retried in {retry_in:.0f}s",
+             level=logging.WARNING, symbol=symbol)
+        return False
+    # Stop-losses go at market whatever the book looks like - don't spend a round trip checking it
+    if allow_limit and not use_limit and sell_slippage_too_high(symbol, pos['position_amount'], price):
+        # Thin book: take profits with a limit order instead of walking the bids
+        log.info(f"[{base_currency}] 📖 Estimated slippage above {max_slippage_pct*100:.2f}% - switching to a limit order")
+        use_limit = True
+
+    if enable_trading:
+        working = limit_engine.get(symbol)
+        if working is not None and working.side == 'buy':
+            # Entry still being worked - stop buying and only sell what was filled
+            limit_engine.cancel(symbol)
+            pos['position_amount'] = working.total_filled
+            if pos['position_amount'] <= 0:
+                event(log, 'exit', f"[{base_currency}] ℹ️  Entry order canceled before any fill - nothing to sell", symbol=symbol)
+                reset_position(pos, start_cooldown)
+                reconciler.mark_dirty(symbol)
+                return True
+        if native_stops and native_stops.get(symbol):
+            # The stop order holds the coins - pull it first (it may have sold some or all of them already)
+            stop = native_stops.cancel(symbol)
+            if stop.filled > 0:
+                pos['position_amount'] = max(0.0, pos['position_amount'] - stop.filled)
+                if stop.status == 'filled' or pos['position_amount'] * price < min_order_size:
+                    event(log, 'exit', f"[{base_currency}] 🛑 Native stop already sold {stop.filled:.6f} {base_currency} - nothing left to sell",
+                          symbol=symbol, filled=stop.filled, average_price=stop.average_price)
+                    reset_position(pos, start_cooldown)
+                    reconciler.mark_dirty(symbol)
+                    return True
+        sold = False
+        tracker.submitted(execution)
+        try:
+            if use_limit:
+                # Use limit sell order (maker) - lower fees; the engine reprices it and goes to market at the deadline
+                log.info(f"[{base_currency}] 💰 Using limit order to save fees")
+                execution.order_type = 'limit'
+                chase = limit_engine.submit(symbol, 'sell', pos['position_amount'], price, on_done=on_exit_order_done, tag=execution)
+                breakers.success('orders', symbol)
+                tracker.acknowledged(execution, order_id=chase.order_id, lookup=False)
+                event(log, 'exit', f"[{base_currency}] ✅ Limit sell order placed: {chase.order_id or 'N/A'} at ${chase.price:.2f}",
+                      symbol=symbol, order_id=chase.order_id, price=chase.price, amount=chase.amount)
+            else:
+                order = exchange.create_market_sell_order(symbol, pos['position_amount'])
+                breakers.success('orders', symbol)
+                tracker.acknowledged(execution, order)
+                event(log, 'exit', f"[{base_currency}] ✅ {label} sell executed: {order.get('id', 'N/A')}",
+                      symbol=symbol, order_id=order.get('id'), reason=label)
+            sold = True
+        except Exception as e:
+            breakers.failure('orders', e, symbol)
+            event(log, 'exit', f"[{base_currency}] ❌ {label} sell failed: {e}", level=logging.ERROR, symbol=symbol, reason=label)
+            # If limit order fails, try market order
+            if use_limit:
+                try:
+                    event(log, 'exit', f"[{base_currency}] 🔄 Falling back to market order...", symbol=symbol)
+                    execution.order_type = 'market'
+                    order = exchange.create_market_sell_order(symbol, pos['position_amount'])
+                    breakers.success('orders', symbol)
+                    tracker.acknowledged(execution, order)
+                    event(log, 'exit', f"[{base_currency}] ✅ Market sell executed: {order.get('id', 'N/A')}",
+                          symbol=symbol, order_id=order.get('id'), reason=label)
+                    sold = True
+                except Exception as e2:
+                    breakers.failure('orders', e2, symbol)
+                    event(log, 'exit', f"[{base_currency}] ❌ Market sell also failed: {e2}", level=logging.ERROR, symbol=symbol)
+            if not sold:
+                tracker.failed(execution, e)
+        reconciler.mark_dirty(symbol)
+        if not sold:
+            event(log, 'exit', f"[{base_currency}] ⚠️  Position kept - exit will be retried", level=logging.WARNING, symbol=symbol)
+            return False
+    else:
+        event(log, 'exit', f"[{base_currency}]    (Simulated - use --execute to enable real trading)", symbol=symbol)
+
+    reset_position(pos, start_cooldown)
+    return True
+
+def on_native_stop_filled(stop):
+    """The exchange-side stop sold (part of) a position between our own checks"""
+    pos = positions[stop.symbol]
+    base_currency = stop.symbol.split('/')[0]
+    reconciler.mark_dirty(stop.symbol)
+    if not pos['in_position']:
+        return
+    remaining = pos['position_amount'] - stop.filled
+    if remaining * (stop.average_price or pos['entry_price']) >= min_order_size:
+        pos['position_amount'] = remaining  # Partly filled - the next sync protects the rest
+        return
+    exit_price = stop.average_price or stop.limit_price
+    profit_pct = (exit_price - pos['entry_price']) / pos['entry_price'] if pos['entry_price'] > 0 else 0.0
+    event(log, 'exit', f"[{base_currency}] 🚨 STOP LOSS (native) filled at ${exit_price:.2f} (Entry: ${pos['entry_price']:.2f}, P/L: {profit_pct*100:.2f}%)",
+          level=logging.WARNING, symbol=stop.symbol, reason='native_stop', price=exit_price, profit_pct=profit_pct)
+    reset_position(pos, start_cooldown=False)
+    scheduler.reschedule(stop.symbol, pos)
+
+def sync_native_stops():
+    """Raise each open position's exchange-side stop to the local trailing stop (debounced)"""
+    for symbol in symbols:
+        pos = positions[symbol]
+        if not pos['in_position'] or exit_pending(symbol) or limit_engine.get(symbol) is not None or symbol in reconciler.dirty:
+            continue  # Flat, on its way out, or the amount isn't confirmed by the balance yet
+        native_stops.sync(symbol, pos['position_amount'], pos['trailing_stop_price'], pos['entry_price'])
+
+def on_exit_order_done(chase):
+    """A limit exit finished (filled, sent to market or failed) - verify against balances"""
+    track_chase_result(chase)
+    reconciler.mark_dirty(chase.symbol)
+
+def track_chase_result(chase):
+    """Complete the execution record of an order worked by the limit engine"""
+    execution = chase.tag
+    if execution is None:
+        return
+    if chase.total_filled > 0:
+        if chase.status == 'market':
+            execution.order_type = 'limit+market'  # Deadline hit - the rest went at market
+        tracker.filled(execution, chase.average_price, chase.total_filled)
+    else:
+        tracker.failed(execution, f"limit order {chase.status} without a fill")
+
+def adopt_position(symbol, amount, price):
+    """Track coins left over from our own order as a position again (reconciler callback)"""
+    pos = positions[symbol]
+    pos['in_position'] = True
+    pos['position_amount'] = amount
+    pos['entry_price'] = price
+    pos['peak_price'] = price
+    pos['trailing_profit_target'] = price * (1 + profit_target_pct)
+    pos['trailing_stop_price'] = price - pos['atr'] * pos['atr_multiplier'] if pos['atr'] > 0 else 0.0
+    pos['breakeven_set'] = False
+
+def on_entry_order_done(chase):
+    """Sync a position with what its limit entry actually filled"""
+    track_chase_result(chase)
+    pos = positions[chase.symbol]
+    base_currency = chase.symbol.split('/')[0]
+    if not pos['in_position'] or chase.status == 'canceled':
+        return  # Exit path already took over
+    reconciler.mark_dirty(chase.symbol)
+    if chase.total_filled > 0:
+        pos['position_amount'] = chase.total_filled
+        event(log, 'order', f"[{base_currency}] 📦 Entry complete: {chase.total_filled:.6f} {base_currency}",
+              symbol=chase.symbol, filled=chase.total_filled)
+    else:
+        event(log, 'order', f"[{base_currency}] ❌ Entry order ended without a fill - position cleared",
+              level=logging.WARNING, symbol=chase.symbol)
+        reset_position(pos, start_cooldown=False)
+
+def update_peak(pos, price):
+    # Track peak price (highest price reached)
+    if price > pos['peak_price']:
+        pos['peak_price'] = price
+        # Update trailing profit target: moves up as price increases
+        # Target is always at least profit_target_pct above entry, but moves up with price
+        # More aggressive trailing: moves up faster to capture more profit
+        entry_price = pos['entry_price']
+        new_target = entry_price * (1 + profit_target_pct) + (price - entry_price) * 0.6  # Increased from 0.5 to 0.6
+        if new_target > pos['trailing_profit_target']:
+            pos['trailing_profit_target'] = new_target
+
+def queue_exit(symbol, price, label, allow_limit=True, start_cooldown=True):
+    """Start a position exit. Stop-losses (allow_limit=False) are sent at once, on the exit pool if
+    there is one; other exits wait for flush_exits() at the end of the iteration. Always True."""
+    execution = tracker.start(symbol, 'sell', price, 'market', label) if enable_trading else None  # Signal time
+    kwargs = {'price': price, 'label': label, 'allow_limit': allow_limit, 'start_cooldown': start_cooldown,
+              'execution': execution}
+    if allow_limit:
+        pending_exits[symbol] = kwargs
+    elif exit_pool is None:
+        exits_in_flight[symbol] = None
+        exit_position(symbol, **kwargs)
+    else:
+        exits_in_flight[symbol] = exit_pool.submit(exit_position, symbol, **kwargs)
+    return True
+
+def exit_pending(symbol):
+    """True while an exit for the symbol is queued or being sent"""
+    return symbol in pending_exits or symbol in exits_in_flight
+
+def flush_exits():
+    """Send the exits queued this iteration at once, deepest loss first, and wait for them and
+    for the stop-losses already on their way.
+
+    In a market-wide dump, every position hits its stop in the same iteration. The sells go out
+    in parallel on the exit pool instead of one after another. Each exit touches only its own
+    symbol's position, working order and breaker. Returns the symbols that were exited.
+    """
+    if not pending_exits and not exits_in_flight:
+        return []
+    def unrealized(item):
+        symbol, kwargs = item
+        entry_price = positions[symbol]['entry_price']
+        return kwargs['price'] / entry_price - 1 if entry_price > 0 else 0.0
+
+    exits = sorted(pending_exits.items(), key=unrealized)
+    pending_exits.clear()
+    futures = dict(exits_in_flight)
+    exits_in_flight.clear()
+    if exit_pool is None or len(exits) + len(futures) <= 1:
+        for symbol, kwargs in exits:
+            exit_position(symbol, **kwargs)
+            futures[symbol] = None
+    else:
+        if len(exits) + len(futures) > 2:
+            event(log, 'exit', f"⚡ Sending {len(exits) + len(futures)} exits in parallel (deepest loss first: "
+                               f"{', '.join(s.split('/')[0] for s in list(futures) + [s for s, _ in exits])})",
+                  exits=len(exits) + len(futures))
+        for symbol, kwargs in exits:
+            futures[symbol] = exit_pool.submit(exit_position, symbol, **kwargs)
+    for symbol, future in futures.items():
+        if future is None:
+            continue
+        try:
+            future.result()
+        except Exception as e:
+            log.error(f"[{symbol}] Exit error: {e}")
+    return list(futures)
+
+def check_profit_exits(symbol, price):
+    """Run spike reversal and profit target checks. Returns True if an exit was triggered (queued)."""
+    pos = positions[symbol]
+    base_currency = symbol.split('/')[0]
+    entry_price = pos['entry_price']
+    profit_pct = (price - entry_price) / entry_price
+
+    # Calculate profit target price (volatility-adjusted)
+    profit_target_price = entry_price * (1 + pos['profit_target'])
+
+    # --- SPIKE DETECTION & REVERSAL CAPTURE ---
+    # If price has spiked up significantly, sell on reversal
+    peak_profit_pct = (pos['peak_price'] - entry_price) / entry_price
+    drop_from_peak_pct = (pos['peak_price'] - price) / pos['peak_price'] if pos['peak_price'] > 0 else 0
+
+    # Use volatility-adjusted parameters
+    # Only activate spike detection if we've made meaningful profit
+    if peak_profit_pct >= pos['min_spike_profit'] and drop_from_peak_pct >= pos['spike_reversal']:
+        event(log, 'exit', f"[{base_currency}] 📉 SPIKE REVERSAL DETECTED: Price dropped {drop_from_peak_pct*100:.2f}% from peak ${pos['peak_price']:.2f}",
+              symbol=symbol, reason='spike_reversal', price=price, peak=pos['peak_price'])
+        event(log, 'exit', f"[{base_currency}] 💰 Capturing profit: {profit_pct*100:.2f}% (Peak was {peak_profit_pct*100:.2f}%)",
+              symbol=symbol, profit_pct=profit_pct)
+        return queue_exit(symbol, price, 'Spike reversal')
+
+    # --- PROFIT TAKING (Static Target) ---
+    if price >= profit_target_price:
+        event(log, 'exit', f"[{base_currency}] 💰 PROFIT TARGET REACHED: {profit_pct*100:.2f}% profit at ${price:.2f}",
+              symbol=symbol, reason='profit_target', price=price, profit_pct=profit_pct)
+        return queue_exit(symbol, price, 'Profit-taking')
+
+    # --- TRAILING PROFIT TARGET (Dynamic) ---
+    # Also check trailing profit target (moves up with price)
+    if pos['trailing_profit_target'] > 0 and price >= pos['trailing_profit_target']:
+        event(log, 'exit', f"[{base_currency}] 💰 TRAILING PROFIT TARGET REACHED: {profit_pct*100:.2f}% profit at ${price:.2f}",
+              symbol=symbol, reason='trailing_profit', price=price, profit_pct=profit_pct)
+        return queue_exit(symbol, price, 'Trailing profit')
+
+    return False
+
+def check_stop_loss(symbol, price):
+    """Crash protection trigger. Returns True if an exit was triggered (queued)."""
+    pos = positions[symbol]
+    if price > pos['trailing_stop_price']:
+        return False
+
+    base_currency = symbol.split('/')[0]
+    entry_price = pos['entry_price']
+    profit_pct = (price - entry_price) / entry_price
+    event(log, 'exit', f"[{base_currency}] 🚨 STOP LOSS TRIGGERED at ${price:.2f} (Entry: ${entry_price:.2f}, P/L: {(profit_pct*100):.2f}%)",
+          level=logging.WARNING, symbol=symbol, reason='stop_loss', price=price, profit_pct=profit_pct)
+    # For stop-loss, use market order for immediate execution (safety first)
+    # Limit orders might not fill fast enough during crashes
+    return queue_exit(symbol, price, 'Stop-loss', allow_limit=False, start_cooldown=False)
+
+def check_fast_exits():
+    """Poll the latest price of open positions and run exit checks against cached ATR and stops"""
+    open_symbols = [s for s in symbols if positions[s]['in_position'] and positions[s]['atr'] > 0]
+    if not open_symbols:
+        return
+
+    if not breakers.allow('tickers'):
+        return
+    try:
+        # One bulk ticker call covers every open position
+        tickers = exchange.fetch_tickers(open_symbols)
+        breakers.success('tickers')
+    except Exception as e:
+        breakers.failure('tickers', e)
+        tick(log, 'fast_exit_poll', f"⚠️  Fast exit price poll failed: {e}", level=logging.WARNING)
+        return
+
+    for symbol in open_symbols:
+        ticker = tickers.get(symbol) or {}
+        price = ticker.get('last')
+        if not price:
+            continue
+
+        pos = positions[symbol]
+        update_peak(pos, price)
+        if trade_stream:
+            update_peak(pos, trade_stream.high(symbol))  # Intra-poll high
+        if check_profit_exits(symbol, price):
+            continue
+
+        # Raise Safety Net using the ATR from the last full analysis
+        potential_stop = price - (pos['atr'] * pos['atr_multiplier'])
+        if potential_stop > pos['trailing_stop_price']:
+            pos['trailing_stop_price'] = potential_stop
+        check_stop_loss(symbol, price)
+    flush_exits()
+    if native_stops:
+        sync_native_stops()
+    if trade_stream:
+        arm_trade_stream()
+
+def arm_trade_stream():
+    """Point the trade stream at the open positions and their current spike parameters"""
+    now = clock.time()
+    for symbol in symbols:
+        pos = positions[symbol]
+        if pos['in_position'] and not exit_pending(symbol) and now >= stream_hold.get(symbol, 0):
+            trade_stream.arm(symbol, pos['entry_price'], pos['peak_price'], pos['min_spike_profit'], pos['spike_reversal'])
+        else:
+            trade_stream.disarm(symbol)
+
+def handle_stream_triggers():
+    """Spike reversals flagged by the trade stream: run the exit checks now instead of at the next poll"""
+    triggers = trade_stream.take_triggers()
+    for symbol, (price, high, momentum) in triggers.items():
+        pos = positions[symbol]
+        if not pos['in_position'] or exit_pending(symbol):
+            continue
+        update_peak(pos, high)
+        tick(log, f'stream_trigger:{symbol}', f"[{symbol.split('/')[0]}] ⚡ Trade stream: ${price:.2f} is {(1 - price / high)*100:.2f}% below the intra-candle high "
+                                              f"${high:.2f} (momentum {momentum*100:+.2f}%)", symbol=symbol, price=price, high=high, momentum=momentum)
+        check_profit_exits(symbol, price)
+    for symbol in flush_exits():
+        scheduler.reschedule(symbol, positions[symbol])
+    for symbol in triggers:
+        if positions[symbol]['in_position']:
+            # No exit, or it failed: every further trade below the high would trigger again
+            stream_hold[symbol] = clock.time() + stream_rearm_delay
+    arm_trade_stream()
+
+def pause(seconds):
+    """Sleep on the bot clock. With the trade stream on, spike reversals are handled as they arrive."""
+    if trade_stream is None:
+        clock.sleep(seconds)
+        return
+    deadline = clock.time() + seconds  # Live market data only, so the bot clock is real time
+    while trade_stream.wait(max(0.0, deadline - clock.time())):
+        handle_stream_triggers()
+
+def publish_state(iteration):
+    """Hand the health server a fresh snapshot of the bot's state (it never reads live dicts)"""
+    health_server.publish({
+        'status': 'running',
+        'mode': run_mode,
+        'iteration': iteration,
+        'last_loop_time': time.time(),
+        'clock_time': clock.time(),
+        'check_interval': check_interval,
+        'positions': {symbol: dict(pos) for symbol, pos in positions.items()},
+        'indicators': dict(latest_indicators),
+        'working_orders': {symbol: {'side': chase.side, 'price': chase.price, 'filled': chase.total_filled,
+                                    'remaining': chase.remaining} for symbol, chase in limit_engine.orders.items()},
+        'cadence': scheduler.snapshot(),
+        'reconciler': {'checks': reconciler.checks, 'corrections': reconciler.corrections},
+        'execution': {by: tracker.summary(by) for by in GROUPINGS},
+        'circuit_breakers': {'open': breakers.open_count(), 'breakers': breakers.snapshot()},
+        'native_stops': native_stops.snapshot() if native_stops else None,
+        'trade_stream': trade_stream.snapshot() if trade_stream else None,
+        'log_lines_suppressed': suppressed_count(),
+    })
+
+def save_state():
+    """Write the warm-start snapshot: candle buffers, positions and the market list"""
+    meta = {'saved_at': clock.time(), 'mode': run_mode, 'timeframe': timeframe, 'sandbox': use_sandbox, 'symbols': symbols,
+            'account': account}
+    try:
+        save_snapshot(snapshot_file, meta, candle_buffers, positions, markets=markets_blob)
+    except Exception as e:
+        log.warning(f"⚠️  State snapshot failed: {e}")
+
+def print_paper_summary():
+    summary = exchange.summary()
+    event(log, 'summary', f"📝 Paper trading summary - balance ${summary['starting_balance']:.2f} → ${summary['equity']:.2f} "
+                          f"({summary['return_pct']*100:+.2f}%), {summary['fills']} fills ({summary['maker_fills']} maker, "
+                          f"{summary['taker_fills']} taker), fees ${summary['fees_paid']:.2f}", **summary)
+
+def print_execution_summary():
+    if not tracker.count:
+        return
+    tables = '\n\n'.join(format_table(tracker.summary(by), by) for by in GROUPINGS)
+    event(log, 'summary', f"⏱️  Execution summary - {tracker.count} orders (slippage: positive = worse than the signal price)\n{tables}",
+          executions=tracker.count)
+
+def wait_for_next_cycle():
+    """Sleep until the next symbol is due, running fast exit checks and working limit orders in between"""
+    next_cycle = scheduler.next_due()
+    fast_exits = 0 < fast_exit_interval < next_cycle - clock.time()
+    watching_stops = native_stops is not None and native_stops.active
+    if not fast_exits and not limit_engine.active and not tracker.awaiting_fill and not watching_stops:
+        pause(max(0, next_cycle - clock.time()))
+        return
+
+    tick = min(fast_exit_interval, limit_poll_interval) if fast_exits else limit_poll_interval
+    next_fast_exit = clock.time() + fast_exit_interval
+    while True:
+        remaining = next_cycle - clock.time()
+        if remaining <= 0:
+            return
+        pause(min(tick, remaining))
+        if next_cycle - clock.time() > 0:
+            limit_engine.poll()
+            if watching_stops:
+                native_stops.poll()
+            if enable_trading:
+                reconciler.maybe_reconcile()
+            if tracker.awaiting_fill:
+                tracker.poll(exchange)
+            if fast_exits and clock.time() >= next_fast_exit:
+                check_fast_exits()
+                next_fast_exit = clock.time() + fast_exit_interval
+
+def process_symbol(symbol):
+    """Full check of one symbol: fetch candles, update indicators, run entry and exit logic"""
+    df = fetch_data(symbol)
+    data_time = clock.time()
+    if df.empty:
+        return
+    
+    row = analyze_market(df)
+    price = row['close']
+    ema_20 = row['ema_20']
+    atr = row['atr']
+    rsi = row['rsi']
+    ema_slope = row.get('ema_slope', 0)
+    volume_ratio = row.get('volume_ratio', 1.0)
+    
+    pos = positions[symbol]
+    base_currency = symbol.split('/')[0]
+    if health_server:
+        latest_indicators[symbol] = {
+            'timestamp': int(row['timestamp']), 'price': float(price), 'ema_20': float(ema_20), 'rsi': float(rsi),
+            'atr': float(atr), 'ema_slope': float(ema_slope), 'volume_ratio': float(volume_ratio),
+        }
+    
+    # Calculate trend strength (distance from EMA as percentage)
+    trend_strength = abs(price - ema_20) / ema_20 if ema_20 > 0 else 0
+    scheduler.observe(symbol, price, atr, trend_strength)
+    
+    # Calculate volatility (ATR as percentage of price) for asset-specific adjustments
+    atr_pct = atr / price if price > 0 else 0
+    
+    # Adjust parameters for volatile assets (like SHIB)
+    # High volatility = faster exits, tighter spike detection, wider stops
+    is_volatile = atr_pct > 0.02  # 2%+ ATR indicates high volatility
+    
+    # Dynamic parameters based on volatility
+    # Adjusted to capture more profit while still protecting gains
+    if is_volatile:
+        # For volatile assets (SHIB): balanced profit capture
+        dynamic_spike_reversal = 0.012  # 1.2% drop from peak (wider to avoid premature exits)
+        dynamic_profit_target = 0.02    # 2.0% profit target (increased from 1.5%)
+        dynamic_atr_multiplier = 2.0    # Wider stop (ATR × 2.0)
+        dynamic_min_spike_profit = 0.015  # Activate spike detection at 1.5% profit (let moves develop)
+        if pos['in_position']:  # Only log when in position to avoid spam
+            tick(log, f'volatile:{symbol}', f"[{base_currency}] ⚡ Volatile asset (ATR: {atr_pct*100:.2f}%) - Balanced profit capture: 2.0% target, 1.2% spike")
+    else:
+        # Standard settings for less volatile assets (ETH/BTC/LINK): optimized for more profit
+        dynamic_spike_reversal = spike_reversal_pct  # 2.0% drop (wider to avoid premature exits)
+        dynamic_profit_target = profit_target_pct    # 3.5% target (increased to capture more in uptrends)
+        dynamic_atr_multiplier = atr_multiplier       # Standard ATR multiplier
+        dynamic_min_spike_profit = min_spike_profit_pct  # 2.0% activation (let moves develop)
+    
+    tick(log, f'status:{symbol}', f"[{base_currency}] Price: ${price:.2f} | RSI: {rsi:.2f} | Stop: ${pos['trailing_stop_price']:.2f} | Position: {'YES' if pos['in_position'] else 'NO'}",
+         symbol=symbol, price=price, rsi=rsi, stop=pos['trailing_stop_price'], in_position=pos['in_position'])
+
+    # --- BUY LOGIC ---
+    if not pos['in_position']:
+        # Cooldown check: avoid quick re-entries after exits
+        current_time = clock.time()
+        time_since_exit = current_time - pos['last_exit_time'] if pos['last_exit_time'] > 0 else cooldown_minutes * 60 + 1
+        
+        if time_since_exit < cooldown_minutes * 60:
+            # Still in cooldown period, skip entry
+            return
+        
+        # Market condition filters
+        # 1. Price must be above EMA (trend filter)
+        # 2. RSI must be above threshold (momentum filter)
+        # 3. Trend strength must be sufficient (avoid sideways markets)
+        # 4. EMA must be trending up (slope positive)
+        # 5. Volume should be above average (confirmation)
+        
+        price_above_ema = price > ema_20
+        rsi_strong = rsi > rsi_entry_threshold
+        trend_strong_enough = trend_strength >= min_trend_strength
+        ema_trending_up = ema_slope > 0
+        volume_adequate = volume_ratio >= 1.0  # At least average volume
+        
+        if price_above_ema and rsi_strong and trend_strong_enough and ema_trending_up and volume_adequate:
+            execution = tracker.start(symbol, 'buy', price, 'limit' if use_limit_orders else 'market', 'entry', data_time)
+            amount, cost = get_position_size(price, symbol)
+            
+            if cost < min_order_size:
+                tick(log, f'too_small:{symbol}', f"[{base_currency}] ⚠️  Order too small: ${cost:.2f} < ${min_order_size:.2f} minimum. Skipping.",
+                     level=logging.WARNING, symbol=symbol)
+                return
+            
+            if amount > 0 and not use_limit_orders:
+                # Size market buys to the depth available within the slippage limit
+                capped_cost = cap_buy_cost(symbol, cost, price)
+                if capped_cost < cost:
+                    if capped_cost < min_order_size:
+                        tick(log, f'thin_book:{symbol}', f"[{base_currency}] ⚠️  Not enough depth for ${min_order_size:.2f} minimum within slippage limit. Skipping.",
+                             level=logging.WARNING, symbol=symbol)
+                        return
+                    amount *= capped_cost / cost
+                    cost = capped_cost
+
+            if amount > 0 and enable_trading and not breakers.allow('orders', symbol):
+                tick(log, f'breaker:{symbol}', f"[{base_currency}] 🔌 Order endpoint failing - entry skipped until it recovers",
+                     level=logging.WARNING, symbol=symbol)
+                return
+
+            if amount > 0:
+                if use_limit_orders:
+                    # Use limit order (maker) - lower fees (0.4% vs 0.6%)
+                    limit_price = price * (1 - limit_order_offset_pct)  # Slightly below market for buy
+                    event(log, 'order', f"[{base_currency}] 🚀 ENTER LONG (LIMIT): Buying {amount:.6f} {base_currency} at ${limit_price:.2f} (Cost: ${cost:.2f})",
+                          symbol=symbol, side='buy', amount=amount, price=limit_price, cost=cost)
+                    log.info(f"[{base_currency}] 💰 Using limit order to save fees (maker fee: 0.4% vs taker: 0.6%)")
+                    
+                    if enable_trading:
+                        tracker.submitted(execution)
+                        try:
+                            # Create limit buy order - the engine keeps it near the market until filled
+                            chase = limit_engine.submit(symbol, 'buy', amount, price, on_done=on_entry_order_done, tag=execution)
+                            breakers.success('orders', symbol)
+                            tracker.acknowledged(execution, order_id=chase.order_id, lookup=False)
+                            event(log, 'order', f"[{base_currency}] ✅ Limit order placed: {chase.order_id or 'N/A'}",
+                                  symbol=symbol, order_id=chase.order_id, price=chase.price)
+                            log.info(f"[{base_currency}] ⏳ Working order at ${chase.price:.2f} (market after {limit_order_timeout}s)")
+                        except Exception as e:
+                            breakers.failure('orders', e, symbol)
+                            event(log, 'order', f"[{base_currency}] ❌ Limit order failed: {e}", level=logging.ERROR, symbol=symbol)
+                            # Fallback to market order if limit fails
+                            try:
+                                event(log, 'order', f"[{base_currency}] 🔄 Falling back to market order...", symbol=symbol)
+                                execution.order_type = 'market'
+                                order = exchange.create_market_buy_order(symbol, cost)
+                                breakers.success('orders', symbol)
+                                tracker.acknowledged(execution, order)
+                                event(log, 'order', f"[{base_currency}] ✅ Market order executed: {order.get('id', 'N/A')}",
+                                      symbol=symbol, order_id=order.get('id'))
+                            except Exception as e2:
+                                breakers.failure('orders', e2, symbol)
+                                event(log, 'order', f"[{base_currency}] ❌ Market order also failed: {e2}", level=logging.ERROR, symbol=symbol)
+                                tracker.failed(execution, e2)
+                                reconciler.mark_dirty(symbol)  # In case it went through anyway
+                                return
+                    else:
+                        event(log, 'order', f"[{base_currency}]    (Simulated - use --execute to enable real trading)", symbol=symbol)
+                else:
+                    # Use market order (taker) - faster but higher fees
+                    event(log, 'order', f"[{base_currency}] 🚀 ENTER LONG: Buying {amount:.6f} {base_currency} (Cost: ${cost:.2f})",
+                          symbol=symbol, side='buy', amount=amount, price=price, cost=cost)
+                    
+                    if enable_trading:
+                        tracker.submitted(execution)
+                        try:
+                            order = exchange.create_market_buy_order(symbol, cost)
+                            breakers.success('orders', symbol)
+                            tracker.acknowledged(execution, order)
+                            event(log, 'order', f"[{base_currency}] ✅ Order executed: {order.get('id', 'N/A')}",
+                                  symbol=symbol, order_id=order.get('id'))
+                        except Exception as e:
+                            breakers.failure('orders', e, symbol)
+                            event(log, 'order', f"[{base_currency}] ❌ Order failed: {e}", level=logging.ERROR, symbol=symbol)
+                            tracker.failed(execution, e)
+                            reconciler.mark_dirty(symbol)  # In case it went through anyway
+                            return
+                    else:
+                        event(log, 'order', f"[{base_currency}]    (Simulated - use --execute to enable real trading)", symbol=symbol)
+                
+                # Use volatility-adjusted ATR multiplier for initial stop
+                initial_atr_mult = 2.0 if atr_pct > 0.02 else atr_multiplier
+                pos['trailing_stop_price'] = price - (atr * initial_atr_mult)
+                pos['position_amount'] = amount
+                pos['entry_price'] = price
+                pos['peak_price'] = price  # Initialize peak price
+                pos['trailing_profit_target'] = price * (1 + profit_target_pct)  # Initial profit target
+                pos['in_position'] = True
+                pos['breakeven_set'] = False
+                pos['atr'] = atr
+                pos['atr_multiplier'] = dynamic_atr_multiplier
+                pos['spike_reversal'] = dynamic_spike_reversal
+                pos['profit_target'] = dynamic_profit_target
+                pos['min_spike_profit'] = dynamic_min_spike_profit
+                if enable_trading:
+                    reconciler.mark_dirty(symbol)  # Replace the estimated amount with what was actually bought
+
+    # --- SAFETY LOGIC ---
+    elif pos['in_position']:
+        # Cache exit parameters so the fast exit path can use them between full cycles
+        pos['atr'] = atr
+        pos['atr_multiplier'] = dynamic_atr_multiplier
+        pos['spike_reversal'] = dynamic_spike_reversal
+        pos['profit_target'] = dynamic_profit_target
+        pos['min_spike_profit'] = dynamic_min_spike_profit
+
+        entry_price = pos['entry_price']
+        profit_pct = (price - entry_price) / entry_price
+
+        update_peak(pos, price)
+        if trade_stream:
+            update_peak(pos, trade_stream.high(symbol))  # Intra-candle high from the trade stream
+        if check_profit_exits(symbol, price):
+            return
+        
+        # --- BETTER STOP-LOSS MANAGEMENT ---
+        # Raise Safety Net (trailing stop) - use volatility-adjusted multiplier
+        potential_stop = price - (atr * dynamic_atr_multiplier)
+        if potential_stop > pos['trailing_stop_price']:
+            pos['trailing_stop_price'] = potential_stop
+        
+        # Faster profit locking for volatile assets
+        # Move stop to breakeven once in profit (protect capital)
+        if not pos['breakeven_set'] and price > entry_price * 1.01:  # 1% profit
+            pos['trailing_stop_price'] = max(pos['trailing_stop_price'], entry_price * 1.005)  # 0.5% above entry
+            pos['breakeven_set'] = True
+            log.info(f"[{base_currency}] 🔒 Stop moved to breakeven at ${pos['trailing_stop_price']:.2f}")
+        
+        # Faster profit locking for ALL assets (to "insure profits")
+        # All assets now lock profits faster than before
+        if is_volatile:
+            # For volatile assets (SHIB): lock profits very fast
+            if profit_pct > 0.01:  # 1% profit
+                min_profit_stop = entry_price * 1.005  # Lock 0.5% profit
+                if pos['trailing_stop_price'] < min_profit_stop:
+                    pos['trailing_stop_price'] = min_profit_stop
+                    log.info(f"[{base_currency}] 🔒 Profit locked: 0.5% at ${pos['trailing_stop_price']:.2f}")
+            
+            if profit_pct > 0.02:  # 2% profit
+                min_profit_stop = entry_price * 1.01  # Lock 1% profit
+                if pos['trailing_stop_price'] < min_profit_stop:
+                    pos['trailing_stop_price'] = min_profit_stop
+                    log.info(f"[{base_currency}] 🔒 Profit locked: 1.0% at ${pos['trailing_stop_price']:.2f}")
+        else:
+            # For stable assets (ETH/BTC/LINK): faster profit locking than before
+            # Now locks profits earlier to "insure profits"
+            if profit_pct > 0.01:  # 1% profit (NEW - faster than before)
+                min_profit_stop = entry_price * 1.005  # Lock 0.5% profit (NEW)
+                if pos['trailing_stop_price'] < min_profit_stop:
+                    pos['trailing_stop_price'] = min_profit_stop
+                    log.info(f"[{base_currency}] 🔒 Profit locked: 0.5% at ${pos['trailing_stop_price']:.2f}")
+            
+            if profit_pct > 0.02:  # 2% profit (faster than old 2%)
+                min_profit_stop = entry_price * 1.01  # Lock 1% profit (faster than old 1.5%)
+                if pos['trailing_stop_price'] < min_profit_stop:
+                    pos['trailing_stop_price'] = min_profit_stop
+                    log.info(f"[{base_currency}] 🔒 Profit locked: 1.0% at ${pos['trailing_stop_price']:.2f}")
+            
+            if profit_pct > 0.03:  # 3% profit (faster than old 5%)
+                min_profit_stop = entry_price * 1.02  # Lock 2% profit (faster than old 3%)
+                if pos['trailing_stop_price'] < min_profit_stop:
+                    pos['trailing_stop_price'] = min_profit_stop
+                    log.info(f"[{base_currency}] 🔒 Profit locked: 2.0% at ${pos['trailing_stop_price']:.2f}")
+        
+        # Crash Protection Trigger
+        check_stop_loss(symbol, price)
+
 print(f"🛡️ Active. Risking {risk_pct*100}% total ({risk_pct*100/len(symbols):.1f}% per symbol) of balance per trade.")
 print(f"📉 Crash Protection: ATR Trailing Stop active (ATR × {atr_multiplier})")
 print(f"💰 Profit Target: {profit_target_pct*100:.1f}% for ETH/BTC/LINK, 2.0% for SHIB (optimized for more profit in uptrends)")
@@ -186,363 +1174,105 @@ print(f"⏸️  Cooldown Period: {cooldown_minutes} minutes after exit (avoid qu
 print(f"📊 Entry Conditions: RSI > {rsi_entry_threshold}, Trend strength > {min_trend_strength*100:.1f}%, EMA trending up, Volume adequate")
 if use_limit_orders:
     print(f"💵 Order Type: LIMIT ORDERS (Maker fees: 0.4% - saves 33% vs market orders)")
+    print(f"🔁 Limit orders repriced every {limit_reprice_interval}s (or on {limit_reprice_threshold*100:.2f}% moves), market after {limit_order_timeout}s")
 else:
     print(f"💵 Order Type: MARKET ORDERS (Taker fees: 0.6%)")
 print(f"⏱️  Check Interval: {check_interval} seconds")
-if enable_trading:
+if adaptive_cadence:
+    print(f"🎚️  Adaptive Cadence: {min_check_interval}s near stops, up to {max_check_interval}s when flat/sideways or in cooldown")
+if log_tick_interval > 0:
+    print(f"📜 Status lines: at most every {log_tick_interval:g}s per symbol (orders and exits always logged)")
+if max_slippage_pct > 0:
+    print(f"📖 Order Book Checks: market orders capped at {max_slippage_pct*100:.2f}% estimated slippage")
+if use_candle_buffer:
+    print(f"🧮 Candle Buffers: {candle_buffer_size} candles per symbol, incremental indicators")
+if exit_pool:
+    print(f"⚡ Exit Fan-out: exits triggered together are sent {exit_workers} at a time, deepest loss first")
+if native_stops:
+    print(f"🛡️  Native Stops: stop-limit sells kept on the exchange ({native_stop_limit_offset*100:.1f}% limit below the trigger), "
+          f"raised after {native_stop_min_move*100:.1f}% moves, at most every {native_stop_amend_interval:g}s")
+if trade_stream:
+    print(f"📡 Trade Stream: spike reversals checked on every trade ({momentum_window:g}s momentum), exits sent immediately")
+if breaker_threshold > 0:
+    print(f"🔌 Circuit Breakers: endpoints skipped after {breaker_threshold} straight exchange errors, "
+          f"probed again after {breaker_base_delay:g}s doubling up to {breaker_max_delay:g}s (orders: {min(breaker_max_delay, 30.0):g}s)")
+if snapshots_enabled:
+    print(f"♻️  State Snapshots: {snapshot_file} every {snapshot_interval}s and on shutdown")
+if 0 < fast_exit_interval < check_interval:
+    print(f"⚡ Fast Exit Checks: every {fast_exit_interval} seconds for open positions")
+if paper_trading:
+    print(f"📝 PAPER TRADING - orders are simulated (fees {paper_settings['maker_fee']*100:.1f}%/{paper_settings['taker_fee']*100:.1f}%, "
+          f"${paper_settings['balance']:.2f} starting balance)")
+elif enable_trading:
     print(f"⚠️  TRADING ENABLED - Real orders will be executed!")
 else:
     print(f"ℹ️  Trading disabled - orders are simulated (use --execute to enable)")
 
+# Profiling is idle unless requested with --profile N or SIGUSR1 (kill -USR1 <pid>)
+profiler = LoopProfiler('main_multi_symbol',
+                        output_dir=os.getenv('TRADING_PROFILE_DIR', 'profiles'),
+                        signal_iterations=int(os.getenv('TRADING_PROFILE_ITERATIONS', '10')))
+profiler.install_signal_handler()
+if args.profile > 0:
+    profiler.request(args.profile)
+
+# Redeploys stop the container with SIGTERM: exit normally so atexit handlers still run
+# (final state snapshot, log queue flush, recorder close)
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+if snapshots_enabled:
+    atexit.register(save_state)
+
+# Health / state endpoint on its own thread (reads snapshots published once per iteration)
+health_server = None
+latest_indicators = {}
+if health_port > 0:
+    health_server = HealthServer(health_port, stale_after=max(3 * (max_check_interval if adaptive_cadence else check_interval), 180))
+    try:
+        health_server.start()
+        print(f"🩺 Health endpoint: http://0.0.0.0:{health_port}/health (state at /state)")
+    except OSError as e:
+        print(f"⚠️  Could not start health endpoint on port {health_port}: {e}")
+        health_server = None
+
 # --- MAIN LOOP ---
+iteration = 0
+next_snapshot = clock.time() + snapshot_interval
 while True:
-    for symbol in symbols:
+    profiler.tick()
+    iteration += 1
+    if enable_trading:
+        reconciler.maybe_reconcile()
+    for symbol in scheduler.due():
         try:
-            df = fetch_data(symbol)
-            if df.empty:
-                continue
-            
-            row = analyze_market(df)
-            price = row['close']
-            ema_20 = row['ema_20']
-            atr = row['atr']
-            rsi = row['rsi']
-            ema_slope = row.get('ema_slope', 0)
-            volume_ratio = row.get('volume_ratio', 1.0)
-            
-            pos = positions[symbol]
-            base_currency = symbol.split('/')[0]
-            
-            # Calculate trend strength (distance from EMA as percentage)
-            trend_strength = abs(price - ema_20) / ema_20 if ema_20 > 0 else 0
-            
-            # Calculate volatility (ATR as percentage of price) for asset-specific adjustments
-            atr_pct = atr / price if price > 0 else 0
-            
-            # Adjust parameters for volatile assets (like SHIB)
-            # High volatility = faster exits, tighter spike detection, wider stops
-            is_volatile = atr_pct > 0.02  # 2%+ ATR indicates high volatility
-            
-            # Dynamic parameters based on volatility
-            # Adjusted to capture more profit while still protecting gains
-            if is_volatile:
-                # For volatile assets (SHIB): balanced profit capture
-                dynamic_spike_reversal = 0.012  # 1.2% drop from peak (wider to avoid premature exits)
-                dynamic_profit_target = 0.02    # 2.0% profit target (increased from 1.5%)
-                dynamic_atr_multiplier = 2.0    # Wider stop (ATR × 2.0)
-                dynamic_min_spike_profit = 0.015  # Activate spike detection at 1.5% profit (let moves develop)
-                if pos['in_position']:  # Only log when in position to avoid spam
-                    print(f"[{base_currency}] ⚡ Volatile asset (ATR: {atr_pct*100:.2f}%) - Balanced profit capture: 2.0% target, 1.2% spike")
-            else:
-                # Standard settings for less volatile assets (ETH/BTC/LINK): optimized for more profit
-                dynamic_spike_reversal = spike_reversal_pct  # 2.0% drop (wider to avoid premature exits)
-                dynamic_profit_target = profit_target_pct    # 3.5% target (increased to capture more in uptrends)
-                dynamic_atr_multiplier = atr_multiplier       # Standard ATR multiplier
-                dynamic_min_spike_profit = min_spike_profit_pct  # 2.0% activation (let moves develop)
-            
-            print(f"[{base_currency}] Price: ${price:.2f} | RSI: {rsi:.2f} | Stop: ${pos['trailing_stop_price']:.2f} | Position: {'YES' if pos['in_position'] else 'NO'}")
-
-            # --- BUY LOGIC ---
-            if not pos['in_position']:
-                # Cooldown check: avoid quick re-entries after exits
-                current_time = time.time()
-                time_since_exit = current_time - pos['last_exit_time'] if pos['last_exit_time'] > 0 else cooldown_minutes * 60 + 1
-                
-                if time_since_exit < cooldown_minutes * 60:
-                    # Still in cooldown period, skip entry
-                    continue
-                
-                # Market condition filters
-                # 1. Price must be above EMA (trend filter)
-                # 2. RSI must be above threshold (momentum filter)
-                # 3. Trend strength must be sufficient (avoid sideways markets)
-                # 4. EMA must be trending up (slope positive)
-                # 5. Volume should be above average (confirmation)
-                
-                price_above_ema = price > ema_20
-                rsi_strong = rsi > rsi_entry_threshold
-                trend_strong_enough = trend_strength >= min_trend_strength
-                ema_trending_up = ema_slope > 0
-                volume_adequate = volume_ratio >= 1.0  # At least average volume
-                
-                if price_above_ema and rsi_strong and trend_strong_enough and ema_trending_up and volume_adequate:
-                    amount, cost = get_position_size(price, symbol)
-                    
-                    if cost < min_order_size:
-                        print(f"[{base_currency}] ⚠️  Order too small: ${cost:.2f} < ${min_order_size:.2f} minimum. Skipping.")
-                        continue
-                    
-                    if amount > 0:
-                        if use_limit_orders:
-                            # Use limit order (maker) - lower fees (0.4% vs 0.6%)
-                            limit_price = price * (1 - limit_order_offset_pct)  # Slightly below market for buy
-                            print(f"[{base_currency}] 🚀 ENTER LONG (LIMIT): Buying {amount:.6f} {base_currency} at ${limit_price:.2f} (Cost: ${cost:.2f})")
-                            print(f"[{base_currency}] 💰 Using limit order to save fees (maker fee: 0.4% vs taker: 0.6%)")
-                            
-                            if enable_trading:
-                                try:
-                                    # Create limit buy order
-                                    order = exchange.create_limit_buy_order(symbol, amount, limit_price)
-                                    print(f"[{base_currency}] ✅ Limit order placed: {order.get('id', 'N/A')}")
-                                    print(f"[{base_currency}] ⏳ Waiting for order to fill at ${limit_price:.2f}")
-                                    
-                                    # Wait a bit and check if order filled
-                                    time.sleep(5)
-                                    try:
-                                        order_status = exchange.fetch_order(order.get('id'), symbol)
-                                        if order_status.get('status') == 'closed':
-                                            print(f"[{base_currency}] ✅ Order filled!")
-                                        else:
-                                            print(f"[{base_currency}] ⏳ Order pending, will check next cycle")
-                                    except:
-                                        pass  # Order check failed, continue
-                                except Exception as e:
-                                    print(f"[{base_currency}] ❌ Limit order failed: {e}")
-                                    # Fallback to market order if limit fails
-                                    try:
-                                        print(f"[{base_currency}] 🔄 Falling back to market order...")
-                                        order = exchange.create_market_buy_order(symbol, cost)
-                                        print(f"[{base_currency}] ✅ Market order executed: {order.get('id', 'N/A')}")
-                                    except Exception as e2:
-                                        print(f"[{base_currency}] ❌ Market order also failed: {e2}")
-                                        continue
-                            else:
-                                print(f"[{base_currency}]    (Simulated - use --execute to enable real trading)")
-                        else:
-                            # Use market order (taker) - faster but higher fees
-                            print(f"[{base_currency}] 🚀 ENTER LONG: Buying {amount:.6f} {base_currency} (Cost: ${cost:.2f})")
-                            
-                            if enable_trading:
-                                try:
-                                    order = exchange.create_market_buy_order(symbol, cost)
-                                    print(f"[{base_currency}] ✅ Order executed: {order.get('id', 'N/A')}")
-                                except Exception as e:
-                                    print(f"[{base_currency}] ❌ Order failed: {e}")
-                                    continue
-                            else:
-                                print(f"[{base_currency}]    (Simulated - use --execute to enable real trading)")
-                        
-                        # Use volatility-adjusted ATR multiplier for initial stop
-                        initial_atr_mult = 2.0 if atr_pct > 0.02 else atr_multiplier
-                        pos['trailing_stop_price'] = price - (atr * initial_atr_mult)
-                        pos['position_amount'] = amount
-                        pos['entry_price'] = price
-                        pos['peak_price'] = price  # Initialize peak price
-                        pos['trailing_profit_target'] = price * (1 + profit_target_pct)  # Initial profit target
-                        pos['in_position'] = True
-                        pos['breakeven_set'] = False
-
-            # --- SAFETY LOGIC ---
-            elif pos['in_position']:
-                entry_price = pos['entry_price']
-                profit_pct = (price - entry_price) / entry_price
-                
-                # Track peak price (highest price reached)
-                if price > pos['peak_price']:
-                    pos['peak_price'] = price
-                    # Update trailing profit target: moves up as price increases
-                    # Target is always at least profit_target_pct above entry, but moves up with price
-                    # More aggressive trailing: moves up faster to capture more profit
-                    new_target = entry_price * (1 + profit_target_pct) + (price - entry_price) * 0.6  # Increased from 0.5 to 0.6
-                    if new_target > pos['trailing_profit_target']:
-                        pos['trailing_profit_target'] = new_target
-                
-                # Calculate profit target price (volatility-adjusted)
-                profit_target_price = entry_price * (1 + dynamic_profit_target)
-                
-                # --- SPIKE DETECTION & REVERSAL CAPTURE ---
-                # If price has spiked up significantly, sell on reversal
-                peak_profit_pct = (pos['peak_price'] - entry_price) / entry_price
-                drop_from_peak_pct = (pos['peak_price'] - price) / pos['peak_price'] if pos['peak_price'] > 0 else 0
-                
-                # Use volatility-adjusted parameters
-                # Only activate spike detection if we've made meaningful profit
-                if peak_profit_pct >= dynamic_min_spike_profit and drop_from_peak_pct >= dynamic_spike_reversal:
-                    print(f"[{base_currency}] 📉 SPIKE REVERSAL DETECTED: Price dropped {drop_from_peak_pct*100:.2f}% from peak ${pos['peak_price']:.2f}")
-                    print(f"[{base_currency}] 💰 Capturing profit: {profit_pct*100:.2f}% (Peak was {peak_profit_pct*100:.2f}%)")
-                    
-                    if enable_trading:
-                        try:
-                            if use_limit_orders:
-                                limit_sell_price = price * (1 + limit_order_offset_pct)
-                                print(f"[{base_currency}] 💰 Using limit order to save fees")
-                                order = exchange.create_limit_sell_order(symbol, pos['position_amount'], limit_sell_price)
-                                print(f"[{base_currency}] ✅ Limit sell order placed: {order.get('id', 'N/A')} at ${limit_sell_price:.2f}")
-                            else:
-                                order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                                print(f"[{base_currency}] ✅ Spike reversal sell executed: {order.get('id', 'N/A')}")
-                        except Exception as e:
-                            print(f"[{base_currency}] ❌ Spike reversal sell failed: {e}")
-                            if use_limit_orders:
-                                try:
-                                    print(f"[{base_currency}] 🔄 Falling back to market order...")
-                                    order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                                    print(f"[{base_currency}] ✅ Market sell executed: {order.get('id', 'N/A')}")
-                                except Exception as e2:
-                                    print(f"[{base_currency}] ❌ Market sell also failed: {e2}")
-                    else:
-                        print(f"[{base_currency}]    (Simulated - use --execute to enable real trading)")
-                    
-                    pos['in_position'] = False
-                    pos['trailing_stop_price'] = 0.0
-                    pos['position_amount'] = 0.0
-                    pos['entry_price'] = 0.0
-                    pos['peak_price'] = 0.0
-                    pos['trailing_profit_target'] = 0.0
-                    pos['breakeven_set'] = False
-                    pos['last_exit_time'] = time.time()  # Record exit time for cooldown
-                    continue
-                
-                # --- PROFIT TAKING (Static Target) ---
-                if price >= profit_target_price:
-                    print(f"[{base_currency}] 💰 PROFIT TARGET REACHED: {profit_pct*100:.2f}% profit at ${price:.2f}")
-                    
-                    if enable_trading:
-                        try:
-                            if use_limit_orders:
-                                # Use limit sell order (maker) - lower fees
-                                limit_sell_price = price * (1 + limit_order_offset_pct)  # Slightly above market for sell
-                                print(f"[{base_currency}] 💰 Using limit order to save fees")
-                                order = exchange.create_limit_sell_order(symbol, pos['position_amount'], limit_sell_price)
-                                print(f"[{base_currency}] ✅ Limit sell order placed: {order.get('id', 'N/A')} at ${limit_sell_price:.2f}")
-                            else:
-                                order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                                print(f"[{base_currency}] ✅ Profit-taking sell executed: {order.get('id', 'N/A')}")
-                        except Exception as e:
-                            print(f"[{base_currency}] ❌ Profit-taking sell failed: {e}")
-                            # If limit order fails, try market order
-                            if use_limit_orders:
-                                try:
-                                    print(f"[{base_currency}] 🔄 Falling back to market order...")
-                                    order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                                    print(f"[{base_currency}] ✅ Market sell executed: {order.get('id', 'N/A')}")
-                                except Exception as e2:
-                                    print(f"[{base_currency}] ❌ Market sell also failed: {e2}")
-                    else:
-                        print(f"[{base_currency}]    (Simulated - use --execute to enable real trading)")
-                    
-                    pos['in_position'] = False
-                    pos['trailing_stop_price'] = 0.0
-                    pos['position_amount'] = 0.0
-                    pos['entry_price'] = 0.0
-                    pos['peak_price'] = 0.0
-                    pos['trailing_profit_target'] = 0.0
-                    pos['breakeven_set'] = False
-                    pos['last_exit_time'] = time.time()  # Record exit time for cooldown
-                    continue
-                
-                # --- TRAILING PROFIT TARGET (Dynamic) ---
-                # Also check trailing profit target (moves up with price)
-                if pos['trailing_profit_target'] > 0 and price >= pos['trailing_profit_target']:
-                    print(f"[{base_currency}] 💰 TRAILING PROFIT TARGET REACHED: {profit_pct*100:.2f}% profit at ${price:.2f}")
-                    
-                    if enable_trading:
-                        try:
-                            if use_limit_orders:
-                                limit_sell_price = price * (1 + limit_order_offset_pct)
-                                print(f"[{base_currency}] 💰 Using limit order to save fees")
-                                order = exchange.create_limit_sell_order(symbol, pos['position_amount'], limit_sell_price)
-                                print(f"[{base_currency}] ✅ Limit sell order placed: {order.get('id', 'N/A')} at ${limit_sell_price:.2f}")
-                            else:
-                                order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                                print(f"[{base_currency}] ✅ Trailing profit sell executed: {order.get('id', 'N/A')}")
-                        except Exception as e:
-                            print(f"[{base_currency}] ❌ Trailing profit sell failed: {e}")
-                            if use_limit_orders:
-                                try:
-                                    print(f"[{base_currency}] 🔄 Falling back to market order...")
-                                    order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                                    print(f"[{base_currency}] ✅ Market sell executed: {order.get('id', 'N/A')}")
-                                except Exception as e2:
-                                    print(f"[{base_currency}] ❌ Market sell also failed: {e2}")
-                    else:
-                        print(f"[{base_currency}]    (Simulated - use --execute to enable real trading)")
-                    
-                    pos['in_position'] = False
-                    pos['trailing_stop_price'] = 0.0
-                    pos['position_amount'] = 0.0
-                    pos['entry_price'] = 0.0
-                    pos['peak_price'] = 0.0
-                    pos['trailing_profit_target'] = 0.0
-                    pos['breakeven_set'] = False
-                    pos['last_exit_time'] = time.time()  # Record exit time for cooldown
-                    continue
-                
-                # --- BETTER STOP-LOSS MANAGEMENT ---
-                # Raise Safety Net (trailing stop) - use volatility-adjusted multiplier
-                potential_stop = price - (atr * dynamic_atr_multiplier)
-                if potential_stop > pos['trailing_stop_price']:
-                    pos['trailing_stop_price'] = potential_stop
-                
-                # Faster profit locking for volatile assets
-                # Move stop to breakeven once in profit (protect capital)
-                if not pos['breakeven_set'] and price > entry_price * 1.01:  # 1% profit
-                    pos['trailing_stop_price'] = max(pos['trailing_stop_price'], entry_price * 1.005)  # 0.5% above entry
-                    pos['breakeven_set'] = True
-                    print(f"[{base_currency}] 🔒 Stop moved to breakeven at ${pos['trailing_stop_price']:.2f}")
-                
-                # Faster profit locking for ALL assets (to "insure profits")
-                # All assets now lock profits faster than before
-                if is_volatile:
-                    # For volatile assets (SHIB): lock profits very fast
-                    if profit_pct > 0.01:  # 1% profit
-                        min_profit_stop = entry_price * 1.005  # Lock 0.5% profit
-                        if pos['trailing_stop_price'] < min_profit_stop:
-                            pos['trailing_stop_price'] = min_profit_stop
-                            print(f"[{base_currency}] 🔒 Profit locked: 0.5% at ${pos['trailing_stop_price']:.2f}")
-                    
-                    if profit_pct > 0.02:  # 2% profit
-                        min_profit_stop = entry_price * 1.01  # Lock 1% profit
-                        if pos['trailing_stop_price'] < min_profit_stop:
-                            pos['trailing_stop_price'] = min_profit_stop
-                            print(f"[{base_currency}] 🔒 Profit locked: 1.0% at ${pos['trailing_stop_price']:.2f}")
-                else:
-                    # For stable assets (ETH/BTC/LINK): faster profit locking than before
-                    # Now locks profits earlier to "insure profits"
-                    if profit_pct > 0.01:  # 1% profit (NEW - faster than before)
-                        min_profit_stop = entry_price * 1.005  # Lock 0.5% profit (NEW)
-                        if pos['trailing_stop_price'] < min_profit_stop:
-                            pos['trailing_stop_price'] = min_profit_stop
-                            print(f"[{base_currency}] 🔒 Profit locked: 0.5% at ${pos['trailing_stop_price']:.2f}")
-                    
-                    if profit_pct > 0.02:  # 2% profit (faster than old 2%)
-                        min_profit_stop = entry_price * 1.01  # Lock 1% profit (faster than old 1.5%)
-                        if pos['trailing_stop_price'] < min_profit_stop:
-                            pos['trailing_stop_price'] = min_profit_stop
-                            print(f"[{base_currency}] 🔒 Profit locked: 1.0% at ${pos['trailing_stop_price']:.2f}")
-                    
-                    if profit_pct > 0.03:  # 3% profit (faster than old 5%)
-                        min_profit_stop = entry_price * 1.02  # Lock 2% profit (faster than old 3%)
-                        if pos['trailing_stop_price'] < min_profit_stop:
-                            pos['trailing_stop_price'] = min_profit_stop
-                            print(f"[{base_currency}] 🔒 Profit locked: 2.0% at ${pos['trailing_stop_price']:.2f}")
-                
-                # Crash Protection Trigger
-                if price <= pos['trailing_stop_price']:
-                    print(f"[{base_currency}] 🚨 STOP LOSS TRIGGERED at ${price:.2f} (Entry: ${entry_price:.2f}, P/L: {(profit_pct*100):.2f}%)")
-                    
-                    if enable_trading:
-                        try:
-                            # For stop-loss, use market order for immediate execution (safety first)
-                            # Limit orders might not fill fast enough during crashes
-                            order = exchange.create_market_sell_order(symbol, pos['position_amount'])
-                            print(f"[{base_currency}] ✅ Stop-loss sell executed: {order.get('id', 'N/A')}")
-                        except Exception as e:
-                            print(f"[{base_currency}] ❌ Sell order failed: {e}")
-                    else:
-                        print(f"[{base_currency}]    (Simulated - use --execute to enable real trading)")
-                    
-                    pos['in_position'] = False
-                    pos['trailing_stop_price'] = 0.0
-                    pos['position_amount'] = 0.0
-                    pos['entry_price'] = 0.0
-                    pos['peak_price'] = 0.0
-                    pos['trailing_profit_target'] = 0.0
-                    pos['breakeven_set'] = False
-        
+            process_symbol(symbol)
         except Exception as e:
-            print(f"[{symbol}] Error: {e}")
-            continue
+            log.error(f"[{symbol}] Error: {e}")
+        scheduler.reschedule(symbol, positions[symbol])
+    for symbol in flush_exits():
+        scheduler.reschedule(symbol, positions[symbol])  # Exited: cooldown cadence
+    if native_stops:
+        native_stops.poll()
+        sync_native_stops()
+    if trade_stream:
+        arm_trade_stream()
+    if tracker.awaiting_fill:
+        tracker.poll(exchange)
     
-    time.sleep(check_interval)
+    if health_server:
+        publish_state(iteration)
+    if snapshots_enabled and clock.time() >= next_snapshot:
+        save_state()
+        next_snapshot = clock.time() + snapshot_interval
+
+    try:
+        wait_for_next_cycle()
+    except ReplayFinished:
+        if args.replay_log:
+            summary = exchange.summary()
+            event(log, 'summary', f"⏪ Replay finished: {summary['replayed']}/{summary['calls']} calls replayed, "
+                                  f"{summary['mismatches']} matched loosely, {summary['unused']} unused", **summary)
+        else:
+            print_paper_summary()
+        print_execution_summary()
+        break
 
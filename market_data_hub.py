@@ -0,0 +1,194 @@
+"""
+Market Data Hub
+One process fetches public market data (candles, tickers, order books) for every account and
+serves it to the account workers over a local authenticated socket. Identical requests from
+several workers inside `max_age` seconds cost one exchange call; concurrent misses for the same
+key wait for a single fetch instead of each going upstream.
+
+    hub = MarketDataHub(public_exchange, max_age=5).start()          # Supervisor
+    exchange = SharedMarketData(exchange, hub.address, hub.authkey)  # Worker (private calls stay direct)
+"""
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+PUBLIC_METHODS = ('fetch_ohlcv', 'fetch_ticker', 'fetch_tickers', 'fetch_order_book')
+
+
+class MarketDataHub:
+    """Cache public market data and serve it to worker connections (one thread per connection)"""
+
+    def __init__(self, exchange, max_age=5.0, order_book_max_age=1.0, host='127.0.0.1', port=0, authkey=None, clock=time):
+        self.exchange = exchange
+        self.max_age = max_age                          # Candles and tickers
+        self.order_book_max_age = min(order_book_max_age, max_age)
+        self.authkey = authkey or os.urandom(16)
+        self.clock = clock
+        self.listener = Listener((host, port), authkey=self.authkey)
+        self.address = self.listener.address
+        self.requests = 0
+        self.upstream_calls = 0
+        self.errors = 0
+        self.clients = 0
+        self._cache = {}                                # key -> (fetched at, value)
+        self._locks = {}                                # key -> lock held while fetching it
+        self._locks_guard = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._accept, name='market-data-hub', daemon=True).start()
+        return self
+
+    def stats(self):
+        return {'address': f"{self.address[0]}:{self.address[1]}", 'clients': self.clients,
+                'requests': self.requests, 'upstream_calls': self.upstream_calls, 'errors': self.errors,
+                'hit_rate': round(1 - self.upstream_calls / self.requests, 3) if self.requests else None}
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                continue  # Failed handshake (wrong key) - keep serving the others
+            threading.Thread(target=self._serve, args=(conn,), name='market-data-client', daemon=True).start()
+
+    def _serve(self, conn):
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    method, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ('ok', self.get(method, *args, **kwargs))
+                except Exception as e:
+                    self.errors += 1
+                    reply = ('error', type(e).__name__, str(e))
+                conn.send(reply)
+        finally:
+            self.clients -= 1
+            conn.close()
+
+    def get(self, method, *args, **kwargs):
+        """Answer one public call from the cache, fetching it when stale or not deep enough"""
+        if method not in PUBLIC_METHODS:
+            raise ValueError(f"{method} is not served by the market data hub")
+        self.requests += 1
+        if method == 'fetch_ohlcv':
+            return self._ohlcv(*args, **kwargs)
+        if method == 'fetch_order_book':
+            return self._order_book(*args, **kwargs)
+        if method == 'fetch_ticker':
+            return self._cached((method, args[0]), self.max_age, lambda: self.exchange.fetch_ticker(*args, **kwargs))
+        symbols = args[0] if args else kwargs.get('symbols')
+        key = (method, tuple(sorted(symbols)) if symbols else None)
+        return self._cached(key, self.max_age, lambda: self.exchange.fetch_tickers(*args, **kwargs))
+
+    def _ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        if since is not None or params:
+            self.upstream_calls += 1  # History requests are rare and can't be sliced from the latest candles
+            return self.exchange.fetch_ohlcv(symbol, timeframe, since, limit, params or {})
+        want = limit or 100
+        key = ('fetch_ohlcv', symbol, timeframe)
+
+        def fetch():
+            cached = self._cache.get(key)
+            depth = max(want, len(cached[1]) if cached else 0)  # Keep serving the deepest request seen
+            return self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=depth)
+
+        bars = self._cached(key, self.max_age, fetch, lambda bars: len(bars) >= want)
+        return bars[-want:]
+
+    def _order_book(self, symbol, limit=None, params=None):
+        want = limit or 50
+        key = ('fetch_order_book', symbol)
+
+        def deep_enough(book):
+            return book.get('limit', 0) >= want
+
+        def fetch():
+            book = self.exchange.fetch_order_book(symbol, limit=want)
+            book['limit'] = want
+            return book
+
+        book = self._cached(key, self.order_book_max_age, fetch, deep_enough)
+        return dict(book, bids=book['bids'][:want], asks=book['asks'][:want])
+
+    def _cached(self, key, max_age, fetch, usable=None):
+        cached = self._cache.get(key)
+        if self._fresh(cached, max_age, usable):
+            return cached[1]
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            cached = self._cache.get(key)
+            if self._fresh(cached, max_age, usable):
+                return cached[1]  # Another worker fetched it while we waited
+            value = fetch()
+            self.upstream_calls += 1
+            self._cache[key] = (self.clock.time(), value)
+            return value
+
+    def _fresh(self, cached, max_age, usable):
+        return (cached is not None and self.clock.time() - cached[0] <= max_age
+                and (usable is None or usable(cached[1])))
+
+
+class SharedMarketData:
+    """Exchange proxy for a worker: public market data from the hub, everything else direct.
+
+    If the hub can't be reached the call goes straight to the exchange, so a worker keeps
+    trading when the supervisor's hub is restarting.
+    """
+
+    def __init__(self, exchange, address, authkey, retry_after=30.0):
+        self._exchange = exchange
+        self._address = address
+        self._authkey = authkey
+        self._retry_after = retry_after
+        self._conn = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.hub_calls = 0
+        self.direct_calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        if name in PUBLIC_METHODS:
+            return lambda *args, **kwargs: self._call(name, attr, args, kwargs)
+        return attr
+
+    def _call(self, name, direct, args, kwargs):
+        with self._lock:
+            reply = self._ask_hub(name, args, kwargs)
+        if reply is None:
+            self.direct_calls += 1
+            return direct(*args, **kwargs)
+        self.hub_calls += 1
+        if reply[0] == 'ok':
+            return reply[1]
+        raise self._exception(reply[1], reply[2])
+
+    def _ask_hub(self, name, args, kwargs):
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            if self._conn is None:
+                self._conn = Client(tuple(self._address), authkey=self._authkey)
+            self._conn.send((name, args, kwargs))
+            return self._conn.recv()
+        except Exception:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._down_until = time.monotonic() + self._retry_after
+            return None
+
+    @staticmethod
+    def _exception(type_name, message):
+        import ccxt
+        cls = getattr(ccxt, type_name, None)
+        if isinstance(cls, type) and issubclass(cls, Exception):
+            return cls(message)
+        return ccxt.ExchangeError(f"{type_name}: {message}")
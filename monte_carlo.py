@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Risk Simulation
+Bootstraps per-trade returns (from a backtest or a returns file) into many equity paths at
+once and reports drawdown, recovery time, ruin and min-order-size risk for the configured
+TRADING_RISK_PCT, TRADING_LEVERAGE and number of symbols.
+
+Usage:
+    python monte_carlo.py --data data/candles                  # Returns from a backtest of the current settings
+    python monte_carlo.py --returns trades.csv --paths 200000  # One net return per line (0.012 = +1.2%)
+    python monte_carlo.py --data data/candles --risk-pct 0.3 --leverage 3 --trades 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def load_returns_file(path):
+    """Per-trade net returns from a text/CSV file (last column; header lines are skipped)"""
+    returns = []
+    with open(path) as f:
+        for line in f:
+            value = line.strip().split(',')[-1]
+            try:
+                returns.append(float(value))
+            except ValueError:
+                continue  # Header or blank line
+    return np.array(returns, dtype=np.float64)
+
+
+def backtest_returns(directory, symbols, timeframe):
+    """Net trade returns of the current settings over the whole history, plus trades per day"""
+    from backtest import load_indicators, params_from_env, run_backtest
+    from candle_buffer import timeframe_to_ms
+
+    indicators = load_indicators(directory, symbols, timeframe)
+    params = params_from_env()
+    trades = []
+    days = 0.0
+    for ind in indicators.values():
+        for _, exit_i, net_return, _ in run_backtest(ind, 0, len(ind['close']), params, timeframe_to_ms(timeframe)):
+            trades.append((ind['timestamp'][exit_i], net_return))
+        days = max(days, (ind['timestamp'][-1] - ind['timestamp'][0]) / 86400000)
+    trades.sort()
+    return np.array([r for _, r in trades], dtype=np.float64), (len(trades) / days if days else None)
+
+
+def sample_returns(rng, returns, paths, trades, block=1):
+    """(paths, trades) matrix of bootstrapped returns; block > 1 keeps runs of consecutive trades"""
+    if block <= 1:
+        return returns[rng.integers(0, len(returns), size=(paths, trades))]
+    blocks = -(-trades // block)
+    starts = rng.integers(0, len(returns), size=(paths, blocks, 1))
+    index = (starts + np.arange(block)) % len(returns)
+    return returns[index.reshape(paths, blocks * block)[:, :trades]]
+
+
+def simulate_chunk(returns_matrix, position_fraction, ruin_equity):
+    """Equity paths for one chunk (starting equity 1.0). Returns per-path metric arrays."""
+    growth = 1.0 + position_fraction * returns_matrix
+    np.maximum(growth, 0.0, out=growth)  # A loss beyond the position wipes the account out
+    equity = np.cumprod(growth, axis=1)
+
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, 1.0, out=peak)  # Starting equity counts as the first peak
+    drawdown = 1.0 - equity / peak
+    max_drawdown = drawdown.max(axis=1)
+
+    # Longest underwater stretch (trades since the last equity high)
+    steps = np.arange(1, equity.shape[1] + 1)
+    at_peak = equity >= peak
+    last_peak = np.maximum.accumulate(np.where(at_peak, steps, 0), axis=1)
+    longest_underwater = (steps - last_peak).max(axis=1)
+    recovered = at_peak[:, -1] | (drawdown[:, -1] <= 1e-12)
+
+    return {
+        'final_return': equity[:, -1] - 1.0,
+        'max_drawdown': max_drawdown,
+        'longest_underwater': longest_underwater,
+        'recovered': recovered,
+        'below_min_order': equity.min(axis=1) < ruin_equity,
+    }
+
+
+def run_simulation(returns, paths, trades, position_fraction, ruin_equity, block=1, seed=None, chunk_size=5000):
+    """Simulate `paths` equity paths of `trades` trades each, in chunks to bound memory"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for start in range(0, paths, chunk_size):
+        count = min(chunk_size, paths - start)
+        parts.append(simulate_chunk(sample_returns(rng, returns, count, trades, block), position_fraction, ruin_equity))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Monte Carlo drawdown and ruin risk of the trading settings')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--returns', help='File with one net trade return per line')
+    source.add_argument('--data', help='Candle CSV directory - backtest the current settings for returns')
+    parser.add_argument('--symbols', default=os.getenv('TRADING_SYMBOLS', 'ETH/USD,BTC/USD'))
+    parser.add_argument('--timeframe', default=os.getenv('TRADING_TIMEFRAME', '5m'))
+    parser.add_argument('--paths', type=int, default=100000)
+    parser.add_argument('--trades', type=int, help='Trades per path (default: ~30 days at the backtest rate, else 200)')
+    parser.add_argument('--block', type=int, default=1, help='Bootstrap block length (>1 keeps losing streaks together)')
+    parser.add_argument('--balance', type=float, default=float(os.getenv('MONTE_CARLO_BALANCE', '1000')), help='Starting USD balance')
+    parser.add_argument('--risk-pct', type=float, default=float(os.getenv('TRADING_RISK_PCT', '0.20')))
+    parser.add_argument('--leverage', type=float, default=float(os.getenv('TRADING_LEVERAGE', '5')))
+    parser.add_argument('--min-order-size', type=float, default=float(os.getenv('TRADING_MIN_ORDER_SIZE', '1.00')))
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(',') if s.strip()]
+    trades_per_day = None
+    if args.returns:
+        returns = load_returns_file(args.returns)
+        print(f"📄 Loaded {len(returns)} trade returns from {args.returns}")
+    else:
+        returns, trades_per_day = backtest_returns(args.data, symbols, args.timeframe)
+        print(f"📊 Backtest of current settings: {len(returns)} trades ({trades_per_day or 0:.1f}/day)")
+    if len(returns) == 0:
+        print("❌ No trade returns to sample from")
+        return 1
+
+    trades = args.trades or (max(1, int(round(trades_per_day * 30))) if trades_per_day else 200)
+
+    # Same sizing as the bot: margin = balance * risk / symbols, position = margin * leverage
+    risk_per_symbol = args.risk_pct / len(symbols)
+    position_fraction = risk_per_symbol * args.leverage
+    # Orders are skipped once balance * risk_per_symbol drops below the minimum order size
+    ruin_equity = args.min_order_size / (risk_per_symbol * args.balance)
+
+    print(f"🎲 {args.paths:,} paths × {trades} trades, position {position_fraction*100:.1f}% of equity per trade "
+          f"({args.risk_pct*100:.0f}% risk / {len(symbols)} symbol(s) × {args.leverage:g}x)")
+    started = time.perf_counter()
+    result = run_simulation(returns, args.paths, trades, position_fraction, ruin_equity, args.block, args.seed)
+    elapsed = time.perf_counter() - started
+
+    def row(label, values, fmt):
+        cells = ' '.join(fmt(v) for v in np.percentile(values, PERCENTILES))
+        print(f"   {label:<22} {cells}")
+
+    pct = lambda v: f"{v*100:>8.1f}%"
+    print(f"\n   {'':<22} " + ' '.join(f"{'p' + str(p):>9}" for p in PERCENTILES))
+    row('Final return', result['final_return'], pct)
+    row('Max drawdown', result['max_drawdown'], pct)
+    row('Longest underwater', result['longest_underwater'], lambda v: f"{v:>6.0f} tr")
+    if trades_per_day:
+        row('  (days)', result['longest_underwater'] / trades_per_day, lambda v: f"{v:>7.1f}d")
+
+    print(f"\n📉 P(max drawdown > 20%): {(result['max_drawdown'] > 0.20).mean()*100:.2f}%")
+    print(f"📉 P(max drawdown > 50%): {(result['max_drawdown'] > 0.50).mean()*100:.2f}%")
+    print(f"⏳ Paths still below their high at the end: {(~result['recovered']).mean()*100:.2f}%")
+    print(f"🛑 P(balance falls below ${ruin_equity * args.balance:.2f}, where orders drop under "
+          f"${args.min_order_size:.2f}): {result['below_min_order'].mean()*100:.2f}%")
+    print(f"\n⏱️  Simulated in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Native Stop Orders
+Keeps a server-side stop-limit sell on the exchange for every open position, so the position
+is protected between polls and even while the bot is down. The order follows the bot's own
+trailing stop and profit locks as they rise.
+
+Amending is debounced: a stop is only moved once it has risen by `min_move_pct`, and at most
+once per `min_interval` seconds per symbol. A stop that crosses the entry price (breakeven and
+profit locks) is moved right away. Stops never move down.
+
+    stops = NativeStopManager(exchange, on_fill=on_native_stop_filled)
+    stops.sync(symbol, amount, stop_price, entry_price)   # After the local stop was updated
+    stops.poll()                                          # Between cycles: detect triggered stops
+    stops.cancel(symbol)                                  # Before the bot sells itself
+"""
+import logging
+import time
+import uuid
+
+import ccxt
+
+from bot_logger import event, tick
+
+log = logging.getLogger('bot.native_stops')
+
+CLIENT_ID_PREFIX = 'nstop-'  # Client order id of the bot's stops; recover() leaves other orders alone
+
+
+class NativeStop:
+    """One stop-limit sell resting on the exchange"""
+
+    def __init__(self, symbol, order_id, amount, stop_price, limit_price, now):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.amount = amount
+        self.stop_price = stop_price
+        self.limit_price = limit_price
+        self.last_change = now
+        self.amends = 0
+        self.filled = 0.0               # Set once the order is closed or canceled
+        self.average_price = None
+        self.status = 'open'            # open, filled, canceled
+
+    def to_dict(self):
+        return {'order_id': self.order_id, 'amount': self.amount, 'stop': self.stop_price,
+                'limit': self.limit_price, 'amends': self.amends}
+
+
+class NativeStopManager:
+    """Place, amend and watch one native stop per symbol"""
+
+    def __init__(self, exchange, on_fill=None, limit_offset_pct=0.01, min_move_pct=0.002, min_interval=30,
+                 poll_interval=10, clock=time):
+        self.exchange = exchange
+        self.on_fill = on_fill                      # on_fill(stop): the exchange sold the position
+        self.limit_offset_pct = limit_offset_pct    # Limit price below the stop (room to fill in a fast drop)
+        self.min_move_pct = min_move_pct            # Smaller stop raises are not sent
+        self.min_interval = min_interval            # Seconds between changes of one symbol's order
+        self.poll_interval = poll_interval          # Seconds between open-order checks
+        self.clock = clock
+        self.stops = {}                             # symbol -> NativeStop
+        self.last_attempt = {}                      # symbol -> time of the last failed placement
+        self.last_poll = float('-inf')
+        self.placed = 0
+        self.amended = 0
+        self.skipped = 0                            # Raises held back by the debounce
+        self._can_edit = bool(getattr(exchange, 'has', {}).get('editOrder'))
+
+    @property
+    def active(self):
+        return bool(self.stops)
+
+    def get(self, symbol):
+        return self.stops.get(symbol)
+
+    def recover(self, symbols):
+        """Take over the bot's stop orders left on the exchange by a previous run. Returns the symbols found."""
+        wanted = set(symbols)
+        now = self.clock.time()
+        for order in self.exchange.fetch_open_orders():
+            symbol = order.get('symbol')
+            trigger = order.get('triggerPrice') or order.get('stopPrice')
+            client_id = str(order.get('clientOrderId') or '')
+            if symbol in wanted and order.get('side') == 'sell' and trigger and client_id.startswith(CLIENT_ID_PREFIX):
+                self.stops[symbol] = NativeStop(symbol, order['id'], float(order.get('remaining') or order['amount']),
+                                                float(trigger), float(order.get('price') or 0.0), now)
+        return list(self.stops)
+
+    def sync(self, symbol, amount, stop_price, entry_price=0.0):
+        """Bring the symbol's native stop in line with the local one (placing it if needed)"""
+        if amount <= 0 or stop_price <= 0:
+            return
+        now = self.clock.time()
+        current = self.stops.get(symbol)
+        if current is None:
+            if now - self.last_attempt.get(symbol, float('-inf')) >= self.min_interval:
+                self._place(symbol, amount, stop_price, now)
+            return
+        resized = abs(current.amount - amount) > amount * 1e-6
+        if not resized:
+            if stop_price < current.stop_price * (1 + self.min_move_pct):
+                return
+            crosses_entry = current.stop_price < entry_price <= stop_price
+            if now - current.last_change < self.min_interval and not crosses_entry:
+                self.skipped += 1
+                return
+        self._move(current, amount, stop_price, now)
+
+    def cancel(self, symbol):
+        """Pull a symbol's native stop. Returns the NativeStop (with any fills) or None."""
+        stop = self.stops.pop(symbol, None)
+        self.last_attempt.pop(symbol, None)
+        if stop is None:
+            return None
+        try:
+            order = self.exchange.cancel_order(stop.order_id, symbol)
+        except Exception:
+            order = None  # Already filled or canceled - the fetch below tells which
+        try:
+            order = self.exchange.fetch_order(stop.order_id, symbol)
+        except Exception as e:
+            if order is None:
+                log.warning(f"[{symbol.split('/')[0]}] ⚠️  Native stop {stop.order_id} state unknown after cancel: {e}")
+        self._settle(stop, order or {})
+        stop.status = 'filled' if order and order.get('status') == 'closed' else 'canceled'
+        return stop
+
+    def poll(self):
+        """Look for stops that triggered on the exchange. One open-orders call per poll_interval."""
+        if not self.stops:
+            return
+        now = self.clock.time()
+        if now - self.last_poll < self.poll_interval:
+            return
+        self.last_poll = now
+        try:
+            open_ids = {order.get('id') for order in self.exchange.fetch_open_orders()}
+        except Exception as e:
+            tick(log, 'native_stop_poll', f"⚠️  Native stop poll failed: {e}", level=logging.WARNING)
+            return
+        for symbol, stop in list(self.stops.items()):
+            if stop.order_id in open_ids:
+                continue
+            try:
+                order = self.exchange.fetch_order(stop.order_id, symbol)
+            except Exception as e:
+                log.warning(f"[{symbol.split('/')[0]}] ⚠️  Native stop {stop.order_id} lookup failed: {e}")
+                continue
+            status = order.get('status')
+            if status == 'closed':
+                self.stops.pop(symbol, None)
+                self._settle(stop, order)
+                stop.status = 'filled'
+                event(log, 'exit', f"[{symbol.split('/')[0]}] 🛑 Native stop filled: {stop.filled:.6f} @ ${stop.average_price or stop.limit_price:.6f}",
+                      symbol=symbol, order_id=stop.order_id, stop=stop.stop_price, filled=stop.filled,
+                      average_price=stop.average_price)
+                self._finish(stop)
+            elif status in ('canceled', 'expired', 'rejected'):
+                # Removed outside the bot - placed again on the next sync
+                self.stops.pop(symbol, None)
+                log.warning(f"[{symbol.split('/')[0]}] ⚠️  Native stop {stop.order_id} was {status} on the exchange")
+
+    def snapshot(self):
+        return {'stops': {symbol: stop.to_dict() for symbol, stop in self.stops.items()},
+                'placed': self.placed, 'amended': self.amended, 'debounced': self.skipped}
+
+    def _place(self, symbol, amount, stop_price, now, replacing=False):
+        limit_price = stop_price * (1 - self.limit_offset_pct)
+        try:
+            order = self.exchange.create_order(symbol, 'limit', 'sell', amount, self._price(symbol, limit_price),
+                                               {'stopLossPrice': self._price(symbol, stop_price),
+                                                # Coinbase's own key: ccxt drops 'clientOrderId' and sends 'ccxt-<uuid>'
+                                                'client_order_id': CLIENT_ID_PREFIX + uuid.uuid4().hex})
+        except Exception as e:
+            self.last_attempt[symbol] = now
+            log.warning(f"[{symbol.split('/')[0]}] ⚠️  Native stop not placed (retry in {self.min_interval:g}s): {e}")
+            return None
+        self.last_attempt.pop(symbol, None)
+        if not replacing:
+            self.placed += 1
+        stop = self.stops[symbol] = NativeStop(symbol, order.get('id'), amount, stop_price, limit_price, now)
+        if replacing:
+            return stop
+        event(log, 'order', f"[{symbol.split('/')[0]}] 🛡️  Native stop placed at ${stop_price:.6f} (limit ${limit_price:.6f})",
+              symbol=symbol, order_id=stop.order_id, stop=stop_price, limit=limit_price, amount=amount)
+        return stop
+
+    def _move(self, stop, amount, stop_price, now):
+        symbol = stop.symbol
+        limit_price = stop_price * (1 - self.limit_offset_pct)
+        if not self._can_edit:
+            self._replace(stop, amount, stop_price, now)
+            return
+        try:
+            order = self.exchange.edit_order(stop.order_id, symbol, 'limit', 'sell', amount,
+                                             self._price(symbol, limit_price),
+                                             {'stop_price': self._price(symbol, stop_price)})
+        except (ccxt.NotSupported, ccxt.InvalidOrder):
+            self._can_edit = False  # Stop orders can't be amended here - replace from now on
+            self._replace(stop, amount, stop_price, now)
+            return
+        except Exception as e:
+            stop.last_change = now  # Keep the old stop and try again after min_interval
+            tick(log, f'native_stop_edit:{symbol}', f"[{symbol.split('/')[0]}] ⚠️  Native stop amend failed: {e}",
+                 level=logging.WARNING)
+            return
+        info = order.get('info') or {}
+        if info.get('success') is False:
+            # Coinbase reports a rejected edit in the response body instead of raising
+            log.warning(f"[{symbol.split('/')[0]}] ⚠️  Native stop amend rejected "
+                        f"({info.get('error_response') or info}) - replacing it")
+            self._replace(stop, amount, stop_price, now)
+            return
+        stop.order_id = order.get('id') or stop.order_id
+        stop.amount, stop.stop_price, stop.limit_price = amount, stop_price, limit_price
+        stop.last_change = now
+        stop.amends += 1
+        self.amended += 1
+        tick(log, f'native_stop:{symbol}', f"[{symbol.split('/')[0]}] 🛡️  Native stop raised to ${stop_price:.6f}",
+             symbol=symbol, stop=stop_price)
+
+    def _replace(self, stop, amount, stop_price, now):
+        symbol = stop.symbol
+        replaced = self.cancel(symbol)
+        if replaced.status == 'filled' or replaced.filled > 0:
+            self._finish(replaced)  # Triggered before we got to it
+            return
+        new = self._place(symbol, amount, stop_price, now, replacing=True)
+        if new is not None:
+            new.amends = replaced.amends + 1
+            self.amended += 1
+            tick(log, f'native_stop:{symbol}', f"[{symbol.split('/')[0]}] 🛡️  Native stop raised to ${stop_price:.6f} (replaced)",
+                 symbol=symbol, stop=stop_price)
+
+    def _settle(self, stop, order):
+        filled = order.get('filled')
+        if filled:
+            stop.filled = float(filled)
+            stop.average_price = order.get('average') or stop.limit_price
+
+    def _price(self, symbol, price):
+        to_precision = getattr(self.exchange, 'price_to_precision', None)
+        return float(to_precision(symbol, price)) if to_precision else price
+
+    def _finish(self, stop):
+        if self.on_fill:
+            try:
+                self.on_fill(stop)
+            except Exception as e:
+                log.warning(f"[{stop.symbol.split('/')[0]}] ⚠️  Native stop callback failed: {e}")
@@ -0,0 +1,132 @@
+"""
+L2 Order Book Cache
+Local per-symbol order books refreshed from REST snapshots (fetch_order_book) on demand, with
+fast VWAP / slippage estimates for a given order size (used before submitting market orders).
+"""
+import time
+
+
+class OrderBook:
+    """L2 book for one symbol. Price levels are kept sorted best-first for fast depth walks."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        # Sorted keys, best level first: asks ascending by price, bids stored as -price
+        self._ask_keys = []
+        self._bid_keys = []
+        self._asks = {}  # price -> size
+        self._bids = {}
+
+    def apply_snapshot(self, bids, asks):
+        """Replace the book with [[price, size], ...] levels (ccxt fetch_order_book format)"""
+        self._bids = {float(p): float(s) for p, s, *_ in bids if float(s) > 0}
+        self._asks = {float(p): float(s) for p, s, *_ in asks if float(s) > 0}
+        self._bid_keys = sorted(-p for p in self._bids)
+        self._ask_keys = sorted(self._asks)
+
+    @property
+    def best_bid(self):
+        return -self._bid_keys[0] if self._bid_keys else None
+
+    @property
+    def best_ask(self):
+        return self._ask_keys[0] if self._ask_keys else None
+
+    @property
+    def mid(self):
+        if not self._bid_keys or not self._ask_keys:
+            return self.best_ask or self.best_bid
+        return (self.best_ask + self.best_bid) / 2
+
+    def estimate_buy(self, cost, reference_price=None):
+        """Walk the asks spending `cost` in quote currency (market buy by cost)"""
+        remaining = cost
+        filled = 0.0
+        worst = None
+        for price in self._ask_keys:
+            level_cost = price * self._asks[price]
+            worst = price
+            if level_cost >= remaining:
+                filled += remaining / price
+                remaining = 0.0
+                break
+            filled += self._asks[price]
+            remaining -= level_cost
+        return self._estimate(cost - remaining, filled, worst, remaining <= 0, reference_price, side='buy')
+
+    def estimate_sell(self, amount, reference_price=None):
+        """Walk the bids selling `amount` of the base currency (market sell by amount)"""
+        remaining = amount
+        spent = 0.0
+        worst = None
+        for key in self._bid_keys:
+            price = -key
+            size = self._bids[price]
+            worst = price
+            if size >= remaining:
+                spent += remaining * price
+                remaining = 0.0
+                break
+            spent += size * price
+            remaining -= size
+        return self._estimate(spent, amount - remaining, worst, remaining <= 0, reference_price, side='sell')
+
+    def _estimate(self, quote, base, worst, complete, reference_price, side):
+        reference = reference_price or self.mid
+        vwap = quote / base if base > 0 else None
+        slippage = None
+        if vwap and reference:
+            # Positive = worse than the reference price for this side
+            slippage = (vwap - reference) / reference if side == 'buy' else (reference - vwap) / reference
+        return {
+            'vwap': vwap,
+            'worst_price': worst,
+            'filled_base': base,
+            'filled_quote': quote,
+            'slippage_pct': slippage,
+            'complete': complete,
+        }
+
+    def max_buy_cost(self, max_slippage_pct, reference_price=None):
+        """Largest market-buy cost whose VWAP stays within max_slippage_pct of the reference"""
+        reference = reference_price or self.mid
+        if not reference:
+            return 0.0
+        limit_vwap = reference * (1 + max_slippage_pct)
+        quote = base = 0.0
+        for price in self._ask_keys:
+            size = self._asks[price]
+            if (quote + price * size) / (base + size) <= limit_vwap:
+                quote += price * size
+                base += size
+                continue
+            # Partial level: solve (quote + p*x) / (base + x) = limit_vwap for x
+            if price > limit_vwap:
+                x = (limit_vwap * base - quote) / (price - limit_vwap)
+                quote += price * max(0.0, min(x, size))
+            break
+        return quote
+
+
+class OrderBookCache:
+    """Order books for many symbols, refreshed from REST snapshots when stale"""
+
+    def __init__(self, exchange, depth=50, max_age=2.0, clock=time):
+        self.exchange = exchange
+        self.depth = depth
+        self.max_age = max_age
+        self.clock = clock  # Anything with time() - the bot's SimClock in paper/replay mode
+        self.books = {}
+        self._updated = {}  # symbol -> clock time of the last snapshot
+
+    def get(self, symbol):
+        """Return a book no older than max_age seconds (fetches a snapshot if needed)"""
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        now = self.clock.time()
+        if now - self._updated.get(symbol, float('-inf')) > self.max_age:
+            snapshot = self.exchange.fetch_order_book(symbol, limit=self.depth)
+            book.apply_snapshot(snapshot.get('bids', []), snapshot.get('asks', []))
+            self._updated[symbol] = now
+        return book
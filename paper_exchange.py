@@ -0,0 +1,464 @@
+"""
+Paper Trading
+Simulated order execution for the trading bots, either on live market data or replaying
+historical candles on an accelerated clock.
+
+  SimClock       time()/sleep() used by the bot; real time live, virtual time in replay
+  ReplayFeed     market data (candles, tickers, order books) replayed from CSV files
+  PaperExchange  ccxt-style exchange with maker/taker fees, slippage, partial fills, latency
+                 and stop-limit sells
+
+Candle CSV files are named <BASE>-<QUOTE>_<timeframe>.csv (e.g. ETH-USD_5m.csv) with the
+columns timestamp,open,high,low,close,volume (timestamp in milliseconds).
+"""
+import bisect
+import os
+import random
+import time
+
+import numpy as np
+
+from candle_buffer import timeframe_to_ms
+from order_book import OrderBook
+
+CSV_HEADER = 'timestamp,open,high,low,close,volume'
+
+
+class ReplayFinished(Exception):
+    """Raised by SimClock.sleep() once the replay has run out of data"""
+
+
+class PaperError(Exception):
+    """Order rejected by the paper exchange (insufficient funds, unknown order, ...)"""
+
+
+def candle_csv_path(directory, symbol, timeframe):
+    return os.path.join(directory, f"{symbol.replace('/', '-')}_{timeframe}.csv")
+
+
+def load_candles_csv(path):
+    """Load a candle CSV into an (N, 6) float array sorted by timestamp"""
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    return data[np.argsort(data[:, 0], kind='stable')]
+
+
+class SimClock:
+    """Clock seam for the bot. Live: wraps time.time/time.sleep. Replay: virtual time.
+
+    In replay mode sleep() advances virtual time instantly; with speed > 0 it also sleeps
+    seconds / speed of real time (speed=1000 runs 1000x faster than real time).
+    """
+
+    def __init__(self, start=None, speed=0.0, until=None):
+        self.replay = start is not None
+        self.now = start
+        self.speed = speed
+        self.until = until
+
+    def time(self):
+        return self.now if self.replay else time.time()
+
+    def sleep(self, seconds):
+        if self.replay and self.until is not None and self.now >= self.until:
+            raise ReplayFinished()
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Let time pass without the end-of-replay check (used for simulated latency)"""
+        if not self.replay:
+            time.sleep(seconds)
+            return
+        self.now += seconds
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+
+
+class ReplayFeed:
+    """Market data replayed from candle CSVs, revealed up to the clock's current time.
+
+    The candle containing the current time is returned as still forming: its close moves
+    linearly from open to close through the candle, so the bot never sees the future close.
+    """
+
+    def __init__(self, directory, symbols, timeframe, speed=0.0, warmup=100, half_spread_pct=0.0002):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.half_spread_pct = half_spread_pct
+        self.candles = {}
+        self._timestamps = {}
+        for symbol in self.symbols:
+            data = load_candles_csv(candle_csv_path(directory, symbol, timeframe))
+            if len(data) <= warmup:
+                raise ValueError(f"{symbol}: need more than {warmup} candles to replay, found {len(data)}")
+            self.candles[symbol] = data
+            self._timestamps[symbol] = data[:, 0].astype(np.int64).tolist()
+
+        # Start once every symbol has `warmup` candles of history, stop when any runs out
+        start_ms = max(int(data[warmup, 0]) for data in self.candles.values())
+        end_ms = min(int(data[-1, 0]) for data in self.candles.values()) + self.timeframe_ms
+        self.clock = SimClock(start=start_ms / 1000.0, speed=speed, until=end_ms / 1000.0)
+        self.markets = {}
+
+    def _position(self, symbol):
+        # (index of the forming candle, fraction of it elapsed)
+        now_ms = self.clock.time() * 1000
+        index = bisect.bisect_right(self._timestamps[symbol], now_ms) - 1
+        if index < 0:
+            raise PaperError(f"No replay data for {symbol} at {now_ms:.0f}")
+        fraction = min(1.0, (now_ms - self._timestamps[symbol][index]) / self.timeframe_ms)
+        return index, fraction
+
+    def _forming_bar(self, symbol, index, fraction):
+        ts, open_, high, low, close, volume = self.candles[symbol][index]
+        price = open_ + (close - open_) * fraction
+        return [int(ts), open_, max(open_, price), min(open_, price), price, volume * fraction]
+
+    def load_markets(self, reload=False):
+        self.markets = {
+            symbol: {
+                'symbol': symbol,
+                'base': symbol.split('/')[0],
+                'quote': symbol.split('/')[1],
+                'active': True,
+                'limits': {'cost': {'min': 1.0}},
+            } for symbol in self.symbols
+        }
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=100, params=None):
+        if timeframe != self.timeframe:
+            raise PaperError(f"Replay data is {self.timeframe}, not {timeframe}")
+        index, fraction = self._position(symbol)
+        start = max(0, index - limit + 1)
+        bars = [[int(row[0]), *row[1:].tolist()] for row in self.candles[symbol][start:index]]
+        bars.append(self._forming_bar(symbol, index, fraction))
+        return bars
+
+    def fetch_ticker(self, symbol, params=None):
+        index, fraction = self._position(symbol)
+        bar = self._forming_bar(symbol, index, fraction)
+        last = bar[4]
+        return {
+            'symbol': symbol,
+            'timestamp': int(self.clock.time() * 1000),
+            'last': last,
+            'bid': last * (1 - self.half_spread_pct),
+            'ask': last * (1 + self.half_spread_pct),
+            'baseVolume': self.candles[symbol][index][5],
+        }
+
+    def fetch_tickers(self, symbols=None, params=None):
+        return {symbol: self.fetch_ticker(symbol) for symbol in (symbols or self.symbols)}
+
+    def fetch_order_book(self, symbol, limit=50, params=None):
+        """Synthetic book: levels 0.02% apart, depth scaled from the candle's volume"""
+        ticker = self.fetch_ticker(symbol)
+        level_size = max(ticker['baseVolume'], 1e-9) / 50
+        bids = [[ticker['bid'] * (1 - 0.0002 * i), level_size * (1 + i * 0.1)] for i in range(limit)]
+        asks = [[ticker['ask'] * (1 + 0.0002 * i), level_size * (1 + i * 0.1)] for i in range(limit)]
+        return {'symbol': symbol, 'bids': bids, 'asks': asks, 'nonce': None}
+
+
+class PaperExchange:
+    """Simulated exchange. Market data comes from `data` (a real client or a ReplayFeed)."""
+
+    has = {'editOrder': False}
+
+    def __init__(self, data, clock=None, balance=1000.0, quote='USD', maker_fee=0.004, taker_fee=0.006,
+                 slippage_pct=0.0005, partial_fill_ratio=0.5, latency_ms=250, seed=42):
+        self.data = data
+        self.clock = clock or SimClock()
+        self.quote = quote
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage_pct = slippage_pct              # Extra slippage on top of walking the book
+        self.partial_fill_ratio = partial_fill_ratio  # Share of a crossed limit order filled per check
+        self.latency_ms = latency_ms                  # Delay before an order reaches the book
+        self.random = random.Random(seed)
+        self.balances = {quote: float(balance)}
+        self.reserved = {}
+        self.orders = {}
+        self.fills = []                               # (timestamp, symbol, side, amount, price, fee, maker)
+        self.fees_paid = 0.0
+        self.starting_balance = float(balance)
+        self._next_id = 0
+
+    @property
+    def markets(self):
+        return self.data.markets
+
+    # --- Market data (delegated) ---
+
+    def load_markets(self, reload=False):
+        return self.data.load_markets()
+
+    def set_leverage(self, leverage, symbol=None, params=None):
+        raise PaperError('set_leverage() not supported in paper trading (spot only)')
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=100, params=None):
+        return self.data.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+
+    def fetch_ticker(self, symbol, params=None):
+        return self.data.fetch_ticker(symbol)
+
+    def fetch_tickers(self, symbols=None, params=None):
+        return self.data.fetch_tickers(symbols)
+
+    def fetch_order_book(self, symbol, limit=50, params=None):
+        return self.data.fetch_order_book(symbol, limit=limit)
+
+    # --- Account ---
+
+    def fetch_balance(self, params=None):
+        self._match_all()
+        balance = {}
+        for currency, total in self.balances.items():
+            used = self.reserved.get(currency, 0.0)
+            balance[currency] = {'free': total - used, 'used': used, 'total': total}
+        return balance
+
+    # --- Orders ---
+
+    def create_market_buy_order(self, symbol, cost, params=None):
+        # Coinbase Advanced Trade market buys are sized by cost (quote currency)
+        self._latency()
+        book = self._book(symbol)
+        estimate = book.estimate_buy(cost)
+        price = (estimate['vwap'] or book.best_ask) * (1 + self._slippage())
+        fee = cost * self.taker_fee
+        self._debit(self.quote, cost + fee)
+        amount = cost / price
+        self._credit(symbol.split('/')[0], amount)
+        order = self._new_order(symbol, 'buy', 'market', amount, None)
+        self._record_fill(order, amount, price, fee, maker=False)
+        return dict(order)
+
+    def create_market_sell_order(self, symbol, amount, params=None):
+        self._latency()
+        base = symbol.split('/')[0]
+        amount = min(amount, self._free(base))
+        if amount <= 0:
+            raise PaperError(f"Insufficient {base} balance")
+        book = self._book(symbol)
+        estimate = book.estimate_sell(amount)
+        price = (estimate['vwap'] or book.best_bid) * (1 - self._slippage())
+        fee = amount * price * self.taker_fee
+        self._debit(base, amount)
+        self._credit(self.quote, amount * price - fee)
+        order = self._new_order(symbol, 'sell', 'market', amount, None)
+        self._record_fill(order, amount, price, fee, maker=False)
+        return dict(order)
+
+    def create_limit_buy_order(self, symbol, amount, price, params=None):
+        reserve = amount * price * (1 + self.maker_fee)
+        if reserve > self._free(self.quote):
+            raise PaperError(f"Insufficient {self.quote} balance")
+        self.reserved[self.quote] = self.reserved.get(self.quote, 0.0) + reserve
+        return self._place_limit(symbol, 'buy', amount, price)
+
+    def create_limit_sell_order(self, symbol, amount, price, params=None):
+        base = symbol.split('/')[0]
+        if amount > self._free(base) + 1e-12:
+            raise PaperError(f"Insufficient {base} balance")
+        self.reserved[base] = self.reserved.get(base, 0.0) + amount
+        return self._place_limit(symbol, 'sell', amount, price)
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        """ccxt's generic entry point. A limit sell with params['stopLossPrice'] is a stop-limit order."""
+        trigger = (params or {}).get('stopLossPrice')
+        if trigger is None:
+            if type == 'market':
+                return self.create_market_buy_order(symbol, amount) if side == 'buy' else self.create_market_sell_order(symbol, amount)
+            return self.create_limit_buy_order(symbol, amount, price) if side == 'buy' else self.create_limit_sell_order(symbol, amount, price)
+        if type != 'limit' or side != 'sell':
+            raise PaperError('Only stop-limit sells are supported in paper trading')
+        order = self.create_limit_sell_order(symbol, amount, price)
+        self.orders[order['id']].update(triggerPrice=float(trigger), triggered=False)
+        if params.get('client_order_id'):
+            # Like ccxt's coinbase: only the exchange-native key is sent, 'clientOrderId' is dropped
+            self.orders[order['id']]['clientOrderId'] = params['client_order_id']
+        return dict(self.orders[order['id']])
+
+    def fetch_order(self, id, symbol=None, params=None):
+        order = self._get_order(id)
+        self._match(order)
+        return dict(order)
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        self._match_all()
+        return [dict(o) for o in self.orders.values()
+                if o['status'] == 'open' and (symbol is None or o['symbol'] == symbol)]
+
+    def cancel_order(self, id, symbol=None, params=None):
+        order = self._get_order(id)
+        self._match(order)
+        if order['status'] == 'open':
+            self._release(order)
+            order['status'] = 'canceled'
+        return dict(order)
+
+    # --- Simulation internals ---
+
+    def _latency(self):
+        if self.latency_ms:
+            self.clock.advance(self.latency_ms / 1000.0 * (0.5 + self.random.random()))
+
+    def _slippage(self):
+        return self.slippage_pct * self.random.random()
+
+    def _book(self, symbol):
+        snapshot = self.data.fetch_order_book(symbol, limit=50)
+        book = OrderBook(symbol)
+        book.apply_snapshot(snapshot.get('bids', []), snapshot.get('asks', []))
+        return book
+
+    def _free(self, currency):
+        return self.balances.get(currency, 0.0) - self.reserved.get(currency, 0.0)
+
+    def _debit(self, currency, amount):
+        if amount > self._free(currency) + 1e-9:
+            raise PaperError(f"Insufficient {currency} balance")
+        self.balances[currency] = self.balances.get(currency, 0.0) - amount
+
+    def _credit(self, currency, amount):
+        self.balances[currency] = self.balances.get(currency, 0.0) + amount
+
+    def _new_order(self, symbol, side, type_, amount, price):
+        self._next_id += 1
+        order = {
+            'id': f"paper-{self._next_id}",
+            'symbol': symbol,
+            'side': side,
+            'type': type_,
+            'price': price,
+            'amount': amount,
+            'filled': 0.0,
+            'remaining': amount,
+            'cost': 0.0,
+            'average': None,
+            'status': 'open',
+            'triggerPrice': None,
+            'clientOrderId': f"ccxt-{self._next_id}",  # ccxt sends a generated one unless client_order_id is given
+            'fee': {'cost': 0.0, 'currency': self.quote},
+            'timestamp': int(self.clock.time() * 1000),
+            'active_at': self.clock.time() + self.latency_ms / 1000.0,
+            'last_match': None,
+        }
+        self.orders[order['id']] = order
+        return order
+
+    def _place_limit(self, symbol, side, amount, price):
+        order = self._new_order(symbol, side, 'limit', amount, price)
+        return dict(order)
+
+    def _get_order(self, id):
+        order = self.orders.get(id)
+        if order is None:
+            raise PaperError(f"Order {id} not found")
+        return order
+
+    def _match_all(self):
+        for order in list(self.orders.values()):
+            self._match(order)
+
+    def _match(self, order):
+        """Fill a resting limit order if the market has crossed its price since the last check"""
+        now = self.clock.time()
+        if order['status'] != 'open' or order['type'] != 'limit' or now < order['active_at']:
+            return
+        if order['last_match'] == now:
+            return  # One fill per order per instant
+        order['last_match'] = now
+
+        last = self.data.fetch_ticker(order['symbol'])['last']
+        if order['triggerPrice'] is not None and not order['triggered']:
+            if last > order['triggerPrice']:
+                return
+            order['triggered'] = True
+            self._fill_triggered(order)
+            return
+        crossed = last <= order['price'] if order['side'] == 'buy' else last >= order['price']
+        if not crossed:
+            return
+        amount = order['remaining'] * self.partial_fill_ratio
+        if amount * order['price'] < 1.0 or self.partial_fill_ratio >= 1:
+            amount = order['remaining']  # Don't leave dust behind
+        self._fill_limit(order, amount)
+
+    def _fill_limit(self, order, amount):
+        price = order['price']
+        base = order['symbol'].split('/')[0]
+        fee = amount * price * self.maker_fee
+        if order['side'] == 'buy':
+            reserve = amount * price * (1 + self.maker_fee)
+            self.reserved[self.quote] = max(0.0, self.reserved.get(self.quote, 0.0) - reserve)
+            self._debit(self.quote, amount * price + fee)
+            self._credit(base, amount)
+        else:
+            self.reserved[base] = max(0.0, self.reserved.get(base, 0.0) - amount)
+            self._debit(base, amount)
+            self._credit(self.quote, amount * price - fee)
+        self._record_fill(order, amount, price, fee, maker=True)
+
+    def _fill_triggered(self, order):
+        """A stop-limit order just triggered: it takes the bids down to its limit price at once"""
+        book = self._book(order['symbol'])
+        estimate = book.estimate_sell(order['remaining'])
+        price = (estimate['vwap'] or book.best_bid or 0.0) * (1 - self._slippage())
+        if price < order['price']:
+            return  # Gapped through the limit - rests on the book until the price comes back
+        base = order['symbol'].split('/')[0]
+        amount = order['remaining']
+        fee = amount * price * self.taker_fee
+        self.reserved[base] = max(0.0, self.reserved.get(base, 0.0) - amount)
+        self._debit(base, amount)
+        self._credit(self.quote, amount * price - fee)
+        self._record_fill(order, amount, price, fee, maker=False)
+
+    def _release(self, order):
+        # Return the unfilled part of a limit order's reservation
+        if order['side'] == 'buy':
+            reserve = order['remaining'] * order['price'] * (1 + self.maker_fee)
+            self.reserved[self.quote] = max(0.0, self.reserved.get(self.quote, 0.0) - reserve)
+        else:
+            base = order['symbol'].split('/')[0]
+            self.reserved[base] = max(0.0, self.reserved.get(base, 0.0) - order['remaining'])
+
+    def _record_fill(self, order, amount, price, fee, maker):
+        order['filled'] += amount
+        order['remaining'] = max(0.0, order['amount'] - order['filled'])
+        order['cost'] += amount * price
+        order['average'] = order['cost'] / order['filled']
+        order['fee']['cost'] += fee
+        if order['remaining'] <= order['amount'] * 1e-9:
+            order['remaining'] = 0.0
+            order['status'] = 'closed'
+        self.fees_paid += fee
+        self.fills.append((int(self.clock.time() * 1000), order['symbol'], order['side'], amount, price, fee, maker))
+
+    # --- Reporting ---
+
+    def equity(self):
+        """Total account value in the quote currency at the latest prices"""
+        total = self.balances.get(self.quote, 0.0)
+        holdings = [c for c, amount in self.balances.items() if c != self.quote and amount > 0]
+        if holdings:
+            tickers = self.data.fetch_tickers([f"{c}/{self.quote}" for c in holdings])
+            for currency in holdings:
+                ticker = tickers.get(f"{currency}/{self.quote}") or {}
+                total += self.balances[currency] * (ticker.get('last') or 0.0)
+        return total
+
+    def summary(self):
+        equity = self.equity()
+        maker_fills = sum(1 for fill in self.fills if fill[6])
+        return {
+            'starting_balance': self.starting_balance,
+            'equity': equity,
+            'return_pct': (equity / self.starting_balance - 1) if self.starting_balance else 0.0,
+            'fees_paid': self.fees_paid,
+            'fills': len(self.fills),
+            'maker_fills': maker_fills,
+            'taker_fills': len(self.fills) - maker_fills,
+        }
@@ -0,0 +1,93 @@
+"""
+Loop Profiler
+Profiles a window of N bot loop iterations (CPU with cProfile, allocations with tracemalloc)
+and writes the results to files. Idle until requested via --profile or a signal.
+"""
+import cProfile
+import io
+import os
+import pstats
+import signal
+import tracemalloc
+from datetime import datetime
+
+
+class LoopProfiler:
+    """Profile a window of loop iterations; call tick() once at the top of every iteration"""
+
+    def __init__(self, label, output_dir='profiles', signal_iterations=10):
+        self.label = label
+        self.output_dir = output_dir
+        self.signal_iterations = signal_iterations
+        self.requested = 0  # Iterations to profile, picked up at the next tick()
+        self.active = False
+        self.remaining = 0
+        self._profile = None
+        self._snapshot = None
+
+    def request(self, iterations):
+        """Profile the next N iterations (safe to call from a signal handler)"""
+        self.requested = iterations
+
+    def install_signal_handler(self, signum=None):
+        """Start a profiling window when the process receives SIGUSR1 (no-op on Windows)"""
+        if signum is None:
+            signum = getattr(signal, 'SIGUSR1', None)
+        if signum is None:
+            return False
+        signal.signal(signum, lambda *_: self.request(self.signal_iterations))
+        return True
+
+    def tick(self):
+        # Fast path: nothing requested and nothing running
+        if not (self.active or self.requested):
+            return
+        if self.active:
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self.stop()
+        if self.requested and not self.active:
+            self.start(self.requested)
+
+    def start(self, iterations):
+        self.requested = 0
+        self.remaining = iterations
+        self.active = True
+        print(f"🔬 Profiling next {iterations} iteration(s)...")
+        tracemalloc.start(25)
+        self._snapshot = tracemalloc.take_snapshot()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.active = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.output_dir, f"{self.label}-{stamp}")
+
+        # Raw cProfile data (open with snakeviz, pstats, etc.)
+        self._profile.dump_stats(f"{base}.prof")
+
+        report = io.StringIO()
+        report.write(f"Profile of {self.label} at {stamp}\n")
+        report.write(f"Traced memory: current {current_bytes / 1024:.1f} KiB, peak {peak_bytes / 1024:.1f} KiB\n\n")
+        report.write("=== CPU (top 40 by cumulative time) ===\n")
+        stats = pstats.Stats(self._profile, stream=report)
+        stats.sort_stats('cumulative').print_stats(40)
+        report.write("\n=== Allocations (top 30 by growth during the window) ===\n")
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = snapshot.filter_traces(filters).compare_to(self._snapshot.filter_traces(filters), 'lineno')
+        for stat in diff[:30]:
+            report.write(f"{stat}\n")
+
+        with open(f"{base}.txt", 'w') as f:
+            f.write(report.getvalue())
+
+        self._profile = None
+        self._snapshot = None
+        print(f"🔬 Profile written to {base}.prof and {base}.txt")
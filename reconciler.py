@@ -0,0 +1,149 @@
+"""
+Position Reconciler
+Compares the bot's tracked positions with the coins actually held on the exchange and fixes
+drift. Balances are only fetched when a check is due: after the bot places an order (once it
+has had a moment to settle) or on a slow schedule. Balances fetched elsewhere (e.g. for
+position sizing) are reused instead of making another call.
+
+Coins already held when the bot starts (or deposited/withdrawn later) are tracked as a
+baseline per currency and never treated as part of a bot position.
+"""
+import logging
+import time
+
+from bot_logger import event
+
+log = logging.getLogger('bot.reconcile')
+
+
+class PositionReconciler:
+    """Keep positions[symbol]['position_amount'] in line with exchange balances"""
+
+    def __init__(self, exchange, positions, on_reset, on_adopt, clock=time, interval=300, settle_seconds=2,
+                 tolerance_pct=0.01, dust_value=1.0, busy=None):
+        self.exchange = exchange
+        self.positions = positions
+        self.on_reset = on_reset              # on_reset(symbol): position is gone on the exchange
+        self.on_adopt = on_adopt              # on_adopt(symbol, amount, price): coins from our own order are untracked
+        self.clock = clock
+        self.interval = interval              # Seconds between scheduled checks
+        self.settle_seconds = settle_seconds  # Wait after an order before checking
+        self.tolerance_pct = tolerance_pct    # Relative difference ignored (fees, rounding)
+        self.dust_value = dust_value          # Differences worth less than this (quote currency) are ignored
+        self.busy = busy or (lambda symbol: False)  # True while an order for the symbol is still working
+        self.baseline = None                  # {currency: amount held outside bot positions}
+        self.dirty = {}                       # symbol -> (check not before, adopt untracked coins)
+        self.last_check = float('-inf')
+        self.checks = 0
+        self.corrections = 0
+
+    def mark_dirty(self, symbol, adopt=True):
+        """Request a check after an order for `symbol` (adopt=True: untracked coins came from our order)"""
+        self.dirty[symbol] = (self.clock.time() + self.settle_seconds, adopt)
+
+    def due(self):
+        now = self.clock.time()
+        if now - self.last_check >= self.interval:
+            return True
+        return any(not_before <= now for not_before, _ in self.dirty.values())
+
+    def maybe_reconcile(self):
+        """Reconcile if an order settled or the schedule says so. Cheap when nothing is due."""
+        if not self.due():
+            return False
+        try:
+            balance = self.exchange.fetch_balance()
+        except Exception as e:
+            log.warning(f"⚠️  Reconciliation balance fetch failed: {e}")
+            self.last_check = self.clock.time()  # Don't retry every tick
+            return False
+        self.reconcile(balance)
+        return True
+
+    def observe_balance(self, balance):
+        """Reconcile against a balance the bot fetched anyway (no extra API call)"""
+        try:
+            self.reconcile(balance)
+        except Exception as e:
+            log.warning(f"⚠️  Reconciliation failed: {e}")
+
+    def reconcile(self, balance):
+        now = self.clock.time()
+        self.last_check = now
+        self.checks += 1
+        held = {currency: float((entry or {}).get('total') or 0.0)
+                for currency, entry in balance.items() if isinstance(entry, dict)}
+
+        if self.baseline is None:
+            # First check: everything held that isn't a tracked position belongs to someone else
+            self.baseline = {}
+            for symbol, pos in self.positions.items():
+                base = symbol.split('/')[0]
+                tracked = pos['position_amount'] if pos['in_position'] else 0.0
+                self.baseline[base] = max(0.0, held.get(base, 0.0) - tracked)
+
+        drifted = []
+        for symbol, pos in self.positions.items():
+            if self.busy(symbol):
+                continue  # Balance is moving while the order works - check after it finishes
+            not_before, adopt = self.dirty.get(symbol, (None, False))
+            if not_before is not None and not_before > now:
+                continue  # Order still settling
+            base = symbol.split('/')[0]
+            if not pos['in_position'] and held.get(base, 0.0) < self.baseline.get(base, 0.0):
+                self.baseline[base] = held.get(base, 0.0)  # Coins withdrawn or sold outside the bot
+            tracked = pos['position_amount'] if pos['in_position'] else 0.0
+            actual = max(0.0, held.get(base, 0.0) - self.baseline.get(base, 0.0))
+            self.dirty.pop(symbol, None)
+            if abs(actual - tracked) > self.tolerance_pct * max(actual, tracked):
+                drifted.append((symbol, tracked, actual, adopt))
+
+        if not drifted:
+            return []
+
+        prices = self._prices([symbol for symbol, *_ in drifted])
+        corrections = []
+        for symbol, tracked, actual, adopt in drifted:
+            price = prices.get(symbol)
+            if price and abs(actual - tracked) * price < self.dust_value:
+                continue
+            corrections.append(self._correct(symbol, tracked, actual, adopt, price))
+        return corrections
+
+    def _correct(self, symbol, tracked, actual, adopt, price):
+        pos = self.positions[symbol]
+        base = symbol.split('/')[0]
+        actual_value = actual * price if price else None
+        self.corrections += 1
+
+        if pos['in_position']:
+            if actual_value is not None and actual_value < self.dust_value:
+                event(log, 'reconcile', f"[{base}] 🔄 Reconcile: position no longer held on exchange (tracked {tracked:.6f}) - clearing",
+                      level=logging.WARNING, symbol=symbol, action='reset', tracked=tracked)
+                self.on_reset(symbol)
+                return (symbol, 'reset', tracked, 0.0)
+            event(log, 'reconcile', f"[{base}] 🔄 Reconcile: position amount {tracked:.6f} → {actual:.6f} (exchange balance)",
+                  symbol=symbol, action='resize', tracked=tracked, actual=actual)
+            pos['position_amount'] = actual
+            return (symbol, 'resize', tracked, actual)
+
+        if adopt and price:
+            # Our own order left coins behind (e.g. a sell that failed) - manage them again
+            event(log, 'reconcile', f"[{base}] 🔄 Reconcile: {actual:.6f} {base} left over from our order - tracking as a position again",
+                  symbol=symbol, action='adopt', actual=actual)
+            self.on_adopt(symbol, actual, price)
+            return (symbol, 'adopt', tracked, actual)
+
+        # Not caused by us (deposit, withdrawal, manual trade): move the baseline
+        self.baseline[base] = self.baseline.get(base, 0.0) + actual
+        event(log, 'reconcile', f"[{base}] ℹ️  Reconcile: external balance change of {actual:+.6f} {base} - ignoring",
+              symbol=symbol, action='external', actual=actual)
+        return (symbol, 'external', tracked, actual)
+
+    def _prices(self, symbols):
+        try:
+            tickers = self.exchange.fetch_tickers(symbols)
+        except Exception as e:
+            log.warning(f"⚠️  Reconciliation price fetch failed: {e}")
+            return {}
+        return {symbol: (tickers.get(symbol) or {}).get('last') for symbol in symbols}
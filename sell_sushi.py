@@ -2,8 +2,7 @@
 """
 Script to sell all SUSHI cryptocurrency at market price
 """
-import ccxt
-import os
+from exchange_client import create_exchange, load_credentials
 from dotenv import load_dotenv
 import time
 from datetime import datetime
@@ -12,12 +11,7 @@ from datetime import datetime
 load_dotenv()
 
 # Get API credentials
-api_key = os.getenv('COINBASE_API_KEY')
-api_secret = os.getenv('COINBASE_API_SECRET')
-
-# Convert literal \n strings to actual newlines (required for ECDSA private key)
-if api_secret and '\\n' in api_secret:
-    api_secret = api_secret.replace('\\n', '\n')
+api_key, api_secret, _ = load_credentials()  # Secret \n literals are converted to newlines
 
 if not api_key or not api_secret:
     print("❌ Error: API credentials not found in .env file")
@@ -34,12 +28,7 @@ print()
 try:
     # Connect to Coinbase Advanced Trade API
     print("🔌 Connecting to Coinbase Advanced Trade...")
-    exchange = ccxt.coinbaseadvanced({
-        'apiKey': api_key,
-        'secret': api_secret,
-        'enableRateLimit': True,
-        'sandbox': False,  # Production mode
-    })
+    exchange = create_exchange(api_key, api_secret)
     
     # Load markets
     print("📊 Loading markets...")
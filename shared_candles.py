@@ -0,0 +1,73 @@
+"""
+Shared Candle Arrays
+Publishes per-symbol candle/indicator columns once into a memory-mapped file so pool workers
+map the same physical pages instead of each receiving a pickled copy. The file lives in
+/dev/shm (RAM) where available, otherwise in the temp directory.
+
+    with SharedColumns(indicators) as shared:            # Parent: one copy, written once
+        pool = ProcessPoolExecutor(initializer=init, initargs=(shared.handle,))
+
+    columns = attach(handle)                             # Worker: zero-copy float64 views
+    columns['ETH/USD']['close'][i]
+
+Columns come back as read-only memoryviews of doubles: indexing returns a plain float and
+slicing does not copy.
+"""
+import mmap
+import os
+import tempfile
+
+import numpy as np
+
+SHM_DIR = '/dev/shm'
+
+
+class SharedColumns:
+    """Owner of a mapped file holding {symbol: {column: values}} as float64; removes it on close"""
+
+    def __init__(self, columns_by_symbol, directory=None):
+        layout = {}
+        offset = 0
+        for symbol, columns in columns_by_symbol.items():
+            layout[symbol] = {}
+            for name, values in columns.items():
+                layout[symbol][name] = (offset, len(values))
+                offset += len(values)
+        directory = directory or (SHM_DIR if os.path.isdir(SHM_DIR) else None)
+        fd, self.path = tempfile.mkstemp(prefix='candles-', suffix='.f64', dir=directory)
+        try:
+            block = np.empty(offset, dtype=np.float64)
+            for symbol, columns in columns_by_symbol.items():
+                for name, values in columns.items():
+                    start, length = layout[symbol][name]
+                    block[start:start + length] = values
+            with os.fdopen(fd, 'wb') as f:
+                f.write(block.tobytes())
+        except BaseException:
+            os.unlink(self.path)
+            raise
+        self.handle = (self.path, layout)  # Small and picklable: all a worker needs to attach
+        self.nbytes = offset * 8
+
+    def close(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Workers that still have it mapped keep their pages until they exit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(handle):
+    """Map a published file read-only: {symbol: {column: memoryview of doubles}}"""
+    path, layout = handle
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {symbol: {name: memoryview(b'').cast('d') for name in symbol_layout}
+                    for symbol, symbol_layout in layout.items()}
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    values = memoryview(mapped).cast('d')  # The views keep the mapping alive
+    return {symbol: {name: values[start:start + length] for name, (start, length) in symbol_layout.items()}
+            for symbol, symbol_layout in layout.items()}
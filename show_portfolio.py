@@ -2,20 +2,15 @@
 """
 Simple script to connect to Coinbase and display portfolio balances
 """
-import ccxt
-import os
+from exchange_client import create_exchange, load_credentials
+from valuation import PriceGraph, fetch_price_graph, value_balances
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Get API credentials
-api_key = os.getenv('COINBASE_API_KEY')
-api_secret = os.getenv('COINBASE_API_SECRET')
-
-# Convert literal \n strings to actual newlines (required for ECDSA private key)
-if api_secret and '\\n' in api_secret:
-    api_secret = api_secret.replace('\\n', '\n')
+api_key, api_secret, _ = load_credentials()  # Secret \n literals are converted to newlines
 
 if not api_key or not api_secret:
     print("❌ Error: API credentials not found in .env file")
@@ -28,12 +23,7 @@ print()
 
 try:
     # Connect to Coinbase Advanced Trade API
-    exchange = ccxt.coinbaseadvanced({
-        'apiKey': api_key,
-        'secret': api_secret,
-        'enableRateLimit': True,
-        'sandbox': False,  # Production mode
-    })
+    exchange = create_exchange(api_key, api_secret)
     
     # Load markets
     print("📊 Loading markets...")
@@ -45,34 +35,26 @@ try:
     balance = exchange.fetch_balance()
     print("✅ Balance fetched successfully!\n")
     
+    # Price every asset in USD from one bulk ticker request
+    print("📊 Fetching prices...")
+    try:
+        graph = fetch_price_graph(exchange)
+        print(f"✅ Priced {len(graph.prices)} currencies\n")
+    except Exception as e:
+        print(f"⚠️  Could not fetch prices ({e}) - showing USD balances only\n")
+        graph = PriceGraph({})
+    
     # Display portfolio
     print("=" * 70)
     print("PORTFOLIO BALANCES")
     print("=" * 70)
     
-    # Get all currencies with non-zero balances
-    currencies_with_balance = []
-    for currency, bal_info in balance.items():
-        if isinstance(bal_info, dict):
-            total = bal_info.get('total', 0)
-            free = bal_info.get('free', 0)
-            used = bal_info.get('used', 0)
-            if total > 0 or free > 0 or used > 0:
-                currencies_with_balance.append({
-                    'currency': currency,
-                    'total': total,
-                    'free': free,
-                    'used': used
-                })
-    
-    # Sort by total balance (descending)
-    currencies_with_balance.sort(key=lambda x: x['total'], reverse=True)
+    # Get all currencies with non-zero balances, largest USD value first
+    currencies_with_balance, total_usd_value = value_balances(balance, graph)
     
     if currencies_with_balance:
-        print(f"{'Currency':<12} {'Total':>20} {'Free':>20} {'Used':>20}")
-        print("-" * 70)
-        
-        total_usd_value = 0
+        print(f"{'Currency':<12} {'Total':>20} {'Free':>20} {'Used':>20} {'Value USD':>15}  Priced via")
+        print("-" * 110)
         
         for item in currencies_with_balance:
             currency = item['currency']
@@ -85,18 +67,20 @@ try:
                 total_str = f"${total:,.2f}"
                 free_str = f"${free:,.2f}"
                 used_str = f"${used:,.2f}"
-                if currency == 'USD':
-                    total_usd_value += total
             else:
                 total_str = f"{total:.8f}".rstrip('0').rstrip('.')
                 free_str = f"{free:.8f}".rstrip('0').rstrip('.')
                 used_str = f"{used:.8f}".rstrip('0').rstrip('.')
+            value_str = f"${item['usd_value']:,.2f}" if item['usd_value'] is not None else "N/A"
+            via = ' → '.join(item['path']) if item['path'] else ''
             
-            print(f"{currency:<12} {total_str:>20} {free_str:>20} {used_str:>20}")
+            print(f"{currency:<12} {total_str:>20} {free_str:>20} {used_str:>20} {value_str:>15}  {via}")
         
-        print("=" * 70)
-        if total_usd_value > 0:
-            print(f"\n💵 Total USD Balance: ${total_usd_value:,.2f}")
+        print("=" * 110)
+        print(f"\n💵 Total Portfolio Value: ${total_usd_value:,.2f}")
+        unpriced = [item['currency'] for item in currencies_with_balance if item['usd_value'] is None]
+        if unpriced:
+            print(f"   Not included (no price path to USD): {', '.join(unpriced)}")
     else:
         print("   No balances found")
     
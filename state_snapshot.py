@@ -0,0 +1,94 @@
+"""
+Warm-Start Snapshots
+Saves the bot's in-memory state - candle ring buffers with their indicator state, positions
+(stops, peaks, cooldown timers) and the exchange's market list - to one compact binary file,
+so a restart picks up where the last run stopped instead of warming up from nothing.
+
+The file is an uncompressed .npz: raw float64/int64 candle columns plus a JSON header. It is
+written to a temporary file and renamed, so a crash mid-write never leaves a torn snapshot.
+
+    save_snapshot(path, meta, buffers, positions, markets=markets_blob)
+    snapshot = load_snapshot(path)       # None if missing or unreadable
+    snapshot.restore_buffer(symbol, candle_buffers[symbol])
+"""
+import json
+import os
+import zlib
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MARKETS_MAX_AGE = 86400  # Seconds a saved market list is reused instead of calling load_markets()
+
+
+def encode_markets(markets, currencies):
+    """Compress ccxt markets/currencies once; the same bytes are reused by every snapshot"""
+    payload = json.dumps({'markets': markets, 'currencies': currencies}, default=str)
+    return zlib.compress(payload.encode(), 6)
+
+
+def save_snapshot(path, meta, buffers, positions, markets=None):
+    """Write {symbol: CandleBuffer} and {symbol: position dict} plus `meta` to `path` atomically"""
+    header = {'version': FORMAT_VERSION, 'meta': meta, 'positions': positions, 'buffers': {}}
+    arrays = {}
+    for i, (symbol, buffer) in enumerate(buffers.items()):
+        columns, scalars = buffer.get_state()
+        header['buffers'][symbol] = {'key': i, 'scalars': scalars}
+        for name, values in columns.items():
+            arrays[f"b{i}_{name}"] = values
+    arrays['header'] = np.frombuffer(json.dumps(header, default=float).encode(), dtype=np.uint8)  # default: numpy scalars
+    if markets is not None:
+        arrays['markets'] = np.frombuffer(markets, dtype=np.uint8)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+class Snapshot:
+    """A loaded snapshot file"""
+
+    def __init__(self, data):
+        self._data = data
+        header = json.loads(data['header'].tobytes())
+        if header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot version {header.get('version')}")
+        self.meta = header['meta']
+        self.positions = header['positions']
+        self.buffers = header['buffers']
+
+    def markets(self):
+        """(markets, currencies) saved with the snapshot, or None"""
+        if 'markets' not in self._data:
+            return None
+        payload = json.loads(zlib.decompress(self._data['markets'].tobytes()))
+        return payload['markets'], payload['currencies']
+
+    def restore_buffer(self, symbol, buffer):
+        """Load a symbol's saved candles into `buffer`. False if the snapshot has none for it."""
+        saved = self.buffers.get(symbol)
+        if saved is None:
+            return False
+        prefix = f"b{saved['key']}_"
+        arrays = {name[len(prefix):]: values for name, values in self._data.items() if name.startswith(prefix)}
+        buffer.set_state(arrays, saved['scalars'])
+        return True
+
+
+def load_snapshot(path):
+    """Read a snapshot written by save_snapshot(). Returns None if there is no usable file."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return Snapshot({name: data[name] for name in data.files})
+    except (OSError, ValueError, KeyError, zlib.error) as e:
+        print(f"⚠️  Ignoring unreadable state snapshot {path}: {e}")
+        return None
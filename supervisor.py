@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Multi-Account Supervisor
+Runs main_multi_symbol.py for several Coinbase accounts from one container. Each account is a
+separate worker process with its own API keys, ccxt client and rate-limit budget; public market
+data (candles, tickers, order books) is fetched once by the supervisor's market data hub and
+shared by all workers.
+
+Workers are forked from a server process that has already imported pandas, pandas-ta and ccxt,
+so those modules' memory is shared between workers instead of loaded once per container.
+
+Usage:
+    TRADING_ACCOUNTS=main,hedge python supervisor.py --execute
+
+Each account's settings (API keys, symbols, risk...) come from accounts/<name>.env, loaded on
+top of the shared environment. Arguments other than --accounts are passed to every worker.
+"""
+import argparse
+import atexit
+import multiprocessing
+import os
+import runpy
+import signal
+import sys
+import time
+
+from dotenv import dotenv_values, load_dotenv
+
+from health_server import HealthServer
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main_multi_symbol.py')
+PRELOAD = ['numpy', 'pandas', 'pandas_ta_classic', 'ccxt', 'requests']  # Shared by every forked worker
+
+
+def run_worker(account, env, argv):
+    """Worker process entry point: run the bot for one account"""
+    os.environ.update(env)
+    sys.argv = [BOT_SCRIPT] + list(argv)
+    try:
+        runpy.run_path(BOT_SCRIPT, run_name='__main__')
+    finally:
+        # Process children exit without running atexit (log queue flush, recorder close)
+        atexit._run_exitfuncs()
+
+
+def check_account_files(accounts):
+    """Problems that stop the accounts from trading side by side: every account needs its own
+    accounts/<name>.env with its own COINBASE_API_KEY. Two workers on one Coinbase account would
+    each keep their own positions and reconciler, fighting over the same balances."""
+    problems = []
+    owners = {}
+    for account in accounts:
+        env_file = os.path.join('accounts', f"{account}.env")
+        if not os.path.exists(env_file):
+            problems.append(f"[{account}] {env_file} not found")
+            continue
+        api_key = dotenv_values(env_file).get('COINBASE_API_KEY')
+        if not api_key:
+            problems.append(f"[{account}] {env_file} does not set COINBASE_API_KEY")
+        elif api_key in owners:
+            problems.append(f"[{account}] {env_file} uses the same COINBASE_API_KEY as {owners[api_key]}")
+        else:
+            owners[api_key] = account
+    return problems
+
+
+class Worker:
+    """One account's bot process and its restart bookkeeping"""
+
+    def __init__(self, account, env_file):
+        self.account = account
+        self.env_file = env_file
+        self.process = None
+        self.started_at = None
+        self.restarts = 0
+        self.restart_delay = 5.0
+        self.next_start = 0.0
+        self.exit_code = None
+        self.finished = False
+
+    def snapshot(self):
+        alive = self.process is not None and self.process.is_alive()
+        return {'pid': self.process.pid if alive else None, 'alive': alive, 'restarts': self.restarts,
+                'exit_code': self.exit_code, 'finished': self.finished,
+                'uptime_s': round(time.time() - self.started_at, 1) if alive else None}
+
+
+class Supervisor:
+    """Start one worker per account, restart crashed ones with backoff, share market data"""
+
+    def __init__(self, accounts, worker_args, hub=None, restart=True, max_restart_delay=300.0):
+        self.worker_args = list(worker_args)
+        self.hub = hub
+        self.restart = restart                # False for replays: an exit means the run is over
+        self.max_restart_delay = max_restart_delay
+        self.workers = [Worker(account, os.path.join('accounts', f"{account}.env")) for account in accounts]
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.context = multiprocessing.get_context(method)
+        if method == 'forkserver':
+            self.context.set_forkserver_preload(PRELOAD)
+        self.stopping = False
+
+    def worker_env(self, worker):
+        env = {
+            'TRADING_ACCOUNT': worker.account,
+            'TRADING_ACCOUNT_ENV_FILE': worker.env_file,  # Loaded by the bot after its own .env files
+            'TRADING_HEALTH_PORT': '0',                    # PORT belongs to the supervisor (accounts may set their own)
+        }
+        if self.hub:
+            env['TRADING_MARKET_DATA_HUB'] = f"{self.hub.address[0]}:{self.hub.address[1]}"
+            env['TRADING_MARKET_DATA_HUB_KEY'] = self.hub.authkey.hex()
+        return env
+
+    def start_worker(self, worker):
+        worker.process = self.context.Process(target=run_worker, name=f"bot-{worker.account}",
+                                              args=(worker.account, self.worker_env(worker), self.worker_args))
+        worker.process.start()
+        worker.started_at = time.time()
+        worker.exit_code = None
+        print(f"▶️  [{worker.account}] Worker started (pid {worker.process.pid})")
+
+    def check_workers(self):
+        now = time.time()
+        for worker in self.workers:
+            if worker.finished or self.stopping:
+                continue
+            if worker.process is None:
+                if now >= worker.next_start:
+                    self.start_worker(worker)
+                continue
+            if worker.process.is_alive():
+                continue
+            worker.exit_code = worker.process.exitcode
+            worker.process = None
+            if not self.restart:
+                worker.finished = True
+                print(f"⏹️  [{worker.account}] Worker finished (exit code {worker.exit_code})")
+                continue
+            if now - worker.started_at > 600:
+                worker.restart_delay = 5.0  # Ran fine for a while - this is a new failure, not a crash loop
+            worker.restarts += 1
+            worker.next_start = now + worker.restart_delay
+            print(f"⚠️  [{worker.account}] Worker exited (code {worker.exit_code}) - restarting in {worker.restart_delay:.0f}s")
+            worker.restart_delay = min(worker.restart_delay * 2, self.max_restart_delay)
+
+    def stop(self, timeout=30):
+        """Send SIGTERM to every worker and wait for them to exit"""
+        self.stopping = True
+        running = [w.process for w in self.workers if w.process is not None and w.process.is_alive()]
+        for process in running:
+            process.terminate()
+        deadline = time.time() + timeout
+        for process in running:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.kill()
+
+    def snapshot(self):
+        return {
+            'status': 'running',
+            'last_loop_time': time.time(),
+            'accounts': {w.account: w.snapshot() for w in self.workers},
+            'market_data_hub': self.hub.stats() if self.hub else None,
+        }
+
+    def done(self):
+        return all(w.finished for w in self.workers)
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Run main_multi_symbol.py for several accounts')
+    parser.add_argument('--accounts', default=os.getenv('TRADING_ACCOUNTS', ''),
+                        help='Comma-separated account names (settings in accounts/<name>.env)')
+    args, worker_args = parser.parse_known_args()
+    accounts = [a.strip() for a in args.accounts.split(',') if a.strip()]
+    if not accounts:
+        print("❌ No accounts configured - set TRADING_ACCOUNTS or pass --accounts main,hedge")
+        return 1
+
+    replay = any(a in ('--replay', '--replay-log') or a.startswith(('--replay=', '--replay-log=')) for a in worker_args)
+    if not replay:  # Replays trade a simulated account, so they can share the environment
+        problems = check_account_files(accounts)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            print("❌ Each account needs accounts/<name>.env with its own COINBASE_API_KEY - not starting")
+            return 1
+    hub = None
+    if not replay and os.getenv('TRADING_SHARED_MARKET_DATA', 'true').lower() == 'true':
+        # Public data only - the supervisor's own keys (if any) are never used for orders
+        from exchange_client import create_exchange
+        from market_data_hub import MarketDataHub
+        public_exchange = create_exchange(use_sandbox='--sandbox' in worker_args or '--test' in worker_args)
+        hub = MarketDataHub(public_exchange, max_age=float(os.getenv('TRADING_MARKET_DATA_MAX_AGE', '5'))).start()
+        print(f"📡 Market data hub on {hub.address[0]}:{hub.address[1]} (max age {hub.max_age:g}s)")
+
+    supervisor = Supervisor(accounts, worker_args, hub=hub, restart=not replay)
+    print(f"👥 Supervising {len(accounts)} accounts: {', '.join(accounts)}")
+    if worker_args:
+        print(f"   Worker arguments: {' '.join(worker_args)}")
+
+    health_server = None
+    health_port = int(os.getenv('TRADING_HEALTH_PORT', os.getenv('PORT', '0')))
+    if health_port > 0:
+        health_server = HealthServer(health_port, stale_after=60)
+        try:
+            health_server.start()
+            print(f"🩺 Supervisor health endpoint: http://0.0.0.0:{health_port}/health (accounts at /state)")
+        except OSError as e:
+            print(f"⚠️  Could not start health endpoint on port {health_port}: {e}")
+            health_server = None
+
+    def handle_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    try:
+        while not supervisor.done():
+            supervisor.check_workers()
+            if health_server:
+                health_server.publish(supervisor.snapshot())
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("🛑 Stopping workers...")
+        supervisor.stop()
+    for worker in supervisor.workers:
+        print(f"   [{worker.account}] restarts: {worker.restarts}, last exit code: {worker.exit_code}")
+    if hub:
+        stats = hub.stats()
+        print(f"📡 Market data hub: {stats['requests']} requests, {stats['upstream_calls']} exchange calls")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Symbol Scheduler
+Gives every symbol its own check interval based on its state, so API calls go where the risk
+is: positions close to their stop are analyzed often, symbols in cooldown or drifting sideways
+rarely.
+
+    in position   interval shrinks from the base to min_interval as price nears the stop
+                  (a full ATR trail away: base interval, at the stop: min_interval)
+    cooldown      wait out the cooldown (no entry is possible before it ends)
+    flat          base interval while the trend is entry-strength or the asset is volatile,
+                  stretching to max_interval in a sideways market
+"""
+import time
+
+
+class SymbolScheduler:
+    """Tracks when each symbol is next due for a full check"""
+
+    def __init__(self, symbols, base_interval, min_interval, max_interval, cooldown_seconds=0,
+                 min_trend_strength=0.01, enabled=True, clock=time):
+        self.symbols = list(symbols)
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.cooldown_seconds = cooldown_seconds
+        self.min_trend_strength = min_trend_strength
+        self.enabled = enabled  # False: every symbol every base_interval (fixed cadence)
+        self.clock = clock
+        now = clock.time()
+        self.next_check = {symbol: now for symbol in self.symbols}
+        self.intervals = {symbol: base_interval for symbol in self.symbols}
+        self.market = {}  # symbol -> (price, atr, trend_strength) from the last analysis
+
+    def due(self):
+        """Symbols to check now, most overdue first"""
+        if not self.enabled:
+            return list(self.symbols)
+        now = self.clock.time()
+        return sorted((s for s in self.symbols if self.next_check[s] <= now), key=self.next_check.get)
+
+    def next_due(self):
+        return min(self.next_check.values())
+
+    def observe(self, symbol, price, atr, trend_strength):
+        """Record the market state from a symbol's latest analysis"""
+        self.market[symbol] = (price, atr, trend_strength)
+
+    def reschedule(self, symbol, pos):
+        """Set the symbol's next check from its position state and last observed market"""
+        interval = self.interval_for(symbol, pos) if self.enabled else self.base_interval
+        self.intervals[symbol] = interval
+        self.next_check[symbol] = self.clock.time() + interval
+        return interval
+
+    def interval_for(self, symbol, pos):
+        price, atr, trend_strength = self.market.get(symbol, (None, None, None))
+        if not price or not atr:
+            return self.base_interval  # Nothing observed yet (e.g. data error)
+
+        if pos['in_position']:
+            # The trailing stop sits at most atr_multiplier ATRs below price; profit locks pull it closer
+            trail = atr * (pos.get('atr_multiplier') or 1.0)
+            room = min(max((price - pos['trailing_stop_price']) / trail, 0.0), 1.0)
+            return self.min_interval + (self.base_interval - self.min_interval) * room
+
+        if pos['last_exit_time'] > 0:
+            cooldown_left = pos['last_exit_time'] + self.cooldown_seconds - self.clock.time()
+            if cooldown_left > 0:
+                return min(max(cooldown_left, self.min_interval), self.max_interval)
+
+        if atr / price > 0.02 or self.min_trend_strength <= 0:
+            return self.base_interval  # Volatile assets can set up an entry within one candle
+        # Sideways: the further the trend is from entry strength, the longer the wait
+        strength = min(trend_strength / self.min_trend_strength, 1.0)
+        quiet = min(max((1.0 - strength) / 0.75, 0.0), 1.0)
+        return self.base_interval + (self.max_interval - self.base_interval) * quiet
+
+    def snapshot(self):
+        now = self.clock.time()
+        return {symbol: {'interval': round(self.intervals[symbol], 1),
+                         'next_check_in': round(self.next_check[symbol] - now, 1)}
+                for symbol in self.symbols}
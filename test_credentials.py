@@ -74,19 +74,12 @@ print("=" * 70)
 print()
 
 try:
-    import ccxt
+    from exchange_client import create_exchange, normalize_secret
     
     # Process secret (convert \n to actual newlines)
-    processed_secret = api_secret
-    if '\\n' in processed_secret:
-        processed_secret = processed_secret.replace('\\n', '\n')
+    processed_secret = normalize_secret(api_secret)
     
-    exchange = ccxt.coinbaseadvanced({
-        'apiKey': api_key,
-        'secret': processed_secret,
-        'enableRateLimit': True,
-        'sandbox': False,
-    })
+    exchange = create_exchange(api_key, processed_secret)
     
     print("🔌 Attempting to connect...")
     exchange.load_markets()
@@ -0,0 +1,183 @@
+"""
+Trade Stream
+Follows every trade of the bot's symbols over the exchange websocket (ccxt.pro
+watch_trades_for_symbols) on a background thread, so spike reversals are seen at tick
+resolution instead of from one candle close per loop.
+
+Per symbol and per trade, in O(1):
+    high        highest trade price since the position was armed (entry)
+    drawdown    1 - last / high
+    momentum    last price vs. its time-decayed average over `momentum_window` seconds
+
+The thread never trades. When an armed position has reached its spike profit and then falls
+`spike_reversal` below its high, the symbol is flagged and wait() wakes the main loop, which
+runs its normal exit checks right away.
+
+    stream = TradeStream(symbols, lambda: create_stream_exchange(exchange.markets))
+    stream.start()
+    stream.arm(symbol, entry_price, peak_price, min_spike_profit, spike_reversal)
+    if stream.wait(5):                                 # Sleeps, but returns early on a trigger
+        for symbol, (price, high, momentum) in stream.take_triggers().items(): ...
+"""
+import asyncio
+import logging
+import math
+import threading
+
+from bot_logger import event, tick
+
+log = logging.getLogger('bot.trade_stream')
+
+
+def create_stream_exchange(markets=None, currencies=None):
+    """Websocket client for public Coinbase trades. None if ccxt.pro is unavailable."""
+    try:
+        import ccxt.pro as ccxtpro
+    except ImportError:
+        return None
+    exchange = ccxtpro.coinbase({'enableRateLimit': True})
+    if markets:
+        exchange.set_markets(markets, currencies)  # Reuse the REST client's market list
+    return exchange
+
+
+class Tape:
+    """Running statistics of one symbol's trades"""
+
+    __slots__ = ('last', 'timestamp', 'average', 'momentum', 'high', 'trades', 'armed')
+
+    def __init__(self):
+        self.last = 0.0
+        self.timestamp = None
+        self.average = 0.0
+        self.momentum = 0.0
+        self.high = 0.0
+        self.trades = 0
+        self.armed = None               # (entry_price, min_spike_profit, spike_reversal) while in a position
+
+    @property
+    def drawdown(self):
+        return 1 - self.last / self.high if self.high > 0 else 0.0
+
+
+class TradeStream:
+    """Background trade consumer that flags spike reversals of armed positions"""
+
+    def __init__(self, symbols, exchange_factory, momentum_window=10.0, max_reconnect_delay=60.0):
+        self.symbols = list(symbols)
+        self.exchange_factory = exchange_factory    # Called on the stream thread (clients are bound to its event loop)
+        self.momentum_window = momentum_window
+        self.max_reconnect_delay = max_reconnect_delay
+        self.tapes = {symbol: Tape() for symbol in self.symbols}
+        self.connected = False
+        self.connections = 0
+        self.triggered = 0
+        self._triggers = {}                         # symbol -> (price, high, momentum), taken by the main thread
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='trade-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    # --- Main thread ---
+
+    def arm(self, symbol, entry_price, peak_price, min_spike_profit, spike_reversal):
+        """Watch an open position. The running high restarts at `peak_price` for a new entry."""
+        tape = self.tapes[symbol]
+        if tape.armed is None or tape.armed[0] != entry_price:
+            tape.high = peak_price
+        elif peak_price > tape.high:
+            tape.high = peak_price
+        tape.armed = (entry_price, min_spike_profit, spike_reversal)
+
+    def disarm(self, symbol):
+        self.tapes[symbol].armed = None
+
+    def high(self, symbol):
+        """Highest trade since the position was armed (0.0 if not armed)"""
+        tape = self.tapes[symbol]
+        return tape.high if tape.armed is not None else 0.0
+
+    def wait(self, timeout):
+        """Sleep up to `timeout` seconds. True if a trigger is waiting."""
+        return self._wake.wait(timeout)
+
+    def take_triggers(self):
+        with self._lock:
+            triggers, self._triggers = self._triggers, {}
+            self._wake.clear()
+        return triggers
+
+    def snapshot(self):
+        return {'connected': self.connected, 'connections': self.connections, 'triggers': self.triggered,
+                'symbols': {symbol: {'last': tape.last, 'high': tape.high if tape.armed else None,
+                                     'drawdown': round(tape.drawdown, 6) if tape.armed else None,
+                                     'momentum': round(tape.momentum, 6), 'trades': tape.trades}
+                            for symbol, tape in self.tapes.items()}}
+
+    # --- Stream thread ---
+
+    def on_trade(self, symbol, price, timestamp):
+        tape = self.tapes.get(symbol)
+        if tape is None or not price:
+            return
+        tape.trades += 1
+        if tape.timestamp is None:
+            tape.average = price
+        else:
+            weight = math.exp(-max(0, timestamp - tape.timestamp) / 1000.0 / self.momentum_window)
+            tape.average = weight * tape.average + (1 - weight) * price
+        tape.last = price
+        tape.timestamp = timestamp
+        tape.momentum = price / tape.average - 1
+        if price > tape.high:
+            tape.high = price
+            return
+        armed = tape.armed
+        if armed is None or symbol in self._triggers:
+            return
+        entry_price, min_spike_profit, spike_reversal = armed
+        if tape.high >= entry_price * (1 + min_spike_profit) and price <= tape.high * (1 - spike_reversal):
+            with self._lock:
+                self._triggers[symbol] = (price, tape.high, tape.momentum)
+                self.triggered += 1
+            self._wake.set()
+
+    def _run(self):
+        asyncio.run(self._consume())
+
+    async def _consume(self):
+        exchange = self.exchange_factory()
+        if exchange is None:
+            log.warning("⚠️  Trade stream unavailable (ccxt.pro not installed) - spike detection uses polled prices")
+            return
+        delay = 1.0
+        try:
+            while not self._stopped.is_set():
+                try:
+                    trades = await exchange.watch_trades_for_symbols(self.symbols)
+                except Exception as e:
+                    if self.connected:
+                        event(log, 'stream', f"🔌 Trade stream disconnected: {e} - reconnecting in {delay:.0f}s",
+                              level=logging.WARNING, error=str(e))
+                    else:
+                        tick(log, 'trade_stream', f"⚠️  Trade stream unavailable: {e}", level=logging.WARNING)
+                    self.connected = False
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                    continue
+                if not self.connected:
+                    self.connected = True
+                    self.connections += 1
+                    delay = 1.0
+                    event(log, 'stream', f"📡 Trade stream connected ({len(self.symbols)} symbols)", symbols=len(self.symbols))
+                for trade in trades:
+                    self.on_trade(trade['symbol'], trade['price'], trade['timestamp'])
+        finally:
+            await exchange.close()
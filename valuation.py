@@ -0,0 +1,105 @@
+"""
+Portfolio Valuation
+Prices every currency in USD from one bulk ticker fetch. Each ticker BASE/QUOTE is an edge in
+a currency graph; a breadth-first pass outward from USD gives every reachable currency its
+shortest conversion path (fewest hops, so the least spread and staleness), preferring the
+most liquid market when several paths are equally short.
+
+    graph = fetch_price_graph(exchange)            # One fetch_tickers call
+    graph.price('SHIB')                            # USD per SHIB, e.g. via SHIB/USDC
+    graph.path('SHIB')                             # ['SHIB/USDC'] (USDC counts as USD)
+    rows, total = value_balances(balance, graph)
+"""
+DEFAULT_QUOTE = 'USD'
+PEGGED = ('USDC',)  # Valued 1:1 with the quote currency (Coinbase converts USD <-> USDC at par)
+
+
+def ticker_price(ticker):
+    """Last trade price, falling back to close or the bid/ask midpoint"""
+    price = ticker.get('last') or ticker.get('close')
+    if not price and ticker.get('bid') and ticker.get('ask'):
+        price = (ticker['bid'] + ticker['ask']) / 2
+    return float(price) if price else None
+
+
+class PriceGraph:
+    """USD price and conversion path for every currency reachable from the tickers"""
+
+    def __init__(self, tickers, quote=DEFAULT_QUOTE, pegged=PEGGED):
+        self.quote = quote
+        self.prices = {quote: 1.0}
+        self.paths = {quote: []}
+        for currency in pegged:
+            self.prices.setdefault(currency, 1.0)
+            self.paths.setdefault(currency, [])
+
+        # currency -> [(other currency, symbol, other per currency, base volume, quote volume, currency is base)]
+        edges = {}
+        for symbol, ticker in tickers.items():
+            if '/' not in symbol:
+                continue
+            base, quote_ccy = symbol.split(':')[0].split('/')
+            rate = ticker_price(ticker)
+            if not rate:
+                continue
+            base_volume = ticker.get('baseVolume') or 0.0
+            quote_volume = ticker.get('quoteVolume') or 0.0
+            edges.setdefault(quote_ccy, []).append((base, symbol, 1.0 / rate, base_volume, quote_volume, False))
+            edges.setdefault(base, []).append((quote_ccy, symbol, rate, base_volume, quote_volume, True))
+
+        frontier = list(self.prices)
+        while frontier:
+            # Best edge into each newly reached currency: highest USD volume among one-hop-longer paths
+            reached = {}
+            for currency in frontier:
+                usd = self.prices[currency]
+                for other, symbol, other_per_currency, base_volume, quote_volume, currency_is_base in edges.get(currency, ()):
+                    if other in self.prices:
+                        continue
+                    price = usd / other_per_currency
+                    volume_usd = base_volume * usd if currency_is_base else quote_volume * usd
+                    best = reached.get(other)
+                    if best is None or volume_usd > best[2]:
+                        reached[other] = (price, [symbol] + self.paths[currency], volume_usd)
+            for currency, (price, path, _) in reached.items():
+                self.prices[currency] = price
+                self.paths[currency] = path
+            frontier = list(reached)
+
+    def price(self, currency):
+        """USD per unit, or None if no ticker connects the currency to USD"""
+        return self.prices.get(currency)
+
+    def path(self, currency):
+        """Markets converting the currency to USD, asset side first ([] for USD and pegged)"""
+        return self.paths.get(currency)
+
+    def value(self, currency, amount):
+        price = self.prices.get(currency)
+        return amount * price if price is not None else None
+
+
+def fetch_price_graph(exchange, quote=DEFAULT_QUOTE, pegged=PEGGED):
+    """Build the graph from a single bulk ticker request"""
+    return PriceGraph(exchange.fetch_tickers(), quote, pegged)
+
+
+def value_balances(balance, graph):
+    """Rows {currency, total, free, used, price, usd_value, path} for non-zero balances (largest
+    USD value first; unpriced assets last) and the total USD value of everything priced"""
+    rows = []
+    for currency, info in balance.items():
+        if not isinstance(info, dict) or currency in ('info', 'free', 'used', 'total'):
+            continue
+        total = info.get('total') or 0.0
+        free = info.get('free') or 0.0
+        used = info.get('used') or 0.0
+        if total <= 0 and free <= 0 and used <= 0:
+            continue
+        price = graph.price(currency)
+        rows.append({
+            'currency': currency, 'total': total, 'free': free, 'used': used, 'price': price,
+            'usd_value': total * price if price is not None else None, 'path': graph.path(currency),
+        })
+    rows.sort(key=lambda r: (r['usd_value'] is None, -(r['usd_value'] or 0.0), -r['total']))
+    return rows, sum(r['usd_value'] for r in rows if r['usd_value'] is not None)